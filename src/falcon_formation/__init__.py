@@ -15,6 +15,11 @@ HOLDSPORT_PASSWORD_KEY = "HOLDSPORT_PASSWORD"  # noqa: S105
 # Telegram
 TELEGRAM_TOKEN_KEY = "TELEGRAM_TOKEN"  # noqa: S105
 
+# Solver
+SOLVER_WORKERS_KEY = "SOLVER_WORKERS"
+SOLVER_MASK_TABLE_DIRECTORY_KEY = "SOLVER_MASK_TABLE_DIRECTORY"
+SOLVER_MASK_TABLE_LIMIT_KEY = "SOLVER_MASK_TABLE_LIMIT"
+
 # MongoDB
 MONGO_USERNAME_KEY = "MONGO_USERNAME"
 MONGO_PASSWORD_KEY = "MONGO_PASSWORD"  # noqa: S105
@@ -7,17 +7,22 @@ Init file for the data models.
 from falcon_formation.data_models.guest import Guest
 from falcon_formation.data_models.member import Member
 from falcon_formation.data_models.player import Player
+from falcon_formation.data_models.player_constraint import ConstraintKind, PlayerConstraint
 from falcon_formation.data_models.position import Position
 from falcon_formation.data_models.skill import Skill
+from falcon_formation.data_models.solved_roster import SolvedRoster
 from falcon_formation.data_models.team_distribution import TeamDistribution, TeamDistributionMetrics
 from falcon_formation.data_models.team_metadata import TeamMetadata
 
 __all__ = [
+    "ConstraintKind",
     "Guest",
     "Member",
     "Player",
+    "PlayerConstraint",
     "Position",
     "Skill",
+    "SolvedRoster",
     "TeamDistribution",
     "TeamDistributionMetrics",
     "TeamMetadata",
@@ -48,6 +48,18 @@ class Player(ABC):
             )
             raise ValueError(msg)
 
+    @property
+    def identifier(self: Player) -> str:
+        """Return the identifier of the player, which is unique within the players of an activity.
+
+        Args:
+            self (Player): The Player object.
+
+        Returns:
+            str: The member id or the guest name, prefixed with the type of the player.
+        """
+        return f"{type(self).__name__.lower()}:{self.to_dict()['_id']}"
+
     @abstractmethod
     def to_dict(self) -> dict[str, str]:
         """Return the player data as a dictionary."""
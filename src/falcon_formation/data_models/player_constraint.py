@@ -0,0 +1,81 @@
+"""
+Player constraint data model.
+
+Constraints are hard rules for the team distributions, such as siblings sharing a car being in the same team.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from enum import StrEnum
+
+
+class ConstraintKind(StrEnum):
+    """Enum class for the kinds of player constraints."""
+
+    KEEP_TOGETHER = "Keep together"
+    KEEP_APART = "Keep apart"
+
+
+@dataclass()
+class PlayerConstraint:
+    """Data class for storing data of a constraint between two players.
+
+    The players are referred to by their identifiers, so the constraint applies whenever both of them are registered.
+    """
+
+    kind: str
+    first_player: str
+    second_player: str
+
+    def __post_init__(self: PlayerConstraint) -> None:
+        """Validate the player constraint data.
+
+        Args:
+            self (PlayerConstraint): The PlayerConstraint object.
+
+        Raises:
+            ValueError: If the player constraint data has an invalid value.
+        """
+        if self.kind not in list(map(str, ConstraintKind)):
+            msg = f"Invalid constraint kind: {self.kind}\nValid constraint kinds: {list(map(str, ConstraintKind))}"
+            raise ValueError(msg)
+
+        if self.first_player == self.second_player:
+            msg = f"Invalid constraint between the same player: {self.first_player}"
+            raise ValueError(msg)
+
+    def to_dict(self: PlayerConstraint) -> dict[str, str]:
+        """Return the player constraint data as a dictionary.
+
+        Args:
+            self (PlayerConstraint): The player constraint object.
+
+        Returns:
+            dict[str, str]: The player constraint data as a dictionary.
+        """
+        first_player, second_player = sorted((self.first_player, self.second_player))
+        return {
+            "_id": f"{self.kind}|{first_player}|{second_player}",
+            "kind": self.kind,
+            "first_player": self.first_player,
+            "second_player": self.second_player,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, str]) -> PlayerConstraint:
+        """Return the player constraint data from a dictionary.
+
+        Args:
+            data (dict[str, str]): The player constraint data as a dictionary.
+
+        Returns:
+            PlayerConstraint: The player constraint object.
+        """
+        return cls(
+            kind=data["kind"],
+            first_player=data["first_player"],
+            second_player=data["second_player"],
+        )
@@ -0,0 +1,69 @@
+"""
+Solved roster data model.
+
+Rosters with the same (position, skill) pairs have the same optimal team combinations up to swapping identical
+players, so optimal splits are stored per roster signature and reused for any team and date.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from falcon_formation.data_models.team_distribution import TeamDistributionMetrics
+
+
+@dataclass()
+class SolvedRoster:
+    """Data class for storing data of the optimal splits of a roster signature."""
+
+    signature: str
+    metrics: TeamDistributionMetrics
+    # The number of players of each (position, skill) class in team one, with the classes in sorted order, for every
+    # distinct optimal split found.
+    class_count_patterns: list[list[int]]
+
+    def to_dict(self: SolvedRoster) -> dict[str, str]:
+        """Return the solved roster data as a dictionary.
+
+        Args:
+            self (SolvedRoster): The solved roster object.
+
+        Returns:
+            dict[str, str]: The solved roster data as a dictionary.
+        """
+        return {
+            "_id": self.signature,
+            "goalie_number_difference": str(self.metrics.goalie_number_difference),
+            "defense_number_difference": str(self.metrics.defense_number_difference),
+            "skill_difference": str(self.metrics.skill_difference),
+            "defense_skill_difference": str(self.metrics.defense_skill_difference),
+            "class_count_patterns": ";".join(
+                ",".join(map(str, class_counts)) for class_counts in self.class_count_patterns
+            ),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, str]) -> SolvedRoster:
+        """Return the solved roster data from a dictionary.
+
+        Args:
+            data (dict[str, str]): The solved roster data as a dictionary.
+
+        Returns:
+            SolvedRoster: The solved roster object.
+        """
+        return cls(
+            signature=data["_id"],
+            metrics=TeamDistributionMetrics(
+                goalie_number_difference=int(data["goalie_number_difference"]),
+                defense_number_difference=int(data["defense_number_difference"]),
+                skill_difference=int(data["skill_difference"]),
+                defense_skill_difference=int(data["defense_skill_difference"]),
+            ),
+            class_count_patterns=[
+                [int(count) for count in class_counts.split(",") if count]
+                for class_counts in data["class_count_patterns"].split(";")
+            ],
+        )
@@ -6,14 +6,17 @@ Team distribution data model.
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from falcon_formation.data_models import Guest, Member, Player
 
 
 @dataclass(eq=True, order=True, frozen=True)
 class TeamDistributionMetrics:
-    """Data class for storing data of team distribution metrics."""
+    """Data class for storing data of team distribution metrics.
+
+    Every metric is the difference between the largest and the smallest team.
+    """
 
     goalie_number_difference: int
     defense_number_difference: int
@@ -29,38 +32,65 @@ class TeamDistribution:
     team_1: list[Player]
     team_2: list[Player]
     metrics: TeamDistributionMetrics
+    proven_optimal: bool = True
+    other_teams: list[list[Player]] = field(default_factory=list)
+    # Identifiers of the players of team one of every stored optimal team combination, and the one currently shown.
+    alternatives: list[list[str]] = field(default_factory=list)
+    alternative_index: int = 0
+    # Fingerprint of the registered players the teams were created from.
+    roster_fingerprint: str = ""
+    # Identifiers of the players of every forward line and defense pair of every team.
+    lines: list[list[str]] = field(default_factory=list)
+
+    @property
+    def teams(self: TeamDistribution) -> list[list[Player]]:
+        """Return every team, including the teams after the first two.
 
-    def to_dict(self: TeamDistribution) -> dict[str, str | dict[str, list[dict[str, str]]]]:
+        Args:
+            self (TeamDistribution): The team distribution object.
+
+        Returns:
+            list[list[Player]]: The teams.
+        """
+        return [self.team_1, self.team_2, *self.other_teams]
+
+    def to_dict(self: TeamDistribution) -> dict[str, str | dict[str, list[dict[str, str]]] | list[list[str]]]:
         """Return the team distribution data as a dictionary.
 
         Args:
             self (TeamDistribution): The team distribution object.
 
         Returns:
-            dict[str, str | dict[str, list[dict[str, str]]]]: The team distribution data as a dictionary.
+            dict[str, str | dict[str, list[dict[str, str]]] | list[list[str]]]: The team distribution data as a
+                dictionary.
         """
         return {
             "_id": self.date,
-            "team_1": {
-                "members": [player.to_dict() for player in self.team_1 if isinstance(player, Member)],
-                "guests": [player.to_dict() for player in self.team_1 if isinstance(player, Guest)],
-            },
-            "team_2": {
-                "members": [player.to_dict() for player in self.team_2 if isinstance(player, Member)],
-                "guests": [player.to_dict() for player in self.team_2 if isinstance(player, Guest)],
+            **{
+                f"team_{team_number}": {
+                    "members": [player.to_dict() for player in team if isinstance(player, Member)],
+                    "guests": [player.to_dict() for player in team if isinstance(player, Guest)],
+                }
+                for team_number, team in enumerate(self.teams, start=1)
             },
             "goalie_number_difference": str(self.metrics.goalie_number_difference),
             "defense_number_difference": str(self.metrics.defense_number_difference),
             "skill_difference": str(self.metrics.skill_difference),
             "defense_skill_difference": str(self.metrics.defense_skill_difference),
+            "proven_optimal": str(self.proven_optimal),
+            "alternatives": self.alternatives,
+            "alternative_index": str(self.alternative_index),
+            "roster_fingerprint": self.roster_fingerprint,
+            "lines": self.lines,
         }
 
     @classmethod
-    def from_dict(cls, data: dict[str, str | dict[str, list[dict[str, str]]]]) -> TeamDistribution:
+    def from_dict(cls, data: dict[str, str | dict[str, list[dict[str, str]]] | list[list[str]]]) -> TeamDistribution:
         """Return the team distribution data from a dictionary.
 
         Args:
-            data (dict[str, str | dict[str, list[dict[str, str]]]): The team distribution data as a dictionary.
+            data (dict[str, str | dict[str, list[dict[str, str]]] | list[list[str]]]): The team distribution data as
+                a dictionary.
 
         Returns:
             TeamDistribution: The team distribution object.
@@ -85,9 +115,21 @@ class TeamDistribution:
                 skill_difference=int(data["skill_difference"]),
                 defense_skill_difference=int(data["defense_skill_difference"]),
             )
+        other_teams: list[list[Player]] = []
+        while isinstance(other_team := data.get(f"team_{len(other_teams) + 3}"), dict):
+            other_teams.append(
+                [Member.from_dict(p) for p in other_team["members"]]
+                + [Guest.from_dict(p) for p in other_team["guests"]],
+            )
         return cls(
             date=str(data["_id"]),
             team_1=team_1_members + team_1_guests,
             team_2=team_2_members + team_2_guests,
             metrics=team_distribution_metrics,
+            proven_optimal=data.get("proven_optimal", "True") == "True",
+            other_teams=other_teams,
+            alternatives=alternatives if isinstance(alternatives := data.get("alternatives", []), list) else [],
+            alternative_index=int(str(data.get("alternative_index", 0))),
+            roster_fingerprint=str(data.get("roster_fingerprint", "")),
+            lines=lines if isinstance(lines := data.get("lines", []), list) else [],
         )
@@ -20,6 +20,15 @@ class TeamMetadata:
     jersey_color_1: str = ""
     jersey_color_2: str = ""
     telegram_chat_id: int = 0
+    solver_time_budget: int = 10
+    number_of_teams: int = 2
+    number_of_alternatives: int = 5
+    rotate_teammates: bool = False
+    # Comma separated levels of weighted metric names, empty for the ordering of TeamDistributionMetrics.
+    objective: str = ""
+    # Largest number of forwards in a line and defenses in a pair of each team, lines are not formed for zero.
+    forwards_per_line: int = 0
+    defenses_per_line: int = 0
 
     def to_dict(self: TeamMetadata) -> dict[str, str]:
         """Return the team metadata as a dictionary for serialization.
@@ -37,6 +46,13 @@ class TeamMetadata:
             "jersey_color_1": self.jersey_color_1,
             "jersey_color_2": self.jersey_color_2,
             "telegram_chat_id": str(self.telegram_chat_id),
+            "solver_time_budget": str(self.solver_time_budget),
+            "number_of_teams": str(self.number_of_teams),
+            "number_of_alternatives": str(self.number_of_alternatives),
+            "rotate_teammates": str(self.rotate_teammates),
+            "objective": self.objective,
+            "forwards_per_line": str(self.forwards_per_line),
+            "defenses_per_line": str(self.defenses_per_line),
         }
 
     @classmethod
@@ -56,4 +72,11 @@ class TeamMetadata:
             jersey_color_1=data.get("jersey_color_1", ""),
             jersey_color_2=data.get("jersey_color_2", ""),
             telegram_chat_id=int(data.get("telegram_chat_id", 0)),
+            solver_time_budget=int(data.get("solver_time_budget", 10)),
+            number_of_teams=int(data.get("number_of_teams", 2)),
+            number_of_alternatives=int(data.get("number_of_alternatives", 5)),
+            rotate_teammates=data.get("rotate_teammates", "False") == "True",
+            objective=data.get("objective", ""),
+            forwards_per_line=int(data.get("forwards_per_line", 0)),
+            defenses_per_line=int(data.get("defenses_per_line", 0)),
         )
@@ -8,12 +8,22 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Any
 
+from pymongo import UpdateOne
 from pymongo.mongo_client import MongoClient
 
-from falcon_formation.data_models import Guest, Member, TeamDistribution, TeamMetadata
+from falcon_formation.data_models import (
+    Guest,
+    Member,
+    PlayerConstraint,
+    SolvedRoster,
+    TeamDistribution,
+    TeamMetadata,
+)
 
 if TYPE_CHECKING:
-    from pymongo.results import DeleteResult, InsertOneResult, UpdateResult
+    from collections.abc import Mapping
+
+    from pymongo.results import BulkWriteResult, DeleteResult, InsertOneResult, UpdateResult
 
 
 class FalconFormationDatabase:
@@ -21,10 +31,13 @@ class FalconFormationDatabase:
 
     TEAM_METADATA_DATABASE_NAME = "falcon_formation"
     TEAM_METADATA_COLLECTION_NAME = "team_metadata"
+    SOLVED_ROSTER_COLLECTION_NAME = "solved_rosters"
 
     MEMBER_COLLECTION_NAME = "members"
     GUEST_COLLECTION_NAME = "guests"
     TEAM_DISTRIBUTION_COLLECTION_NAME = "team_distributions"
+    TEAMMATE_PAIR_COLLECTION_NAME = "teammate_pairs"
+    PLAYER_CONSTRAINT_COLLECTION_NAME = "player_constraints"
 
     def __init__(
         self: FalconFormationDatabase,
@@ -47,6 +60,10 @@ class FalconFormationDatabase:
         self.team_metadata_collection = self.client[self.TEAM_METADATA_DATABASE_NAME][
             self.TEAM_METADATA_COLLECTION_NAME
         ]
+        # Solved rosters are shared by every team.
+        self.solved_roster_collection = self.client[self.TEAM_METADATA_DATABASE_NAME][
+            self.SOLVED_ROSTER_COLLECTION_NAME
+        ]
 
     # TeamMetadata
     def insert_team_metadata(self: FalconFormationDatabase, team_metadata: TeamMetadata) -> InsertOneResult:
@@ -136,17 +153,41 @@ class FalconFormationDatabase:
         team_collection = self.client[str(team_id)][f"{self.GUEST_COLLECTION_NAME}_{date}"]
         return sorted([Guest.from_dict(data) for data in team_collection.find()], key=lambda guest: guest.name)
 
+    # PlayerConstraint
+    def insert_player_constraint(
+        self: FalconFormationDatabase,
+        team_id: int,
+        player_constraint: PlayerConstraint,
+    ) -> InsertOneResult:
+        """Insert a player constraint into the database."""
+        team_collection = self.client[str(team_id)][self.PLAYER_CONSTRAINT_COLLECTION_NAME]
+        return team_collection.insert_one(player_constraint.to_dict())
+
+    def delete_player_constraint(
+        self: FalconFormationDatabase,
+        team_id: int,
+        player_constraint: PlayerConstraint,
+    ) -> DeleteResult:
+        """Delete a player constraint from the database."""
+        team_collection = self.client[str(team_id)][self.PLAYER_CONSTRAINT_COLLECTION_NAME]
+        return team_collection.delete_one({"_id": player_constraint.to_dict()["_id"]})
+
+    def load_player_constraint_collection(self: FalconFormationDatabase, team_id: int) -> list[PlayerConstraint]:
+        """Load all player constraints from the database."""
+        team_collection = self.client[str(team_id)][self.PLAYER_CONSTRAINT_COLLECTION_NAME]
+        return [PlayerConstraint.from_dict(data) for data in team_collection.find()]
+
     # TeamDistribution
     def insert_or_update_team_distribution(
         self: FalconFormationDatabase,
         team_id: int,
         team_distribution: TeamDistribution,
     ) -> UpdateResult:
-        """Insert or update a team distribution in the database."""
+        """Insert or replace a team distribution in the database, dropping the teams of a previous distribution."""
         team_collection = self.client[str(team_id)][self.TEAM_DISTRIBUTION_COLLECTION_NAME]
-        return team_collection.update_one(
+        return team_collection.replace_one(
             {"_id": team_distribution.date},
-            {"$set": team_distribution.to_dict()},
+            team_distribution.to_dict(),
             upsert=True,
         )
 
@@ -161,3 +202,63 @@ class FalconFormationDatabase:
         if data is not None:
             return TeamDistribution.from_dict(data)
         return None
+
+    # Teammate pairs
+    def update_teammate_pair_counts(
+        self: FalconFormationDatabase,
+        team_id: int,
+        teammate_pair_count_changes: Mapping[tuple[str, str], int],
+    ) -> BulkWriteResult | None:
+        """Increment the number of times the sorted pairs of player identifiers were teammates in the database.
+
+        The pairs are updated in a single unordered bulk write, nothing is written if no count changes.
+        """
+        team_collection = self.client[str(team_id)][self.TEAMMATE_PAIR_COLLECTION_NAME]
+        requests = [
+            UpdateOne(
+                {"_id": "|".join(pair)},
+                {"$inc": {"count": change}, "$setOnInsert": {"players": list(pair)}},
+                upsert=True,
+            )
+            for pair, change in teammate_pair_count_changes.items()
+            if change != 0
+        ]
+        if not requests:
+            return None
+        return team_collection.bulk_write(requests, ordered=False)
+
+    def load_teammate_pair_counts(
+        self: FalconFormationDatabase,
+        team_id: int,
+        identifiers: list[str],
+    ) -> dict[tuple[str, str], int]:
+        """Load the number of times the sorted pairs of the player identifiers were teammates from the database."""
+        team_collection = self.client[str(team_id)][self.TEAMMATE_PAIR_COLLECTION_NAME]
+        sorted_identifiers = sorted(identifiers)
+        pair_ids = [
+            f"{first}|{second}"
+            for index, first in enumerate(sorted_identifiers)
+            for second in sorted_identifiers[index + 1 :]
+        ]
+        return {
+            (data["players"][0], data["players"][1]): int(data["count"])
+            for data in team_collection.find({"_id": {"$in": pair_ids}})
+            if data["count"] > 0
+        }
+
+    # SolvedRoster
+    def insert_or_update_solved_roster(
+        self: FalconFormationDatabase,
+        solved_roster: SolvedRoster,
+    ) -> UpdateResult:
+        """Insert or update a solved roster in the database."""
+        return self.solved_roster_collection.update_one(
+            {"_id": solved_roster.signature},
+            {"$set": solved_roster.to_dict()},
+            upsert=True,
+        )
+
+    def load_solved_roster(self: FalconFormationDatabase, signature: str) -> SolvedRoster | None:
+        """Load a solved roster from the database."""
+        data = self.solved_roster_collection.find_one({"_id": signature})
+        return SolvedRoster.from_dict(data) if data else None
@@ -7,10 +7,15 @@ Helper functions for creating hockey teams.
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import logging
 import os
 import random
+import time
+from dataclasses import astuple, replace
 from datetime import UTC, datetime, timedelta
-from itertools import combinations
+from functools import partial
+from pathlib import Path
 from typing import TYPE_CHECKING
 
 from falcon_formation import (
@@ -18,19 +23,63 @@ from falcon_formation import (
     HOLDSPORT_USERNAME_KEY,
     MONGO_PASSWORD_KEY,
     MONGO_USERNAME_KEY,
+    SOLVER_MASK_TABLE_DIRECTORY_KEY,
+    SOLVER_MASK_TABLE_LIMIT_KEY,
+    SOLVER_WORKERS_KEY,
     # TELEGRAM_TOKEN_KEY,
 )
-from falcon_formation.data_models import Guest, Member, TeamDistribution, TeamDistributionMetrics
+from falcon_formation.data_models import (
+    Guest,
+    Member,
+    PlayerConstraint,
+    Position,
+    TeamDistribution,
+    TeamDistributionMetrics,
+    TeamMetadata,
+)
 from falcon_formation.database import FalconFormationDatabase
 from falcon_formation.holdsport_api import HoldsportAPI
+from falcon_formation.solver import (
+    SAMPLES_PER_ALTERNATIVE,
+    Objective,
+    ReservoirSampler,
+    SolvedRosterCache,
+    SolverResult,
+    SolverStrategy,
+    apply_solved_roster,
+    calculate_metrics_lower_bound,
+    calculate_swap_impacts,
+    count_teammate_pairs,
+    create_roster_signature,
+    create_solved_roster,
+    create_teammate_pair_matrix,
+    estimate_solver_runtimes,
+    find_diverse_alternatives,
+    form_lines,
+    generate_team_one_indices,
+    repair_team_combination,
+    sample_optimal_team_combinations,
+    select_solver_strategy,
+    solve_anytime,
+    solve_batched,
+    solve_bitmask,
+    solve_branch_and_bound,
+    solve_dynamic_programming,
+    solve_gray_code,
+    solve_k_way,
+    solve_multiset,
+    solve_parallel,
+    solve_stratified,
+)
 
 # from falcon_formation.telegram_api import TelegramAPI  # noqa: ERA001
 
 if TYPE_CHECKING:
-    from collections.abc import Generator
+    from collections.abc import Callable, Collection, Generator, Sequence
 
     from falcon_formation.data_models import Player
 
+logger = logging.getLogger(__name__)
 
 database = FalconFormationDatabase(
     host="mongo",
@@ -42,24 +91,90 @@ holdsport_api = HoldsportAPI(
     login=str(os.getenv(HOLDSPORT_USERNAME_KEY)),
     password=str(os.getenv(HOLDSPORT_PASSWORD_KEY)),
 )
+solved_roster_cache = SolvedRosterCache()
+# The fields of the team metadata the team distributions depend on.
+SOLVER_SETTING_NAMES = (
+    "solver_time_budget",
+    "number_of_teams",
+    "number_of_alternatives",
+    "rotate_teammates",
+    "objective",
+    "forwards_per_line",
+    "defenses_per_line",
+)
+# The exact solvers comparing the team combinations by an objective, the others rely on the ordering of
+# TeamDistributionMetrics to prune them.
+OBJECTIVE_SOLVER_STRATEGIES = frozenset({SolverStrategy.BRUTE_FORCE, SolverStrategy.BATCHED})
+# The solvers breaking the ties of the metrics by the repeated teammate pairs.
+ROTATING_SOLVER_STRATEGIES = frozenset({SolverStrategy.BATCHED})
 # telegram_api = TelegramAPI(token=str(os.getenv(TELEGRAM_TOKEN_KEY)))  # noqa: ERA001
 
 
-def create_teams(team_id: int) -> None:
+def create_teams(team_id: int, force: bool = False) -> None:  # noqa: FBT001, FBT002
     """Create the teams for the given team id.
 
     Args:
         team_id (int): The id of the team in the Holdsport system.
+        force (bool, optional): Whether to create the teams even if the registered players, the solver settings of
+            the team metadata and the player constraints did not change since the teams of the date were created.
+            Defaults to False.
     """
     date = str((datetime.now(tz=UTC) + timedelta(hours=2)).date())
 
+    team_metadata = database.load_team_metadata(team_id)
+
     players: list[Player] = []
     players.extend(load_registered_members(team_id, date))
     players.extend(load_registered_guests(team_id, date))
-    create_team_distribution(players, team_id, date)
+    if not force and _is_roster_unchanged(team_id, date, players, team_metadata):
+        return
+    create_team_distribution(players, team_id, date, team_metadata=team_metadata)
+
 
+def create_upcoming_teams(team_id: int, number_of_dates: int = 4, force: bool = False) -> list[str]:  # noqa: FBT001, FBT002
+    """Create the teams for every upcoming activity of the given team id in one batch.
 
-def get_teams(team_id: int, show_skill: bool, show_position: bool, show_guest: bool) -> str:  # noqa: FBT001
+    The attendance of every upcoming activity is queried from Holdsport concurrently, and the team metadata is loaded
+    once and used for every date. Dates without registered players are skipped. The teams of the dates are solved one
+    after the other.
+
+    Args:
+        team_id (int): The id of the team in the Holdsport system.
+        number_of_dates (int, optional): The number of upcoming activities. Defaults to 4. Maximum is 10.
+        force (bool, optional): Whether to create the teams even if the registered players, the solver settings of
+            the team metadata and the player constraints did not change since the teams of a date were created.
+            Defaults to False.
+
+    Returns:
+        list[str]: The dates of the activities the teams were created for, in format "YYYY-MM-DD".
+    """
+    team_metadata = database.load_team_metadata(team_id)
+    if team_metadata is None:
+        return []
+    attendance = asyncio.run(_load_upcoming_attendance(team_id, team_metadata.activity_name, number_of_dates))
+
+    created_dates: list[str] = []
+    for date, registered_members in attendance.items():
+        players: list[Player] = []
+        players.extend(load_registered_members(team_id, date, registered_members))
+        players.extend(load_registered_guests(team_id, date))
+        if not players:
+            logger.info("No players are registered for team %d on %s, no teams are created.", team_id, date)
+            continue
+        if not force and _is_roster_unchanged(team_id, date, players, team_metadata):
+            continue
+        create_team_distribution(players, team_id, date, team_metadata=team_metadata)
+        created_dates.append(date)
+    return created_dates
+
+
+def get_teams(
+    team_id: int,
+    show_skill: bool,  # noqa: FBT001
+    show_position: bool,  # noqa: FBT001
+    show_guest: bool,  # noqa: FBT001
+    date: str | None = None,
+) -> str:
     """Get the previously created teams for the given team id.
 
     Args:
@@ -67,11 +182,13 @@ def get_teams(team_id: int, show_skill: bool, show_position: bool, show_guest: b
         show_skill (bool): Whether to show the skill.
         show_position (bool): Whether to show the position.
         show_guest (bool): Whether to show the guest emoji.
+        date (str | None, optional): The date of the activity in format "YYYY-MM-DD". Defaults to None, the date the
+            teams are created for by create_teams.
 
     Returns:
         str: The formatted string of the teams.
     """
-    date = str((datetime.now(tz=UTC) + timedelta(hours=2)).date())
+    date = date or str((datetime.now(tz=UTC) + timedelta(hours=2)).date())
 
     team_metadata = database.load_team_metadata(team_id)
     if team_metadata is None:
@@ -82,26 +199,239 @@ def get_teams(team_id: int, show_skill: bool, show_position: bool, show_guest: b
 
     output = ""
     output = f"Date: {team_distribution.date}\n\n"
-    output += f"Team {team_metadata.jersey_color_1}: ({len(team_distribution.team_1)})\n"
-    output += (
-        "\n".join([player.to_string(show_skill, show_position, show_guest) for player in team_distribution.team_1])
-        + "\n\n"
-    )
-
-    output += f"Team {team_metadata.jersey_color_2}: ({len(team_distribution.team_2)})\n"
-    output += (
-        "\n".join([player.to_string(show_skill, show_position, show_guest) for player in team_distribution.team_2])
-        + "\n\n"
-    )
+    # Teams after the first two are named by their number.
+    jersey_colors = [team_metadata.jersey_color_1, team_metadata.jersey_color_2]
+    for team_number, team in enumerate(team_distribution.teams, start=1):
+        team_name = jersey_colors[team_number - 1] if team_number <= len(jersey_colors) else str(team_number)
+        output += f"Team {team_name}: ({len(team)})\n"
+        output += "\n".join([player.to_string(show_skill, show_position, show_guest) for player in team]) + "\n\n"
+        if team_lines := _format_lines(team, team_distribution.lines):
+            output += team_lines + "\n\n"
 
     output += f"Goalie number difference: {team_distribution.metrics.goalie_number_difference}\n"
     output += f"Defense number difference: {team_distribution.metrics.defense_number_difference}\n"
     output += f"Skill difference: {team_distribution.metrics.skill_difference}\n"
     output += f"Defense skill difference: {team_distribution.metrics.defense_skill_difference}"
+    if not team_distribution.proven_optimal:
+        output += "\n\nThe teams are the best found within the time limit, they are not proven to be optimal."
+
+    # New members are not inserted, so showing the teams does not change the database.
+    players: list[Player] = []
+    players.extend(load_registered_members(team_id, date, insert_new_members=False))
+    players.extend(load_registered_guests(team_id, date))
+    player_constraints = database.load_player_constraint_collection(team_id)
+    # Team distributions saved before the fingerprint was stored are compared by their players.
+    roster_fingerprint = team_distribution.roster_fingerprint or _create_roster_fingerprint(
+        [player for team in team_distribution.teams for player in team],
+        team_metadata,
+        player_constraints,
+    )
+    if _create_roster_fingerprint(players, team_metadata, player_constraints) != roster_fingerprint:
+        output += (
+            "\n\nThe teams are stale, the registered players, the team settings or the player constraints changed "
+            "since they were created."
+        )
 
     return output
 
 
+def reshuffle_teams(team_id: int) -> str:
+    """Show the next stored alternative of the previously created teams for the given team id.
+
+    The alternatives are equally good team combinations stored when the teams were created, so no solver is run.
+
+    Args:
+        team_id (int): The id of the team in the Holdsport system.
+
+    Returns:
+        str: The message about the result of the reshuffle.
+    """
+    date = str((datetime.now(tz=UTC) + timedelta(hours=2)).date())
+
+    team_distribution = database.load_team_distribution(team_id, date)
+    if team_distribution is None:
+        return "No team distribution found."
+    if len(team_distribution.alternatives) < 2:  # noqa: PLR2004
+        return "No alternative team distribution found."
+
+    players: list[Player] = []
+    players.extend(load_registered_members(team_id, date))
+    players.extend(load_registered_guests(team_id, date))
+    stored_players = [*team_distribution.team_1, *team_distribution.team_2]
+    if _create_roster_fingerprint(players) != _create_roster_fingerprint(stored_players):
+        return "The registered players changed since the teams were created, please create the teams again."
+
+    team_distribution.alternative_index = (team_distribution.alternative_index + 1) % len(
+        team_distribution.alternatives,
+    )
+    previous_teams = team_distribution.teams
+    team_1_identifiers = set(team_distribution.alternatives[team_distribution.alternative_index])
+    team_1 = tuple(player for player in stored_players if player.identifier in team_1_identifiers)
+    team_2 = tuple(player for player in stored_players if player.identifier not in team_1_identifiers)
+    team_distribution.team_1, team_distribution.team_2 = _assign_me_to_team_one((team_1, team_2))
+    team_distribution.lines = _form_lines(team_distribution.teams, database.load_team_metadata(team_id))
+    database.insert_or_update_team_distribution(team_id, team_distribution)
+    _update_teammate_pair_counts(team_id, team_distribution.teams, previous_teams)
+
+    return f"Showing alternative {team_distribution.alternative_index + 1} of {len(team_distribution.alternatives)}."
+
+
+def get_swap_impacts(team_id: int) -> str:
+    """Get the change of the metrics for every single swap between the previously created teams.
+
+    Args:
+        team_id (int): The id of the team in the Holdsport system.
+
+    Returns:
+        str: The formatted string of the swaps, starting with the swap giving the best metrics.
+    """
+    date = str((datetime.now(tz=UTC) + timedelta(hours=2)).date())
+
+    team_distribution = database.load_team_distribution(team_id, date)
+    if team_distribution is None:
+        return "No team distribution found."
+    if team_distribution.other_teams:
+        return "Swaps are only available for two teams."
+
+    metrics, swap_impacts = calculate_swap_impacts((team_distribution.team_1, team_distribution.team_2))
+    swaps = sorted(
+        ((row, column) for row in range(swap_impacts.shape[0]) for column in range(swap_impacts.shape[1])),
+        key=lambda swap: tuple(swap_impacts[swap].tolist()),
+    )
+
+    output = f"Date: {team_distribution.date}\n"
+    output += (
+        f"Current metrics: {metrics.goalie_number_difference}, {metrics.defense_number_difference}, "
+        f"{metrics.skill_difference}, {metrics.defense_skill_difference}\n\n"
+    )
+    for row, column in swaps:
+        goalie_number_change, defense_number_change, skill_change, defense_skill_change = swap_impacts[row, column]
+        output += (
+            f"{team_distribution.team_1[row].name} <-> {team_distribution.team_2[column].name}: "
+            f"goalie number {goalie_number_change:+d}, defense number {defense_number_change:+d}, "
+            f"skill {skill_change:+d}, defense skill {defense_skill_change:+d}\n"
+        )
+
+    return output.rstrip("\n")
+
+
+def apply_swap(team_id: int, player_1_name: str, player_2_name: str) -> str:
+    """Swap two players between the previously created teams and save the new metrics, without running a solver.
+
+    Args:
+        team_id (int): The id of the team in the Holdsport system.
+        player_1_name (str): The name or the identifier of a player of one team.
+        player_2_name (str): The name or the identifier of a player of the other team.
+
+    Returns:
+        str: The message about the result of the swap.
+    """
+    date = str((datetime.now(tz=UTC) + timedelta(hours=2)).date())
+
+    team_distribution = database.load_team_distribution(team_id, date)
+    if team_distribution is None:
+        return "No team distribution found."
+    if team_distribution.other_teams:
+        return "Swaps are only available for two teams."
+
+    row = _find_player_index(team_distribution.team_1, player_1_name)
+    column = _find_player_index(team_distribution.team_2, player_2_name)
+    if row is None or column is None:
+        row = _find_player_index(team_distribution.team_1, player_2_name)
+        column = _find_player_index(team_distribution.team_2, player_1_name)
+    if row is None or column is None:
+        return "The players are not in different teams."
+
+    player_1_name, player_2_name = team_distribution.team_1[row].name, team_distribution.team_2[column].name
+    metrics, swap_impacts = calculate_swap_impacts((team_distribution.team_1, team_distribution.team_2))
+    swapped_metrics = TeamDistributionMetrics(
+        *(int(metric + change) for metric, change in zip(astuple(metrics), swap_impacts[row, column], strict=True)),
+    )
+
+    previous_teams = team_distribution.teams
+    team_1 = (*team_distribution.team_1[:row], team_distribution.team_2[column], *team_distribution.team_1[row + 1 :])
+    team_2 = (
+        *team_distribution.team_2[:column],
+        team_distribution.team_1[row],
+        *team_distribution.team_2[column + 1 :],
+    )
+    team_distribution.team_1, team_distribution.team_2 = _assign_me_to_team_one((team_1, team_2))
+    team_distribution.metrics = swapped_metrics
+    team_distribution.lines = _form_lines(team_distribution.teams, database.load_team_metadata(team_id))
+    team_distribution.proven_optimal = team_distribution.proven_optimal and swapped_metrics == metrics
+    # The stored alternatives do not contain the manual swap.
+    team_distribution.alternatives = []
+    team_distribution.alternative_index = 0
+    database.insert_or_update_team_distribution(team_id, team_distribution)
+    _update_teammate_pair_counts(team_id, team_distribution.teams, previous_teams)
+
+    return f"Swapped {player_1_name} and {player_2_name}."
+
+
+def get_player_constraints(team_id: int) -> str:
+    """Get the formatted string of the player constraints for the given team id.
+
+    Args:
+        team_id (int): The id of the team in the Holdsport system.
+
+    Returns:
+        str: The formatted string of the player constraints, one per line.
+    """
+    player_constraints = database.load_player_constraint_collection(team_id)
+    if not player_constraints:
+        return "No player constraints found."
+    return "\n".join(
+        f"{player_constraint.kind}: {player_constraint.first_player} and {player_constraint.second_player}"
+        for player_constraint in player_constraints
+    )
+
+
+def add_player_constraint(team_id: int, kind: str, player_1: str, player_2: str) -> str:
+    """Add a constraint between two players, which applies to the teams whenever both of them are registered.
+
+    Args:
+        team_id (int): The id of the team in the Holdsport system.
+        kind (str): The kind of the constraint, "Keep together" or "Keep apart".
+        player_1 (str): The name or the identifier of a member, or of a guest registered for today.
+        player_2 (str): The name or the identifier of the other player.
+
+    Returns:
+        str: The message about the result of adding the constraint.
+    """
+    try:
+        player_constraint = _create_player_constraint(team_id, kind, player_1, player_2)
+    except ValueError as error:
+        return str(error)
+
+    constraint_ids = {constraint.to_dict()["_id"] for constraint in database.load_player_constraint_collection(team_id)}
+    if player_constraint.to_dict()["_id"] in constraint_ids:
+        return "The player constraint already exists."
+    database.insert_player_constraint(team_id, player_constraint)
+    return f"Added {kind.lower()} constraint for {player_1} and {player_2}."
+
+
+def remove_player_constraint(team_id: int, kind: str, player_1: str, player_2: str) -> str:
+    """Remove a constraint between two players.
+
+    Args:
+        team_id (int): The id of the team in the Holdsport system.
+        kind (str): The kind of the constraint, "Keep together" or "Keep apart".
+        player_1 (str): The name or the identifier of a member, or of a guest registered for today.
+        player_2 (str): The name or the identifier of the other player.
+
+    Returns:
+        str: The message about the result of removing the constraint.
+    """
+    try:
+        player_constraint = _create_player_constraint(team_id, kind, player_1, player_2)
+    except ValueError as error:
+        return str(error)
+
+    if database.delete_player_constraint(team_id, player_constraint).deleted_count == 0:
+        return "No such player constraint found."
+    return f"Removed {kind.lower()} constraint for {player_1} and {player_2}."
+
+
 def get_goalie_number(team_id: int) -> str:
     """Get the formatted string of the goalie number for the given team id.
 
@@ -134,23 +464,31 @@ def get_goalie_number(team_id: int) -> str:
     )
 
 
-def load_registered_members(team_id: int, date: str) -> list[Member]:
+def load_registered_members(
+    team_id: int,
+    date: str,
+    registered_members: list[dict[str, str]] | None = None,
+    *,
+    insert_new_members: bool = True,
+) -> list[Member]:
     """Query the registered members from Holdsport and load them from the database.
 
     Args:
         team_id (int): The id of the team in the Holdsport system.
         date (str): The date of the activity in format "YYYY-MM-DD".
+        registered_members (list[dict[str, str]] | None, optional): The registered members already queried from
+            Holdsport. Defaults to None, in which case they are queried.
+        insert_new_members (bool, optional): Whether to insert the registered members missing from the database.
+            Defaults to True.
 
     Returns:
         list[Member]: List of registered members.
     """
-    team_metadata = database.load_team_metadata(team_id)
-    if team_metadata is None:
-        return []
-    activity_id = asyncio.run(holdsport_api.get_activity_id(team_id, date, team_metadata.activity_name))
-    if activity_id is None:
-        return []
-    registered_members = asyncio.run(holdsport_api.get_users_attending_activity(activity_id))
+    if registered_members is None:
+        team_metadata = database.load_team_metadata(team_id)
+        if team_metadata is None:
+            return []
+        registered_members = asyncio.run(_load_attendance(team_id, date, team_metadata.activity_name))
 
     members: list[Member] = []
     for registered_member in registered_members:
@@ -159,7 +497,8 @@ def load_registered_members(team_id: int, date: str) -> list[Member]:
             members.append(member)
         else:
             new_member = Member.from_dict(registered_member)
-            database.insert_member(team_id, new_member)
+            if insert_new_members:
+                database.insert_member(team_id, new_member)
             members.append(new_member)
     return members
 
@@ -177,58 +516,402 @@ def load_registered_guests(team_id: int, date: str) -> list[Guest]:
     return database.load_guest_collection(team_id, date)
 
 
-def create_team_distribution(players: list[Player], team_id: int, date: str) -> None:
+def create_team_distribution(
+    players: list[Player],
+    team_id: int,
+    date: str,
+    solver_strategy: SolverStrategy = SolverStrategy.AUTO,
+    team_metadata: TeamMetadata | None = None,
+) -> None:
     """Create the team distribution based on the registered players.
 
-    The team distribution is randomly selected from the best team combinations.
+    The team distribution is sampled uniformly from the best team combinations.
+    If the players changed since the previous team distribution of the date, the previous teams are repaired instead,
+    unless the repaired teams are not proven optimal.
     The result is not returned as execution time can be substantial, but rather inserted into the database.
 
     Args:
         players (list[Player]): List of registered Members and Guests.
         team_id (int): The id of the team in the Holdsport system.
         date (str): The date of the activity in format "YYYY-MM-DD".
+        solver_strategy (SolverStrategy, optional): The solver used to find the best team combinations.
+            Defaults to SolverStrategy.AUTO, the solver with the smallest predicted runtime within the time budget.
+        team_metadata (TeamMetadata | None, optional): The team metadata already loaded from the database.
+            Defaults to None, in which case it is loaded.
     """
-    maximum_number_of_teams = 5000
-    best_team_combinations: list[tuple[tuple[Player, ...], tuple[Player, ...]]] = []
-    best_metrics: TeamDistributionMetrics | None = None
-
+    if team_metadata is None:
+        team_metadata = database.load_team_metadata(team_id)
+    previous_team_distribution = database.load_team_distribution(team_id, date)
     shuffled_players = players.copy()
     random.shuffle(shuffled_players)
 
-    for team_combination in _generate_every_team_combination(shuffled_players):
+    time_budget = team_metadata.solver_time_budget if team_metadata else TeamMetadata.solver_time_budget
+    number_of_alternatives = (
+        team_metadata.number_of_alternatives if team_metadata else TeamMetadata.number_of_alternatives
+    )
+    objective = _load_objective(team_id, team_metadata)
+    solvers = _create_solvers(team_id, team_metadata, shuffled_players, previous_team_distribution, objective)
+    rotate_teammates = team_metadata is not None and team_metadata.rotate_teammates
+    # Only the batched solver breaks ties by the teammate pairs, and only the brute force and the batched solvers
+    # compare by an objective, otherwise the anytime solver is used.
+    solver_strategy, solver_strategies = _restrict_solver_strategy(solver_strategy, objective, rotate_teammates)
+
+    player_constraints = database.load_player_constraint_collection(team_id)
+    identifiers = {player.identifier for player in shuffled_players}
+    constraints = [
+        constraint
+        for constraint in player_constraints
+        if constraint.first_player in identifiers and constraint.second_player in identifiers
+    ]
+
+    solver_result = None
+    number_of_teams = team_metadata.number_of_teams if team_metadata else TeamMetadata.number_of_teams
+    start_time = time.perf_counter()
+    # The k-way and the constrained branch-and-bound solvers keep the ordering of the metrics.
+    if number_of_teams > 2:  # noqa: PLR2004
+        if constraints:
+            logger.warning("Player constraints of team %d are ignored for more than two teams.", team_id)
+        solver_result = solve_k_way(shuffled_players, number_of_teams, time_budget)
+    elif constraints:
+        solver_result = solve_branch_and_bound(shuffled_players, constraints)
+        # Unsatisfiable constraints fall back to the selected solver.
+        if solver_result is None:
+            logger.warning("Player constraints of team %d on %s cannot be satisfied, they are ignored.", team_id, date)
+            constraints = []
+    elif (
+        objective.is_default
+        and not rotate_teammates
+        and previous_team_distribution is not None
+        and not previous_team_distribution.other_teams
+    ):
+        # The previous teams are repaired if they stay optimal. The repair does not know the teammate pairs, so the
+        # rotation always solves again.
+        solver_result = repair_team_combination(
+            (previous_team_distribution.team_1, previous_team_distribution.team_2),
+            shuffled_players,
+        )
+    if solver_result is None:
+        solve = partial(
+            _solve_with_strategy,
+            solvers,
+            solver_strategy,
+            latency_target=time_budget,
+            solver_strategies=solver_strategies,
+        )
+        # Optimal team combinations are cached by the (position, skill) classes of the players. The teammate rotation
+        # depends on the history of the team and the cached team combinations on the objective, so they are only
+        # shared without either.
+        shared = objective.is_default and not rotate_teammates
+        solver_result = (
+            _solve_with_cache(
+                shuffled_players,
+                solve,
+                number_of_samples=number_of_alternatives * SAMPLES_PER_ALTERNATIVE,
+                time_budget=time_budget,
+            )
+            if shared
+            else solve(shuffled_players)
+        )
+    if solver_result is None:
+        return
+    logger.info(
+        "Team distribution of %d players for team %d on %s: solved in %.3f seconds with %d constraints, %s.",
+        len(players),
+        team_id,
+        date,
+        time.perf_counter() - start_time,
+        len(constraints),
+        _describe_solver_result(solver_result),
+    )
+
+    alternatives: list[list[str]] = []
+    # Equally good but different team combinations are stored for reshuffling. They are neither constrained nor
+    # tie-broken by the teammate pairs, so they are only stored without constraints and the rotation.
+    if not solver_result.other_teams and not constraints and not rotate_teammates:
+        solver_result, alternatives = _find_alternatives(
+            shuffled_players,
+            solver_result,
+            number_of_alternatives,
+            objective,
+            time_budget - (time.perf_counter() - start_time),
+        )
+
+    teams = _assign_me_to_team_one((*solver_result.team_combination, *solver_result.other_teams))
+    team_distribution = TeamDistribution(
+        date=date,
+        team_1=teams[0],
+        team_2=teams[1],
+        metrics=solver_result.metrics,
+        proven_optimal=solver_result.proven_optimal,
+        other_teams=list(teams[2:]),
+        alternatives=alternatives,
+        roster_fingerprint=_create_roster_fingerprint(players, team_metadata, player_constraints),
+        lines=_form_lines(teams, team_metadata),
+    )
+    database.insert_or_update_team_distribution(team_id, team_distribution)
+    _update_teammate_pair_counts(
+        team_id,
+        team_distribution.teams,
+        previous_team_distribution.teams if previous_team_distribution else [],
+    )
+
+
+def _find_alternatives(
+    players: list[Player],
+    solver_result: SolverResult,
+    number_of_alternatives: int,
+    objective: Objective,
+    remaining_time_budget: float,
+) -> tuple[SolverResult, list[list[str]]]:
+    # The optimal team combinations are only sampled again if the solver did not and it fits in the time budget.
+    if not (solver_result.proven_optimal and len(solver_result.optimal_samples) > 1) and (
+        estimate_solver_runtimes(players)[SolverStrategy.DYNAMIC_PROGRAMMING] > remaining_time_budget
+    ):
+        return solver_result, []
+    solver_result, team_combinations = find_diverse_alternatives(
+        players,
+        solver_result,
+        number_of_alternatives,
+        objective,
+    )
+    return solver_result, [
+        [player.identifier for player in team_combination[0]] for team_combination in team_combinations
+    ]
+
+
+def _restrict_solver_strategy(
+    solver_strategy: SolverStrategy,
+    objective: Objective,
+    rotate_teammates: bool,  # noqa: FBT001
+) -> tuple[SolverStrategy, Collection[SolverStrategy] | None]:
+    # The automatic selection only picks from the exact solvers supporting the objective and the rotation.
+    solver_strategies: frozenset[SolverStrategy] | None = None
+    if not objective.is_default:
+        solver_strategies = OBJECTIVE_SOLVER_STRATEGIES
+    if rotate_teammates:
+        solver_strategies = ROTATING_SOLVER_STRATEGIES & (solver_strategies or ROTATING_SOLVER_STRATEGIES)
+    if solver_strategies is not None and solver_strategy not in solver_strategies:
+        solver_strategy = SolverStrategy.AUTO
+    return solver_strategy, solver_strategies
+
+
+def _create_solvers(
+    team_id: int,
+    team_metadata: TeamMetadata | None,
+    players: list[Player],
+    previous_team_distribution: TeamDistribution | None,
+    objective: Objective,
+) -> dict[SolverStrategy, Callable[[list[Player]], SolverResult | None]]:
+    time_budget = team_metadata.solver_time_budget if team_metadata else TeamMetadata.solver_time_budget
+    number_of_alternatives = (
+        team_metadata.number_of_alternatives if team_metadata else TeamMetadata.number_of_alternatives
+    )
+    # The parallel solver uses SOLVER_WORKERS processes, and the batched solver reads the team combinations from the
+    # tables in SOLVER_MASK_TABLE_DIRECTORY, if set, up to SOLVER_MASK_TABLE_LIMIT players.
+    number_of_workers = _load_number_of_workers()
+    mask_table_directory = os.getenv(SOLVER_MASK_TABLE_DIRECTORY_KEY)
+    solve_batched_with_mask_table = partial(
+        solve_batched,
+        mask_table_directory=Path(mask_table_directory) if mask_table_directory else None,
+        mask_table_limit=int(os.getenv(SOLVER_MASK_TABLE_LIMIT_KEY, "26")),
+        objective=objective,
+    )
+    solvers: dict[SolverStrategy, Callable[[list[Player]], SolverResult | None]] = {
+        SolverStrategy.BRUTE_FORCE: partial(_solve_brute_force, objective=objective),
+        SolverStrategy.BATCHED: solve_batched_with_mask_table,
+        SolverStrategy.BRANCH_AND_BOUND: solve_branch_and_bound,
+        SolverStrategy.STRATIFIED: solve_stratified,
+        SolverStrategy.DYNAMIC_PROGRAMMING: partial(
+            solve_dynamic_programming,
+            number_of_samples=number_of_alternatives * SAMPLES_PER_ALTERNATIVE,
+        ),
+        SolverStrategy.ANYTIME: partial(solve_anytime, time_budget=time_budget, objective=objective),
+        SolverStrategy.PARALLEL: partial(solve_parallel, number_of_workers=number_of_workers),
+        SolverStrategy.MULTISET: solve_multiset,
+        SolverStrategy.BITMASK: solve_bitmask,
+        SolverStrategy.GRAY_CODE: solve_gray_code,
+    }
+    if team_metadata is not None and team_metadata.rotate_teammates:
+        teammate_pair_counts = count_teammate_pairs([])
+        teammate_pair_counts.update(
+            database.load_teammate_pair_counts(team_id, [player.identifier for player in players]),
+        )
+        # The previous team distribution of the same date is replaced, so its teammate pairs are not repeated.
+        if previous_team_distribution is not None:
+            teammate_pair_counts.subtract(count_teammate_pairs(previous_team_distribution.teams))
+        solvers[SolverStrategy.BATCHED] = partial(
+            solve_batched_with_mask_table,
+            teammate_pair_matrix=create_teammate_pair_matrix(players, teammate_pair_counts),
+        )
+
+    return solvers
+
+
+def _load_number_of_workers() -> int | None:
+    return int(os.getenv(SOLVER_WORKERS_KEY, "0")) or None
+
+
+def _load_objective(team_id: int, team_metadata: TeamMetadata | None) -> Objective:
+    try:
+        return Objective.from_specification(team_metadata.objective if team_metadata else "")
+    except ValueError:
+        logger.warning(
+            "Objective of team %d is not valid, the ordering of the metrics is used.",
+            team_id,
+            exc_info=True,
+        )
+        return Objective()
+
+
+def _solve_with_cache(
+    players: list[Player],
+    solve: Callable[[list[Player]], SolverResult | None],
+    *,
+    number_of_samples: int,
+    time_budget: float,
+) -> SolverResult | None:
+    signature = create_roster_signature(players)
+    solved_roster = solved_roster_cache.get(signature) or database.load_solved_roster(signature)
+    if solved_roster is not None:
+        logger.info("Solved roster %s found in the cache.", signature)
+        solved_roster_cache.put(solved_roster)
+        optimal_samples = tuple(apply_solved_roster(players, solved_roster) for _ in range(max(1, number_of_samples)))
+        return SolverResult(
+            metrics=solved_roster.metrics,
+            team_combination=optimal_samples[0],
+            optimal_samples=optimal_samples,
+        )
+
+    start_time = time.perf_counter()
+    solver_result = solve(players)
+    # Only optimal team combinations are shared, as they are the same for every roster with the signature.
+    if solver_result is not None and solver_result.proven_optimal:
+        # Several optimal team combinations are stored if the time budget allows, so the cache hits vary the teams.
+        remaining_time_budget = time_budget - (time.perf_counter() - start_time)
+        sampling_runtime = estimate_solver_runtimes(players)[SolverStrategy.DYNAMIC_PROGRAMMING]
+        if len(solver_result.optimal_samples) <= 1 and sampling_runtime <= remaining_time_budget:
+            metrics, team_combinations = sample_optimal_team_combinations(players, number_of_samples)
+            if metrics == solver_result.metrics:
+                solver_result = replace(solver_result, optimal_samples=tuple(team_combinations))
+        solved_roster = create_solved_roster(
+            [solver_result.team_combination, *solver_result.optimal_samples],
+            solver_result.metrics,
+        )
+        database.insert_or_update_solved_roster(solved_roster)
+        solved_roster_cache.put(solved_roster)
+    return solver_result
+
+
+def _solve_with_strategy(
+    solvers: dict[SolverStrategy, Callable[[list[Player]], SolverResult | None]],
+    solver_strategy: SolverStrategy,
+    players: list[Player],
+    latency_target: float,
+    solver_strategies: Collection[SolverStrategy] | None = None,
+) -> SolverResult | None:
+    if solver_strategy != SolverStrategy.AUTO:
+        return solvers[solver_strategy](players)
+
+    solver_strategy, predicted_runtime = select_solver_strategy(
+        players,
+        latency_target,
+        solver_strategies,
+        _load_number_of_workers(),
+    )
+    start_time = time.perf_counter()
+    solver_result = solvers[solver_strategy](players)
+    # The predicted and actual runtimes are logged together, so the cost model can be tuned from them.
+    logger.info(
+        "Solver strategy %s selected for %d players: predicted %.3f seconds, actual %.3f seconds.",
+        solver_strategy,
+        len(players),
+        predicted_runtime,
+        time.perf_counter() - start_time,
+    )
+    return solver_result
+
+
+def _describe_solver_result(solver_result: SolverResult) -> str:
+    # Only the solvers enumerating the team combinations count them, only the rotation counts repeated pairs.
+    details = [f"proven optimal: {solver_result.proven_optimal}"]
+    if solver_result.evaluated_splits:
+        details.append(f"{solver_result.evaluated_splits} splits evaluated")
+        details.append(f"lower bound reached: {solver_result.lower_bound_reached}")
+    if solver_result.repeated_teammate_pairs is not None:
+        details.append(f"repeated teammate pairs: {solver_result.repeated_teammate_pairs}")
+    return ", ".join(details)
+
+
+def _solve_brute_force(players: list[Player], objective: Objective | None = None) -> SolverResult | None:
+    if objective is not None and not objective.is_default:
+        return _solve_brute_force_with_key(players, objective.compile_key())
+
+    best_team_combinations: ReservoirSampler[tuple[tuple[Player, ...], tuple[Player, ...]]] = ReservoirSampler()
+    best_metrics: TeamDistributionMetrics | None = None
+    lower_bound = calculate_metrics_lower_bound(players)
+    evaluated_splits = 0
+
+    for team_combination in _generate_every_team_combination(players):
         metrics = _calculate_team_combination_metrics(team_combination)
+        evaluated_splits += 1
 
-        if best_metrics is None:
+        if best_metrics is None or metrics < best_metrics:
             best_metrics = metrics
-
+            best_team_combinations.reset()
         if metrics == best_metrics:
             best_team_combinations.append(team_combination)
-        elif metrics < best_metrics:
-            best_metrics = metrics
-            best_team_combinations = [team_combination]
-            continue
-
-        if len(best_team_combinations) >= maximum_number_of_teams:
+        if best_metrics == lower_bound:
             break
 
     if best_metrics is None:
-        return
+        return None
 
-    teams = _assign_me_to_team_one(random.choice(best_team_combinations))  # noqa: S311
-    team_distribution = TeamDistribution(
-        date=date,
-        team_1=teams[0],
-        team_2=teams[1],
+    return SolverResult(
         metrics=best_metrics,
+        team_combination=best_team_combinations.samples[0],
+        evaluated_splits=evaluated_splits,
+        lower_bound_reached=best_metrics == lower_bound,
+    )
+
+
+def _solve_brute_force_with_key(
+    players: list[Player],
+    key: Callable[[TeamDistributionMetrics], tuple[int, ...]],
+) -> SolverResult | None:
+    # The lower bound of the metrics does not bound other objectives, so every team combination is scored.
+    best_team_combinations: ReservoirSampler[tuple[tuple[Player, ...], tuple[Player, ...]]] = ReservoirSampler()
+    best_key: tuple[int, ...] | None = None
+    evaluated_splits = 0
+
+    for team_combination in _generate_every_team_combination(players):
+        team_combination_key = key(_calculate_team_combination_metrics(team_combination))
+        evaluated_splits += 1
+
+        if best_key is None or team_combination_key < best_key:
+            best_key = team_combination_key
+            best_team_combinations.reset()
+        if team_combination_key == best_key:
+            best_team_combinations.append(team_combination)
+
+    if best_key is None:
+        return None
+
+    return SolverResult(
+        metrics=_calculate_team_combination_metrics(best_team_combinations.samples[0]),
+        team_combination=best_team_combinations.samples[0],
+        evaluated_splits=evaluated_splits,
     )
-    database.insert_or_update_team_distribution(team_id, team_distribution)
 
 
 def _generate_every_team_combination(
     players: list[Player],
 ) -> Generator[tuple[tuple[Player, ...], tuple[Player, ...]], None, None]:
-    for team_1 in combinations(players, len(players) // 2):
-        team_2 = tuple(player for player in players if player not in team_1)
+    for team_1_indices in generate_team_one_indices(len(players)):
+        in_team_1 = [False] * len(players)
+        for index in team_1_indices:
+            in_team_1[index] = True
+        team_1 = tuple(players[index] for index in team_1_indices)
+        team_2 = tuple(player for player, selected in zip(players, in_team_1, strict=True) if not selected)
         yield (team_1, team_2)
 
 
@@ -301,11 +984,143 @@ def _calculate_defense_skill_difference(team_combination: tuple[tuple[Player, ..
     return abs(total_defense_skills[0] - total_defense_skills[1])
 
 
+def _create_player_constraint(team_id: int, kind: str, player_1: str, player_2: str) -> PlayerConstraint:
+    # The players are matched by name or identifier among the members and the guests registered for today.
+    date = str((datetime.now(tz=UTC) + timedelta(hours=2)).date())
+    players: list[Player] = [*database.load_member_collection(team_id), *database.load_guest_collection(team_id, date)]
+    identifiers = []
+    for player_value in (player_1, player_2):
+        matching_identifiers = {
+            player.identifier for player in players if player_value in {player.name, player.identifier}
+        }
+        if not matching_identifiers:
+            msg = f"Unknown player: {player_value}"
+            raise ValueError(msg)
+        if len(matching_identifiers) > 1:
+            msg = f"Ambiguous player name: {player_value}, use the identifier instead."
+            raise ValueError(msg)
+        identifiers.append(matching_identifiers.pop())
+    return PlayerConstraint(kind=kind, first_player=identifiers[0], second_player=identifiers[1])
+
+
+def _find_player_index(team: Sequence[Player], player_value: str) -> int | None:
+    return next(
+        (index for index, player in enumerate(team) if player_value in {player.name, player.identifier}),
+        None,
+    )
+
+
+def _update_teammate_pair_counts(
+    team_id: int,
+    teams: list[list[Player]],
+    previous_teams: list[list[Player]],
+) -> None:
+    # The teams replace the previous teams of the same date, so only the difference of the teammate pairs is counted.
+    teammate_pair_count_changes = count_teammate_pairs(teams)
+    teammate_pair_count_changes.subtract(count_teammate_pairs(previous_teams))
+    database.update_teammate_pair_counts(team_id, teammate_pair_count_changes)
+
+
+def _is_roster_unchanged(
+    team_id: int,
+    date: str,
+    players: list[Player],
+    team_metadata: TeamMetadata | None,
+) -> bool:
+    team_distribution = database.load_team_distribution(team_id, date)
+    roster_fingerprint = team_distribution.roster_fingerprint if team_distribution else None
+    if roster_fingerprint != _create_roster_fingerprint(
+        players,
+        team_metadata,
+        database.load_player_constraint_collection(team_id),
+    ):
+        return False
+    logger.info(
+        "Registered players, team settings and player constraints of team %d on %s did not change, the teams are kept.",
+        team_id,
+        date,
+    )
+    return True
+
+
+async def _load_upcoming_attendance(
+    team_id: int,
+    activity_name: str,
+    number_of_dates: int,
+) -> dict[str, list[dict[str, str]]]:
+    activity_dates = await holdsport_api.get_upcoming_activity_dates(team_id, activity_name, number_of_dates)
+    dates = list(dict.fromkeys(str(activity_date) for activity_date in activity_dates))
+    registered_members = await asyncio.gather(*(_load_attendance(team_id, date, activity_name) for date in dates))
+    return dict(zip(dates, registered_members, strict=True))
+
+
+async def _load_attendance(team_id: int, date: str, activity_name: str) -> list[dict[str, str]]:
+    activity_id = await holdsport_api.get_activity_id(team_id, date, activity_name)
+    if activity_id is None:
+        return []
+    return await holdsport_api.get_users_attending_activity(activity_id)
+
+
+def _form_lines(teams: Sequence[Sequence[Player]], team_metadata: TeamMetadata | None) -> list[list[str]]:
+    if team_metadata is None:
+        return []
+    lines: list[list[str]] = []
+    for team in teams:
+        for position, line_size in (
+            (Position.FORWARD, team_metadata.forwards_per_line),
+            (Position.DEFENSE, team_metadata.defenses_per_line),
+        ):
+            if line_size > 0:
+                position_players = [player for player in team if player.position == position]
+                lines.extend([player.identifier for player in line] for line in form_lines(position_players, line_size))
+    return lines
+
+
+def _format_lines(team: Sequence[Player], lines: list[list[str]]) -> str:
+    players = {player.identifier: player for player in team}
+    line_numbers: dict[str, int] = {}
+    output: list[str] = []
+    for line in lines:
+        if not line or not all(identifier in players for identifier in line):
+            continue
+        position = players[line[0]].position
+        line_numbers[position] = line_numbers.get(position, 0) + 1
+        names = ", ".join(players[identifier].name for identifier in line)
+        output.append(f"{position} line {line_numbers[position]}: {names}")
+    return "\n".join(output)
+
+
+def _create_roster_fingerprint(
+    players: Sequence[Player],
+    team_metadata: TeamMetadata | None = None,
+    player_constraints: Sequence[PlayerConstraint] = (),
+) -> str:
+    # Member ids and guest names are in the identifiers, and the fingerprint does not depend on the order.
+    roster = sorted(f"{player.identifier}|{player.position}|{player.skill}" for player in players)
+    # The solver settings and the constraints between the registered players change the teams as well.
+    settings = [
+        f"{name}={getattr(team_metadata, name) if team_metadata else getattr(TeamMetadata, name)}"
+        for name in SOLVER_SETTING_NAMES
+    ]
+    identifiers = {player.identifier for player in players}
+    constraints = sorted(
+        constraint.to_dict()["_id"]
+        for constraint in player_constraints
+        if constraint.first_player in identifiers and constraint.second_player in identifiers
+    )
+    return hashlib.sha256("\n".join([*roster, *settings, *constraints]).encode()).hexdigest()
+
+
 def _assign_me_to_team_one(
-    team_combination: tuple[tuple[Player, ...], tuple[Player, ...]],
+    team_combination: tuple[tuple[Player, ...], ...],
     my_name: str = "DANIEL MIZSAK",
-) -> tuple[list[Player], list[Player]]:
-    i_am_in_team_one = any(player.name == my_name for player in team_combination[0])
-    team_1 = sorted(team_combination[0] if i_am_in_team_one else team_combination[1], key=lambda player: player.name)
-    team_2 = sorted(team_combination[1] if i_am_in_team_one else team_combination[0], key=lambda player: player.name)
-    return team_1, team_2
+) -> tuple[list[Player], ...]:
+    my_team_index = next(
+        (index for index, team in enumerate(team_combination) if any(player.name == my_name for player in team)),
+        0,
+    )
+    teams = (
+        team_combination[my_team_index],
+        *(team for index, team in enumerate(team_combination) if index != my_team_index),
+    )
+    return tuple(sorted(team, key=lambda player: player.name) for team in teams)
@@ -12,6 +12,7 @@ from dash.exceptions import PreventUpdate
 from falcon_formation.data_models import TeamMetadata
 from falcon_formation.main import database, holdsport_api
 from falcon_formation.server import parse_search_parameters, server  # TODO: Add telegram API
+from falcon_formation.solver import Objective
 
 manage_team_app = Dash(__name__, server=server, url_base_pathname="/manage_team/")
 manage_team_app.layout = html.Div(
@@ -55,6 +56,74 @@ manage_team_app.layout = html.Div(
             placeholder="Jersey Color 2",
         ),
         html.Br(),
+        html.P("Number of teams:"),
+        dcc.Input(
+            id="number-of-teams-input",
+            className="dropdown-input",
+            type="number",
+            min=2,
+            step=1,
+            placeholder="Number of Teams",
+        ),
+        html.Br(),
+        html.P("Solver time budget in seconds:"),
+        dcc.Input(
+            id="solver-time-budget-input",
+            className="dropdown-input",
+            type="number",
+            min=1,
+            step=1,
+            placeholder="Solver Time Budget",
+        ),
+        html.Br(),
+        html.P("Number of alternative team combinations for reshuffling:"),
+        dcc.Input(
+            id="number-of-alternatives-input",
+            className="dropdown-input",
+            type="number",
+            min=0,
+            step=1,
+            placeholder="Number of Alternatives",
+        ),
+        html.Br(),
+        html.P("Rotate teammates across activities:"),
+        dcc.Dropdown(
+            id="rotate-teammates-dropdown",
+            className="dropdown-input",
+            options=[{"label": "No", "value": False}, {"label": "Yes", "value": True}],
+            value=False,
+            multi=False,
+            clearable=False,
+        ),
+        html.Br(),
+        html.P("Objective: (Comma separated levels of metrics, empty for the default ordering)"),
+        dcc.Input(
+            id="objective-input",
+            className="dropdown-input",
+            type="text",
+            placeholder=Objective().to_specification(),
+        ),
+        html.Br(),
+        html.P("Forwards per line: (0 to not form lines)"),
+        dcc.Input(
+            id="forwards-per-line-input",
+            className="dropdown-input",
+            type="number",
+            min=0,
+            step=1,
+            placeholder="Forwards per Line",
+        ),
+        html.Br(),
+        html.P("Defenses per pair: (0 to not form pairs)"),
+        dcc.Input(
+            id="defenses-per-line-input",
+            className="dropdown-input",
+            type="number",
+            min=0,
+            step=1,
+            placeholder="Defenses per Pair",
+        ),
+        html.Br(),
         html.P("Telegram Chat ID:  (Can be obtained through the Telegram API)"),
         dcc.Input(
             id="telegram-chat-id-input",
@@ -70,7 +139,6 @@ manage_team_app.layout = html.Div(
         ),
         dcc.ConfirmDialog(
             id="update-confirm",
-            message="Team metadata updated!",
         ),
     ],
 )
@@ -113,6 +181,13 @@ def redirect_invalid_url(pathname: str, search: str) -> tuple[str, int | None, N
         Output("activity-name-dropdown", "value"),
         Output("jersey-color-1-input", "value"),
         Output("jersey-color-2-input", "value"),
+        Output("number-of-teams-input", "value"),
+        Output("solver-time-budget-input", "value"),
+        Output("number-of-alternatives-input", "value"),
+        Output("rotate-teammates-dropdown", "value"),
+        Output("objective-input", "value"),
+        Output("forwards-per-line-input", "value"),
+        Output("defenses-per-line-input", "value"),
         Output("telegram-chat-id-input", "value"),
         Output("loading-output", "children"),
     ],
@@ -120,7 +195,9 @@ def redirect_invalid_url(pathname: str, search: str) -> tuple[str, int | None, N
         Input("team-id", "data"),
     ],
 )
-def display_team_metadata(team_id: int) -> tuple[list[dict[str, str]], str, str, str, int, None]:
+def display_team_metadata(
+    team_id: int,
+) -> tuple[list[dict[str, str]], str, str, str, int, int, int, bool, str, int, int, int, None]:
     """Load and display the metadata of the team.
 
     Also makes sure that the activity name is in the list of possible activity names.
@@ -145,6 +222,13 @@ def display_team_metadata(team_id: int) -> tuple[list[dict[str, str]], str, str,
         team_metadata.activity_name,
         team_metadata.jersey_color_1,
         team_metadata.jersey_color_2,
+        team_metadata.number_of_teams,
+        team_metadata.solver_time_budget,
+        team_metadata.number_of_alternatives,
+        team_metadata.rotate_teammates,
+        team_metadata.objective,
+        team_metadata.forwards_per_line,
+        team_metadata.defenses_per_line,
         team_metadata.telegram_chat_id,
         None,
     )
@@ -153,6 +237,7 @@ def display_team_metadata(team_id: int) -> tuple[list[dict[str, str]], str, str,
 @manage_team_app.callback(  # type:ignore[misc]
     [
         Output("update-confirm", "displayed"),
+        Output("update-confirm", "message"),
     ],
     [
         Input("update-button", "n_clicks"),
@@ -162,6 +247,13 @@ def display_team_metadata(team_id: int) -> tuple[list[dict[str, str]], str, str,
         State("activity-name-dropdown", "value"),
         State("jersey-color-1-input", "value"),
         State("jersey-color-2-input", "value"),
+        State("number-of-teams-input", "value"),
+        State("solver-time-budget-input", "value"),
+        State("number-of-alternatives-input", "value"),
+        State("rotate-teammates-dropdown", "value"),
+        State("objective-input", "value"),
+        State("forwards-per-line-input", "value"),
+        State("defenses-per-line-input", "value"),
         State("telegram-chat-id-input", "value"),
     ],
 )
@@ -171,20 +263,40 @@ def update_team_metadata(  # noqa: PLR0913
     activity_name: str,
     jersey_color_1: str,
     jersey_color_2: str,
+    number_of_teams: int,
+    solver_time_budget: int,
+    number_of_alternatives: int,
+    rotate_teammates: bool,  # noqa: FBT001
+    objective: str,
+    forwards_per_line: int,
+    defenses_per_line: int,
     telegram_chat_id: int,
-) -> tuple[bool]:
+) -> tuple[bool, str]:
     """Update the metadata of the team in the database."""
     if n_clicks > 0:
         team_metadata = database.load_team_metadata(team_id)
         if team_metadata is None:
-            return (False,)
+            return (False, "")
+
+        objective = (objective or "").strip()
+        try:
+            Objective.from_specification(objective)
+        except ValueError as error:
+            return (True, f"Team metadata not updated! {error}")
 
         team_metadata.activity_name = activity_name
         team_metadata.jersey_color_1 = jersey_color_1.strip()
         team_metadata.jersey_color_2 = jersey_color_2.strip()
+        team_metadata.number_of_teams = max(2, int(number_of_teams or 2))
+        team_metadata.solver_time_budget = max(1, int(solver_time_budget or 1))
+        team_metadata.number_of_alternatives = max(0, int(number_of_alternatives or 0))
+        team_metadata.rotate_teammates = bool(rotate_teammates)
+        team_metadata.objective = objective
+        team_metadata.forwards_per_line = max(0, int(forwards_per_line or 0))
+        team_metadata.defenses_per_line = max(0, int(defenses_per_line or 0))
         team_metadata.telegram_chat_id = telegram_chat_id
 
         save_team_metadata_result = database.update_team_metadata(team_metadata)
         if save_team_metadata_result.modified_count > 0:
-            return (True,)
-    return (False,)
+            return (True, "Team metadata updated!")
+    return (False, "")
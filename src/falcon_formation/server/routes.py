@@ -8,7 +8,18 @@ import concurrent.futures
 
 from flask import Response, abort, request
 
-from falcon_formation.main import create_teams, get_goalie_number, get_teams
+from falcon_formation.main import (
+    add_player_constraint,
+    apply_swap,
+    create_teams,
+    create_upcoming_teams,
+    get_goalie_number,
+    get_player_constraints,
+    get_swap_impacts,
+    get_teams,
+    remove_player_constraint,
+    reshuffle_teams,
+)
 from falcon_formation.server import parse_search_parameters, server
 
 
@@ -27,12 +38,31 @@ def create_teams_route() -> Response:
         abort(400, "Missing team id")
     team_id = int(team_id_value)
 
+    force = parse_search_parameters(request.query_string.decode()).get("force", "false").lower() == "true"
+
     executor = concurrent.futures.ThreadPoolExecutor()
-    executor.submit(create_teams, team_id)
+    executor.submit(create_teams, team_id, force)
 
     return Response("Creating teams...", content_type="text/plain; charset=utf-8")
 
 
+@server.route("/create_upcoming_teams/")
+def create_upcoming_teams_route() -> Response:
+    """Create teams for the upcoming activities."""
+    team_id_value = parse_search_parameters(request.query_string.decode()).get("team_id")
+    if team_id_value is None:
+        abort(400, "Missing team id")
+    team_id = int(team_id_value)
+
+    number_of_dates = int(parse_search_parameters(request.query_string.decode()).get("number_of_dates", "4"))
+    force = parse_search_parameters(request.query_string.decode()).get("force", "false").lower() == "true"
+
+    executor = concurrent.futures.ThreadPoolExecutor()
+    executor.submit(create_upcoming_teams, team_id, number_of_dates, force)
+
+    return Response("Creating teams for the upcoming activities...", content_type="text/plain; charset=utf-8")
+
+
 @server.route("/get_teams/")
 def get_teams_route() -> Response:
     """Get teams."""
@@ -45,9 +75,93 @@ def get_teams_route() -> Response:
         parse_search_parameters(request.query_string.decode()).get("show_position", "true").lower() == "true"
     )
     show_guest = parse_search_parameters(request.query_string.decode()).get("show_guest", "true").lower() == "true"
+    date = parse_search_parameters(request.query_string.decode()).get("date")
+
+    return Response(
+        get_teams(team_id, show_skill, show_position, show_guest, date),
+        content_type="text/plain; charset=utf-8",
+    )
+
+
+@server.route("/reshuffle_teams/")
+def reshuffle_teams_route() -> Response:
+    """Reshuffle teams."""
+    team_id_value = parse_search_parameters(request.query_string.decode()).get("team_id")
+    if team_id_value is None:
+        abort(400, "Missing team id")
+    team_id = int(team_id_value)
+
+    return Response(reshuffle_teams(team_id), content_type="text/plain; charset=utf-8")
+
+
+@server.route("/get_swap_impacts/")
+def get_swap_impacts_route() -> Response:
+    """Get swap impacts."""
+    team_id_value = parse_search_parameters(request.query_string.decode()).get("team_id")
+    if team_id_value is None:
+        abort(400, "Missing team id")
+    team_id = int(team_id_value)
+
+    return Response(get_swap_impacts(team_id), content_type="text/plain; charset=utf-8")
+
+
+@server.route("/apply_swap/")
+def apply_swap_route() -> Response:
+    """Apply swap."""
+    team_id_value = parse_search_parameters(request.query_string.decode()).get("team_id")
+    if team_id_value is None:
+        abort(400, "Missing team id")
+    team_id = int(team_id_value)
+    player_1_name = parse_search_parameters(request.query_string.decode()).get("player_1")
+    player_2_name = parse_search_parameters(request.query_string.decode()).get("player_2")
+    if player_1_name is None or player_2_name is None:
+        abort(400, "Missing player names")
+
+    return Response(apply_swap(team_id, player_1_name, player_2_name), content_type="text/plain; charset=utf-8")
+
+
+@server.route("/get_player_constraints/")
+def get_player_constraints_route() -> Response:
+    """Get player constraints."""
+    team_id_value = parse_search_parameters(request.query_string.decode()).get("team_id")
+    if team_id_value is None:
+        abort(400, "Missing team id")
+    team_id = int(team_id_value)
+
+    return Response(get_player_constraints(team_id), content_type="text/plain; charset=utf-8")
+
+
+@server.route("/add_player_constraint/")
+def add_player_constraint_route() -> Response:
+    """Add player constraint."""
+    team_id_value = parse_search_parameters(request.query_string.decode()).get("team_id")
+    if team_id_value is None:
+        abort(400, "Missing team id")
+    team_id = int(team_id_value)
+    kind = parse_search_parameters(request.query_string.decode()).get("kind")
+    player_1 = parse_search_parameters(request.query_string.decode()).get("player_1")
+    player_2 = parse_search_parameters(request.query_string.decode()).get("player_2")
+    if kind is None or player_1 is None or player_2 is None:
+        abort(400, "Missing constraint kind or player names")
+
+    return Response(add_player_constraint(team_id, kind, player_1, player_2), content_type="text/plain; charset=utf-8")
+
+
+@server.route("/remove_player_constraint/")
+def remove_player_constraint_route() -> Response:
+    """Remove player constraint."""
+    team_id_value = parse_search_parameters(request.query_string.decode()).get("team_id")
+    if team_id_value is None:
+        abort(400, "Missing team id")
+    team_id = int(team_id_value)
+    kind = parse_search_parameters(request.query_string.decode()).get("kind")
+    player_1 = parse_search_parameters(request.query_string.decode()).get("player_1")
+    player_2 = parse_search_parameters(request.query_string.decode()).get("player_2")
+    if kind is None or player_1 is None or player_2 is None:
+        abort(400, "Missing constraint kind or player names")
 
     return Response(
-        get_teams(team_id, show_skill, show_position, show_guest),
+        remove_player_constraint(team_id, kind, player_1, player_2),
         content_type="text/plain; charset=utf-8",
     )
 
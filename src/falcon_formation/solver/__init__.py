@@ -0,0 +1,78 @@
+"""
+Init file for the team distribution solvers.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from falcon_formation.solver.alternatives import SAMPLES_PER_ALTERNATIVE, find_diverse_alternatives
+from falcon_formation.solver.anytime import solve_anytime
+from falcon_formation.solver.batched import solve_batched
+from falcon_formation.solver.bitmask import generate_team_one_masks, solve_bitmask
+from falcon_formation.solver.bounds import calculate_metrics_lower_bound
+from falcon_formation.solver.branch_and_bound import solve_branch_and_bound
+from falcon_formation.solver.cost_model import estimate_solver_runtimes, select_solver_strategy
+from falcon_formation.solver.dynamic_programming import sample_optimal_team_combinations, solve_dynamic_programming
+from falcon_formation.solver.gray_code import generate_revolving_door_swaps, solve_gray_code
+from falcon_formation.solver.incremental import repair_team_combination
+from falcon_formation.solver.k_way import calculate_k_way_metrics, solve_k_way
+from falcon_formation.solver.lines import form_lines
+from falcon_formation.solver.mask_table import load_team_one_masks
+from falcon_formation.solver.multiset import solve_multiset
+from falcon_formation.solver.objective import Objective
+from falcon_formation.solver.parallel import solve_parallel
+from falcon_formation.solver.reservoir import ReservoirSampler
+from falcon_formation.solver.roster_cache import (
+    SolvedRosterCache,
+    apply_solved_roster,
+    create_roster_signature,
+    create_solved_roster,
+)
+from falcon_formation.solver.solver_result import SolverResult
+from falcon_formation.solver.solver_strategy import SolverStrategy
+from falcon_formation.solver.stratified import solve_stratified
+from falcon_formation.solver.swap_impact import calculate_swap_impacts
+from falcon_formation.solver.team_combinations import count_team_one_indices, generate_team_one_indices
+from falcon_formation.solver.teammate_pairs import (
+    calculate_repeated_teammate_pairs,
+    count_teammate_pairs,
+    create_teammate_pair_matrix,
+)
+
+__all__ = [
+    "SAMPLES_PER_ALTERNATIVE",
+    "Objective",
+    "ReservoirSampler",
+    "SolvedRosterCache",
+    "SolverResult",
+    "SolverStrategy",
+    "apply_solved_roster",
+    "calculate_k_way_metrics",
+    "calculate_metrics_lower_bound",
+    "calculate_repeated_teammate_pairs",
+    "calculate_swap_impacts",
+    "count_team_one_indices",
+    "count_teammate_pairs",
+    "create_roster_signature",
+    "create_solved_roster",
+    "create_teammate_pair_matrix",
+    "estimate_solver_runtimes",
+    "find_diverse_alternatives",
+    "form_lines",
+    "generate_revolving_door_swaps",
+    "generate_team_one_indices",
+    "generate_team_one_masks",
+    "load_team_one_masks",
+    "repair_team_combination",
+    "sample_optimal_team_combinations",
+    "select_solver_strategy",
+    "solve_anytime",
+    "solve_batched",
+    "solve_bitmask",
+    "solve_branch_and_bound",
+    "solve_dynamic_programming",
+    "solve_gray_code",
+    "solve_k_way",
+    "solve_multiset",
+    "solve_parallel",
+    "solve_stratified",
+]
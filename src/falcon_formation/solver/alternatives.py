@@ -0,0 +1,98 @@
+"""
+Diverse alternatives of the best team combination.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from falcon_formation.solver.dynamic_programming import sample_optimal_team_combinations
+from falcon_formation.solver.objective import Objective
+from falcon_formation.solver.solver_result import SolverResult
+
+if TYPE_CHECKING:
+    from falcon_formation.data_models import Player
+
+SAMPLES_PER_ALTERNATIVE = 20
+
+
+def find_diverse_alternatives(
+    players: list[Player],
+    solver_result: SolverResult,
+    number_of_alternatives: int,
+    objective: Objective | None = None,
+    number_of_samples_per_alternative: int = SAMPLES_PER_ALTERNATIVE,
+) -> tuple[SolverResult, list[tuple[tuple[Player, ...], tuple[Player, ...]]]]:
+    """Return optimal team combinations that differ from each other as much as possible.
+
+    Optimal team combinations are sampled uniformly, then they are picked greedily, always the one furthest from the
+    team combinations picked so far. The distance of two team combinations is the number of players that have to
+    change teams to turn one into the other.
+    The optimal team combinations sampled by the solver are reused if it proved them optimal. Otherwise they are
+    sampled with dynamic programming, and if that finds better metrics, its optimum replaces the solver result.
+
+    Args:
+        players (list[Player]): List of registered Members and Guests.
+        solver_result (SolverResult): The best team combination, which is the first alternative.
+        number_of_alternatives (int): The maximum number of returned team combinations.
+        objective (Objective | None, optional): The objective the solver result was found by. Defaults to None,
+            which is the ordering of TeamDistributionMetrics.
+        number_of_samples_per_alternative (int, optional): The number of sampled optimal team combinations per
+            alternative to choose from. Defaults to SAMPLES_PER_ALTERNATIVE.
+
+    Returns:
+        tuple[SolverResult, list[tuple[tuple[Player, ...], tuple[Player, ...]]]]: The solver result, or the better
+            optimum, and the alternatives, starting with its team combination. Only that one is returned if the
+            sampled team combinations are not as good.
+    """
+    if number_of_alternatives <= 1:
+        return solver_result, [solver_result.team_combination]
+    if solver_result.proven_optimal and len(solver_result.optimal_samples) > 1:
+        metrics, team_combinations = solver_result.metrics, list(solver_result.optimal_samples)
+    else:
+        metrics, team_combinations = sample_optimal_team_combinations(
+            players,
+            number_of_alternatives * number_of_samples_per_alternative,
+        )
+    objective = objective or Objective()
+    key = objective.compile_key()
+    if key(metrics) < key(solver_result.metrics):
+        # The sampled team combinations are only proven optimal for the ordering of TeamDistributionMetrics.
+        solver_result = SolverResult(
+            metrics=metrics,
+            team_combination=team_combinations[0],
+            proven_optimal=objective.is_default,
+            optimal_samples=tuple(team_combinations),
+        )
+    alternatives = [solver_result.team_combination]
+    if metrics != solver_result.metrics:
+        return solver_result, alternatives
+
+    # Smallest distance of every candidate from the picked alternatives.
+    candidates = [(team_combination, _team_ids(team_combination)) for team_combination in team_combinations]
+    distances = [_distance(_team_ids(solver_result.team_combination), team_ids) for _, team_ids in candidates]
+    while len(alternatives) < number_of_alternatives:
+        best_distance, best_index = max(((distance, index) for index, distance in enumerate(distances)), default=(0, 0))
+        if best_distance == 0:
+            break
+        team_combination, team_ids = candidates[best_index]
+        alternatives.append(team_combination)
+        distances = [
+            min(distance, _distance(team_ids, candidate_team_ids))
+            for distance, (_, candidate_team_ids) in zip(distances, candidates, strict=True)
+        ]
+    return solver_result, alternatives
+
+
+def _team_ids(team_combination: tuple[tuple[Player, ...], tuple[Player, ...]]) -> tuple[set[int], set[int]]:
+    return {id(player) for player in team_combination[0]}, {id(player) for player in team_combination[1]}
+
+
+def _distance(first: tuple[set[int], set[int]], second: tuple[set[int], set[int]]) -> int:
+    # (A, B) and (B, A) are the same split when the teams have the same size.
+    return min(
+        len(first[0] - second[0]),
+        len(first[0] - second[1]) if len(first[0]) == len(second[1]) else len(first[0]),
+    )
@@ -0,0 +1,205 @@
+"""
+Anytime solver for creating team distributions.
+
+Large rosters cannot be searched exhaustively within the request timeout, so this solver starts from a greedy
+team combination and keeps improving it with swap-based local search until the time budget runs out.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from typing import TYPE_CHECKING
+
+from falcon_formation.data_models import Position, TeamDistributionMetrics
+from falcon_formation.solver.bounds import calculate_metrics_lower_bound
+from falcon_formation.solver.branch_and_bound import POSITION_ORDER
+from falcon_formation.solver.objective import Objective
+from falcon_formation.solver.solver_result import SolverResult
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from falcon_formation.data_models import Player
+
+
+def solve_anytime(
+    players: list[Player],
+    time_budget: float = 10.0,
+    objective: Objective | None = None,
+) -> SolverResult | None:
+    """Find a good team combination within the time budget.
+
+    The search stops early if the metrics reach their lower bound, in which case the result is proven optimal.
+
+    Args:
+        players (list[Player]): List of registered Members and Guests.
+        time_budget (float, optional): The number of seconds the search may take. Defaults to 10.0.
+        objective (Objective | None, optional): The objective the team combinations are compared by. Defaults to
+            None, the ordering of TeamDistributionMetrics. The lower bound only holds for that ordering, so with any
+            other objective the search uses the whole time budget and the result is not proven optimal.
+
+    Returns:
+        SolverResult | None: The best team combination found and its metrics.
+    """
+    deadline = time.monotonic() + time_budget
+    objective = objective or Objective()
+    lower_bound = calculate_metrics_lower_bound(players) if objective.is_default else None
+    key = objective.compile_key()
+
+    search = SwapSearch(players, key=None if objective.is_default else key)
+    search.improve()
+    best_metrics, best_team_1 = search.metrics(), search.team_1.copy()
+    while best_metrics != lower_bound and time.monotonic() < deadline:
+        # Iterated local search: perturb the best team combination with a few random swaps and improve it again.
+        search.team_1 = best_team_1.copy()
+        search.perturb(random.randint(2, max(2, len(players) // 4)))  # noqa: S311
+        search.improve()
+        if key(search.metrics()) < key(best_metrics):
+            best_metrics, best_team_1 = search.metrics(), search.team_1.copy()
+
+    team_1 = tuple(players[index] for index in sorted(best_team_1))
+    team_2 = tuple(player for index, player in enumerate(players) if index not in best_team_1)
+    return SolverResult(
+        metrics=best_metrics,
+        team_combination=(team_1, team_2),
+        proven_optimal=best_metrics == lower_bound,
+    )
+
+
+class SwapSearch:
+    """Local search over the team combinations that swaps players between the teams.
+
+    The totals of team one are updated from the per-player values, so a swap is scored without summing the teams.
+    """
+
+    def __init__(
+        self: SwapSearch,
+        players: list[Player],
+        team_1: set[int] | None = None,
+        key: Callable[[TeamDistributionMetrics], tuple[int, ...]] | None = None,
+    ) -> None:
+        """Start the search from the given player indices of team one, or from a greedy team one.
+
+        The swaps are compared by the key of their metrics if given, otherwise by the ordering of the metrics.
+        """
+        self.key = key
+        # Per player (goalie, defense, skill, goalie skill, defense skill) values, which are summed for team one.
+        self.values: list[tuple[int, ...]] = [
+            (
+                int(player.position == Position.GOALIE),
+                int(player.position == Position.DEFENSE),
+                player.skill,
+                player.skill if player.position == Position.GOALIE else 0,
+                player.skill if player.position == Position.DEFENSE else 0,
+            )
+            for player in players
+        ]
+        self.totals = _sum_values(self.values)
+        self.team_1 = _create_greedy_team_one(players) if team_1 is None else team_1
+
+    def metrics(self: SwapSearch) -> TeamDistributionMetrics:
+        """Return the metrics of the current team combination."""
+        return TeamDistributionMetrics(*self._calculate_metrics(self._team_1_totals()))
+
+    def improve(self: SwapSearch) -> None:
+        """Apply the best single swap between the teams until no swap improves the metrics."""
+        # Steepest descent: apply the best single swap between the teams until no swap improves the metrics.
+        team_1_totals = self._team_1_totals()
+        current = self._score(team_1_totals)
+        while True:
+            team_2 = [index for index in range(len(self.values)) if index not in self.team_1]
+            best_swap = min(
+                (
+                    (
+                        self._score(_swap_totals(team_1_totals, self.values[out], self.values[into])),
+                        out,
+                        into,
+                    )
+                    for out in self.team_1
+                    for into in team_2
+                ),
+                default=None,
+            )
+            if best_swap is None or best_swap[0] >= current:
+                return
+            current, out, into = best_swap
+            team_1_totals = _swap_totals(team_1_totals, self.values[out], self.values[into])
+            self.team_1.remove(out)
+            self.team_1.add(into)
+
+    def perturb(self: SwapSearch, number_of_swaps: int) -> None:
+        """Apply random swaps between the teams."""
+        team_2 = [index for index in range(len(self.values)) if index not in self.team_1]
+        if not self.team_1 or not team_2:
+            return
+        for _ in range(number_of_swaps):
+            out = random.choice(sorted(self.team_1))  # noqa: S311
+            into_position = random.randrange(len(team_2))  # noqa: S311
+            self.team_1.remove(out)
+            self.team_1.add(team_2[into_position])
+            team_2[into_position] = out
+
+    def fill(self: SwapSearch, candidates: list[int], team_size: int) -> None:
+        """Add the candidates to team one one by one, always the one giving the best metrics, up to the team size."""
+        candidates = candidates.copy()
+        team_1_totals = self._team_1_totals()
+        while len(self.team_1) < team_size and candidates:
+            best_candidate = min(
+                candidates,
+                key=lambda index: self._score(_swap_totals(team_1_totals, (0,) * 5, self.values[index])),
+            )
+            team_1_totals = _swap_totals(team_1_totals, (0,) * 5, self.values[best_candidate])
+            candidates.remove(best_candidate)
+            self.team_1.add(best_candidate)
+
+    def _score(self: SwapSearch, team_1_totals: tuple[int, ...]) -> tuple[int, ...]:
+        metrics = self._calculate_metrics(team_1_totals)
+        return metrics if self.key is None else self.key(TeamDistributionMetrics(*metrics))
+
+    def _team_1_totals(self: SwapSearch) -> tuple[int, ...]:
+        return _sum_values([self.values[index] for index in self.team_1])
+
+    def _calculate_metrics(self: SwapSearch, team_1_totals: tuple[int, ...]) -> tuple[int, int, int, int]:
+        goalies, defenses, skill, goalie_skill, defense_skill = team_1_totals
+        total_goalies, total_defenses, total_skill, total_goalie_skill, total_defense_skill = self.totals
+        goalie_number_difference = abs(2 * goalies - total_goalies)
+        if goalie_number_difference == 0:
+            skill_difference = abs(2 * skill - total_skill)
+        else:
+            # Goalie skill is not considered if there is a goalie number difference.
+            skill_difference = abs(2 * (skill - goalie_skill) - (total_skill - total_goalie_skill))
+        return (
+            goalie_number_difference,
+            abs(2 * defenses - total_defenses),
+            skill_difference,
+            abs(2 * defense_skill - total_defense_skill),
+        )
+
+
+def _sum_values(values: list[tuple[int, ...]]) -> tuple[int, ...]:
+    return tuple(sum(column) for column in zip(*values, strict=True)) if values else (0, 0, 0, 0, 0)
+
+
+def _swap_totals(totals: tuple[int, ...], out: tuple[int, ...], into: tuple[int, ...]) -> tuple[int, ...]:
+    return tuple(total - out_value + into_value for total, out_value, into_value in zip(totals, out, into, strict=True))
+
+
+def _create_greedy_team_one(players: list[Player]) -> set[int]:
+    # Snake draft from the goalies to the forwards and from the strongest player down within each position.
+    team_size = len(players) // 2
+    team_1: set[int] = set()
+    team_2_size = 0
+    order = sorted(
+        range(len(players)),
+        key=lambda index: (POSITION_ORDER[Position(players[index].position)], -players[index].skill),
+    )
+    for pick, index in enumerate(order):
+        to_team_1 = pick % 4 in {0, 3}
+        if len(team_1) == team_size or (not to_team_1 and team_2_size < len(players) - team_size):
+            team_2_size += 1
+        else:
+            team_1.add(index)
+    return team_1
@@ -0,0 +1,228 @@
+"""
+Batched solver for creating team distributions.
+
+The players are packed into skill and position arrays, and the team combinations are scored in large blocks
+with array operations instead of one at a time with Python loops.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+from itertools import chain, islice
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from falcon_formation.data_models import TeamDistributionMetrics
+from falcon_formation.solver.bounds import calculate_metrics_lower_bound
+from falcon_formation.solver.mask_table import batch_team_one_masks, load_team_one_masks
+from falcon_formation.solver.packed_roster import PackedRoster
+from falcon_formation.solver.reservoir import ReservoirSampler
+from falcon_formation.solver.solver_result import SolverResult
+from falcon_formation.solver.team_combinations import generate_team_one_indices
+from falcon_formation.solver.teammate_pairs import calculate_repeated_teammate_pairs
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from pathlib import Path
+
+    import numpy.typing as npt
+
+    from falcon_formation.data_models import Player
+    from falcon_formation.solver.objective import Objective
+
+
+def solve_batched(  # noqa: PLR0913
+    players: list[Player],
+    batch_size: int = 65536,
+    teammate_pair_matrix: npt.NDArray[np.int64] | None = None,
+    mask_table_directory: Path | None = None,
+    mask_table_limit: int = 26,
+    *,
+    objective: Objective | None = None,
+) -> SolverResult | None:
+    """Find the best team combination by scoring blocks of team combinations at once.
+
+    Produces the same optimal metrics as scoring every team combination one by one. The search stops after the first
+    block reaching the lower bound of the metrics, otherwise the returned team combination is sampled uniformly from
+    every optimal team combination.
+
+    Args:
+        players (list[Player]): List of registered Members and Guests.
+        batch_size (int, optional): The number of team combinations scored at once. Defaults to 65536.
+        teammate_pair_matrix (npt.NDArray[np.int64] | None, optional): How many times each pair of the players were
+            teammates before. If given, the optimal team combinations repeating the fewest teammate pairs are kept.
+            Defaults to None.
+        mask_table_directory (Path | None, optional): The directory of the precomputed team one bitmask tables,
+            which are read memory-mapped instead of generating the team combinations. Defaults to None.
+        mask_table_limit (int, optional): The largest number of players read from a table. Defaults to 26.
+        objective (Objective | None, optional): The objective the team combinations are compared by, compiled into a
+            kernel once. The search does not stop at the lower bound of the metrics for other than the default
+            objective. Defaults to None, the ordering of TeamDistributionMetrics.
+
+    Returns:
+        SolverResult | None: The best team combination and its metrics.
+    """
+    roster = PackedRoster.from_players(players)
+    lower_bound = calculate_metrics_lower_bound(players)
+    objective_kernel = None
+    if objective is not None and not objective.is_default:
+        objective_kernel = objective.compile_kernel()
+    masks = None
+    if mask_table_directory is not None:
+        masks = load_team_one_masks(len(players), mask_table_directory, mask_table_limit)
+    if masks is None:
+        team_index_blocks = batch_team_one_indices(
+            generate_team_one_indices(len(players)),
+            len(players) // 2,
+            batch_size,
+        )
+    else:
+        team_index_blocks = batch_team_one_masks(masks, len(players), batch_size)
+    best_metrics, best_team_indices, evaluated_splits = find_best_team_indices(
+        team_index_blocks,
+        roster,
+        lower_bound=lower_bound if objective_kernel is None else None,
+        teammate_pair_matrix=teammate_pair_matrix,
+        objective_kernel=objective_kernel,
+    )
+    if best_metrics is None:
+        return None
+    if objective_kernel is not None:
+        # Team combinations with equal keys may have different metrics, so they are taken from the sampled one.
+        best_metrics = TeamDistributionMetrics(
+            *(int(column[0]) for column in _calculate_batch_metrics(best_team_indices.samples[0][None, :], roster)),
+        )
+
+    repeated_teammate_pairs = None
+    if teammate_pair_matrix is not None:
+        repeated_teammate_pairs = int(
+            calculate_repeated_teammate_pairs(best_team_indices.samples[0][None, :], teammate_pair_matrix)[0],
+        )
+    team_1_indices = set(best_team_indices.samples[0].tolist())
+    team_1 = tuple(player for index, player in enumerate(players) if index in team_1_indices)
+    team_2 = tuple(player for index, player in enumerate(players) if index not in team_1_indices)
+    return SolverResult(
+        metrics=best_metrics,
+        team_combination=(team_1, team_2),
+        evaluated_splits=evaluated_splits,
+        lower_bound_reached=best_metrics == lower_bound,
+        repeated_teammate_pairs=repeated_teammate_pairs,
+    )
+
+
+def batch_team_one_indices(
+    index_combinations: Iterator[tuple[int, ...]],
+    team_size: int,
+    batch_size: int,
+) -> Iterator[npt.NDArray[np.intp]]:
+    """Generate the player indices of team one in blocks of team combinations.
+
+    Args:
+        index_combinations (Iterator[tuple[int, ...]]): The sorted player indices of team one for each split.
+        team_size (int): The number of players in team one.
+        batch_size (int): The number of team combinations in a block.
+
+    Yields:
+        npt.NDArray[np.intp]: The sorted player indices of team one, one team combination per row.
+    """
+    while batch := list(islice(index_combinations, batch_size)):
+        yield np.fromiter(
+            chain.from_iterable(batch),
+            dtype=np.intp,
+            count=len(batch) * team_size,
+        ).reshape(len(batch), team_size)
+
+
+def find_best_team_indices(
+    team_index_blocks: Iterator[npt.NDArray[np.intp]],
+    roster: PackedRoster,
+    *,
+    lower_bound: TeamDistributionMetrics | None = None,
+    teammate_pair_matrix: npt.NDArray[np.int64] | None = None,
+    objective_kernel: Callable[[tuple[npt.NDArray[np.int64], ...]], tuple[npt.NDArray[np.int64], ...]] | None = None,
+) -> tuple[TeamDistributionMetrics | None, ReservoirSampler[npt.NDArray[np.intp]], int]:
+    """Score the team one indices in blocks and keep the best ones.
+
+    Args:
+        team_index_blocks (Iterator[npt.NDArray[np.intp]]): The sorted player indices of team one for each split,
+            in blocks of team combinations scored at once.
+        roster (PackedRoster): The packed players.
+        lower_bound (TeamDistributionMetrics | None, optional): The scoring stops after the first block reaching
+            these metrics, with the teammate pair matrix only once they are reached without repeated teammate pairs.
+            Defaults to None.
+        teammate_pair_matrix (npt.NDArray[np.int64] | None, optional): How many times each pair of the players were
+            teammates before. If given, the ties of the metrics are broken by the number of repeated teammate pairs
+            among the scored team combinations. Defaults to None.
+        objective_kernel (Callable | None, optional): Maps the metric columns of a block to the key columns the team
+            combinations are compared by, in which case the best metrics are the ones of a team combination with the
+            best key. Defaults to None, the ordering of TeamDistributionMetrics.
+
+    Returns:
+        tuple[TeamDistributionMetrics | None, ReservoirSampler[npt.NDArray[np.intp]], int]: The best metrics, the team
+            one indices of a uniformly sampled team combination reaching them and the number of scored team
+            combinations.
+    """
+    best_metrics: TeamDistributionMetrics | None = None
+    best_key: tuple[int, ...] | None = None
+    best_team_indices: ReservoirSampler[npt.NDArray[np.intp]] = ReservoirSampler()
+    evaluated_splits = 0
+
+    for team_indices in team_index_blocks:
+        evaluated_splits += len(team_indices)
+
+        metrics_columns = _calculate_batch_metrics(team_indices, roster)
+        key_columns = metrics_columns if objective_kernel is None else objective_kernel(metrics_columns)
+        if teammate_pair_matrix is not None:
+            # The repeated teammate pairs are the final tie-break after the metrics.
+            key_columns = (
+                *key_columns,
+                calculate_repeated_teammate_pairs(team_indices, teammate_pair_matrix),
+            )
+        best_rows = _find_best_rows(key_columns)
+        key = tuple(int(column[best_rows[0]]) for column in key_columns)
+
+        if best_key is None or key < best_key:
+            best_key = key
+            best_metrics = TeamDistributionMetrics(*(int(column[best_rows[0]]) for column in metrics_columns))
+            best_team_indices.reset()
+        if key == best_key:
+            best_team_indices.extend(list(team_indices[best_rows]))
+        # With the teammate pairs, a later block can still have a tie repeating fewer pairs.
+        if best_metrics == lower_bound and (teammate_pair_matrix is None or key[-1] == 0):
+            break
+
+    return best_metrics, best_team_indices, evaluated_splits
+
+
+def _calculate_batch_metrics(
+    team_indices: npt.NDArray[np.intp],
+    roster: PackedRoster,
+) -> tuple[npt.NDArray[np.int64], ...]:
+    # Every metric is the absolute difference between twice the team one total and the overall total.
+    goalie_number_difference = np.abs(2 * roster.goalies[team_indices].sum(axis=1) - roster.goalies.sum())
+    defense_number_difference = np.abs(2 * roster.defenses[team_indices].sum(axis=1) - roster.defenses.sum())
+
+    team_skill = roster.skills[team_indices].sum(axis=1)
+    team_goalie_skill = roster.goalie_skills[team_indices].sum(axis=1)
+    # Goalie skill is not considered if there is a goalie number difference.
+    skill_difference = np.where(
+        goalie_number_difference != 0,
+        np.abs(2 * (team_skill - team_goalie_skill) - (roster.skills.sum() - roster.goalie_skills.sum())),
+        np.abs(2 * team_skill - roster.skills.sum()),
+    )
+    defense_skill_difference = np.abs(
+        2 * roster.defense_skills[team_indices].sum(axis=1) - roster.defense_skills.sum(),
+    )
+
+    return goalie_number_difference, defense_number_difference, skill_difference, defense_skill_difference
+
+
+def _find_best_rows(metrics_columns: tuple[npt.NDArray[np.int64], ...]) -> npt.NDArray[np.intp]:
+    # Narrow down the rows column by column, following the ordering of the key.
+    best_rows = np.arange(len(metrics_columns[0]))
+    for column in metrics_columns:
+        values = column[best_rows]
+        best_rows = best_rows[values == values.min()]
+    return best_rows
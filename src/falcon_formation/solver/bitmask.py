@@ -0,0 +1,145 @@
+"""
+Bitmask solver for creating team distributions.
+
+Team one is encoded as an integer bitmask over the players. Position counts are popcounts of the bitmask, and skill
+sums are looked up byte by byte in precomputed tables, so scoring a team combination needs no Player objects.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+from dataclasses import astuple
+from typing import TYPE_CHECKING
+
+from falcon_formation.data_models import Position, TeamDistributionMetrics
+from falcon_formation.solver.bounds import calculate_metrics_lower_bound
+from falcon_formation.solver.reservoir import ReservoirSampler
+from falcon_formation.solver.solver_result import SolverResult
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from falcon_formation.data_models import Player
+
+BYTE_SIZE = 8
+
+
+def solve_bitmask(players: list[Player]) -> SolverResult | None:
+    """Find the best team combination by scoring the bitmask of team one for every team combination.
+
+    Produces the same optimal metrics as scoring every team combination one by one. The search stops at the first
+    team combination reaching the lower bound of the metrics, otherwise the returned team combination is sampled
+    uniformly from every optimal team combination.
+
+    Args:
+        players (list[Player]): List of registered Members and Guests.
+
+    Returns:
+        SolverResult | None: The best team combination and its metrics.
+    """
+    goalie_mask = _create_mask([player.position == Position.GOALIE for player in players])
+    defense_mask = _create_mask([player.position == Position.DEFENSE for player in players])
+    skill_table = _create_byte_table([player.skill for player in players])
+    goalie_skill_table = _create_byte_table(
+        [player.skill if player.position == Position.GOALIE else 0 for player in players],
+    )
+    defense_skill_table = _create_byte_table(
+        [player.skill if player.position == Position.DEFENSE else 0 for player in players],
+    )
+    total_mask = (1 << len(players)) - 1
+    total_goalies = goalie_mask.bit_count()
+    total_defenses = defense_mask.bit_count()
+    total_skill = _sum_bytes(skill_table, total_mask)
+    total_non_goalie_skill = total_skill - _sum_bytes(goalie_skill_table, total_mask)
+    total_defense_skill = _sum_bytes(defense_skill_table, total_mask)
+
+    lower_bound = astuple(calculate_metrics_lower_bound(players))
+    evaluated_splits = 0
+    best_metrics: tuple[int, int, int, int] | None = None
+    best_masks: ReservoirSampler[int] = ReservoirSampler()
+    for mask in generate_team_one_masks(len(players)):
+        goalie_number_difference = abs(2 * (mask & goalie_mask).bit_count() - total_goalies)
+        team_skill = _sum_bytes(skill_table, mask)
+        if goalie_number_difference == 0:
+            skill_difference = abs(2 * team_skill - total_skill)
+        else:
+            # Goalie skill is not considered if there is a goalie number difference.
+            team_non_goalie_skill = team_skill - _sum_bytes(goalie_skill_table, mask)
+            skill_difference = abs(2 * team_non_goalie_skill - total_non_goalie_skill)
+        metrics = (
+            goalie_number_difference,
+            abs(2 * (mask & defense_mask).bit_count() - total_defenses),
+            skill_difference,
+            abs(2 * _sum_bytes(defense_skill_table, mask) - total_defense_skill),
+        )
+        if best_metrics is None or metrics < best_metrics:
+            best_metrics = metrics
+            best_masks.reset()
+        if metrics == best_metrics:
+            best_masks.append(mask)
+        evaluated_splits += 1
+        if best_metrics == lower_bound:
+            break
+
+    if best_metrics is None:  # pragma: no cover
+        return None
+
+    # Player objects are only looked up for the sampled team combination.
+    best_mask = best_masks.samples[0]
+    team_1 = tuple(player for index, player in enumerate(players) if best_mask >> index & 1)
+    team_2 = tuple(player for index, player in enumerate(players) if not best_mask >> index & 1)
+    return SolverResult(
+        metrics=TeamDistributionMetrics(*best_metrics),
+        team_combination=(team_1, team_2),
+        evaluated_splits=evaluated_splits,
+        lower_bound_reached=best_metrics == lower_bound,
+    )
+
+
+def generate_team_one_masks(number_of_players: int) -> Iterator[int]:
+    """Generate the bitmask of team one for every split of the players exactly once.
+
+    With an even number of players (A, B) and (B, A) are the same split, so the first player is fixed in team one.
+
+    Args:
+        number_of_players (int): The number of players to split.
+
+    Yields:
+        int: The bitmask of team one, where bit i is set if player i is in team one.
+    """
+    team_size = number_of_players // 2
+    fixed_first_player = number_of_players % 2 == 0 and number_of_players > 0
+    # The rest of team one is chosen from the rest of the players.
+    chosen_size = team_size - fixed_first_player
+    limit = 1 << (number_of_players - fixed_first_player)
+    mask = (1 << chosen_size) - 1
+    while mask < limit:
+        yield (mask << 1 | 1) if fixed_first_player else mask
+        if mask == 0:
+            return
+        # Gosper's hack: the next larger integer with the same number of set bits.
+        lowest_bit = mask & -mask
+        ripple = mask + lowest_bit
+        mask = (((ripple ^ mask) >> 2) // lowest_bit) | ripple
+
+
+def _create_mask(flags: list[bool]) -> int:
+    return sum(1 << index for index, flag in enumerate(flags) if flag)
+
+
+def _create_byte_table(values: list[int]) -> list[list[int]]:
+    # table[byte_index][byte] is the sum of the values of the players in the byte at byte_index of a bitmask.
+    table: list[list[int]] = []
+    for start in range(0, len(values), BYTE_SIZE):
+        byte_values = values[start : start + BYTE_SIZE]
+        sums = [0] * (1 << BYTE_SIZE)
+        for byte in range(1, 1 << BYTE_SIZE):
+            lowest_bit = (byte & -byte).bit_length() - 1
+            sums[byte] = sums[byte & (byte - 1)] + (byte_values[lowest_bit] if lowest_bit < len(byte_values) else 0)
+        table.append(sums)
+    return table
+
+
+def _sum_bytes(table: list[list[int]], mask: int) -> int:
+    return sum(sums[mask >> (BYTE_SIZE * byte_index) & 0xFF] for byte_index, sums in enumerate(table))
@@ -0,0 +1,60 @@
+"""
+Lower bounds of the team distribution metrics.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from falcon_formation.data_models import Position, TeamDistributionMetrics
+from falcon_formation.solver.branch_and_bound import SuffixSubsetSums
+from falcon_formation.solver.stratified import find_best_position_counts
+
+if TYPE_CHECKING:
+    from falcon_formation.data_models import Player
+
+
+def calculate_metrics_lower_bound(players: list[Player]) -> TeamDistributionMetrics:
+    """Return a lower bound of the metrics of every team combination of the players.
+
+    The goalie and defense number differences are exact. The skill differences only consider the team size and
+    the reachable skill sums, so a team combination reaching the bound is proven optimal.
+
+    Args:
+        players (list[Player]): List of registered Members and Guests.
+
+    Returns:
+        TeamDistributionMetrics: The lower bound of the metrics.
+    """
+    team_size = len(players) // 2
+    number_of_goalies = sum(player.position == Position.GOALIE for player in players)
+    defense_skills = [player.skill for player in players if player.position == Position.DEFENSE]
+    position_counts = find_best_position_counts(
+        number_of_goalies,
+        len(defense_skills),
+        len(players) - number_of_goalies - len(defense_skills),
+        team_size,
+    )
+    goalie_count, defense_count, _ = position_counts[0]
+    goalie_number_difference = abs(2 * goalie_count - number_of_goalies)
+
+    # Goalie skill is not considered if there is a goalie number difference.
+    skills = [
+        0 if goalie_number_difference and player.position == Position.GOALIE else player.skill for player in players
+    ]
+    skill_difference = SuffixSubsetSums(skills, team_size).minimal_difference(sum(skills), 0, 0, team_size)
+
+    defense_skill_sums = SuffixSubsetSums(defense_skills, len(defense_skills))
+    defense_skill_difference = min(
+        defense_skill_sums.minimal_difference(sum(defense_skills), 0, 0, defense_count)
+        for _, defense_count, _ in position_counts
+    )
+
+    return TeamDistributionMetrics(
+        goalie_number_difference=goalie_number_difference,
+        defense_number_difference=abs(2 * defense_count - len(defense_skills)),
+        skill_difference=skill_difference,
+        defense_skill_difference=defense_skill_difference,
+    )
@@ -0,0 +1,311 @@
+"""
+Branch-and-bound solver for creating team distributions.
+
+Players are assigned to the teams one at a time, and every partial assignment whose best achievable metrics are
+not better than the best team combination found so far is dropped.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+import math
+from itertools import accumulate
+from typing import TYPE_CHECKING
+
+from falcon_formation.data_models import ConstraintKind, Position, TeamDistributionMetrics
+from falcon_formation.solver.solver_result import SolverResult
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from falcon_formation.data_models import Player, PlayerConstraint
+
+# Goalies and defense are assigned first, so the top two metrics are settled early in the search.
+POSITION_ORDER = {Position.GOALIE: 0, Position.DEFENSE: 1, Position.FORWARD: 2}
+
+
+def solve_branch_and_bound(
+    players: list[Player],
+    constraints: Sequence[PlayerConstraint] = (),
+) -> SolverResult | None:
+    """Find the best team combination with an exact branch-and-bound search.
+
+    Returns the same optimal metrics as scoring every team combination that satisfies the constraints.
+    Players with the same position and skill keep their (shuffled) order, so a random optimal team combination is
+    returned, but it is not sampled uniformly from every optimal team combination.
+
+    Args:
+        players (list[Player]): List of registered Members and Guests.
+        constraints (Sequence[PlayerConstraint], optional): Players to keep in the same team or in different teams.
+            A player whose constrained pair is already assigned is only tried in one team, so the team combinations
+            breaking a constraint are never enumerated. Constraints of unregistered players are ignored.
+            Defaults to ().
+
+    Returns:
+        SolverResult | None: The best team combination and its metrics, or None if the constraints cannot be
+            satisfied.
+    """
+    ordered_players = sorted(players, key=lambda player: (POSITION_ORDER[Position(player.position)], -player.skill))
+    search = _BranchAndBoundSearch(ordered_players)
+    indices = {player.identifier: index for index, player in enumerate(ordered_players)}
+    for constraint in constraints:
+        if constraint.first_player in indices and constraint.second_player in indices:
+            search.add_constraint(
+                indices[constraint.first_player],
+                indices[constraint.second_player],
+                same_team=constraint.kind == ConstraintKind.KEEP_TOGETHER,
+            )
+    search.run()
+    if search.best_metrics is None:
+        return None
+
+    team_1 = tuple(player for player, selected in zip(ordered_players, search.best_assignment, strict=True) if selected)
+    team_2 = tuple(
+        player for player, selected in zip(ordered_players, search.best_assignment, strict=True) if not selected
+    )
+    return SolverResult(
+        metrics=TeamDistributionMetrics(*search.best_metrics),
+        team_combination=(team_1, team_2),
+        evaluated_splits=search.evaluated_splits,
+    )
+
+
+class SuffixSubsetSums:
+    """Reachable sums of a given number of values chosen from every suffix of a list of values.
+
+    The sums are stored as bitsets in Python integers, so a bound query only needs a few integer operations.
+    """
+
+    def __init__(self: SuffixSubsetSums, values: list[int], maximum_count: int) -> None:
+        """Calculate the reachable sums for every suffix and every count up to maximum_count."""
+        # A sum of count values is stored as bit b, where sum = count * minimum + step * b.
+        self.minimum = min(values, default=0)
+        self.step = math.gcd(*(value - self.minimum for value in values)) or 1
+        shifted_values = [(value - self.minimum) // self.step for value in values]
+
+        self.bitsets: list[list[int]] = [[1]]
+        for index in range(len(values) - 1, -1, -1):
+            previous = self.bitsets[-1]
+            bitsets = [previous[0]]
+            for count in range(1, min(maximum_count, len(values) - index) + 1):
+                bitset = previous[count] if count < len(previous) else 0
+                bitsets.append(bitset | (previous[count - 1] << shifted_values[index]))
+            self.bitsets.append(bitsets)
+        self.bitsets.reverse()
+
+    def minimal_difference(self: SuffixSubsetSums, total: int, team_value: int, index: int, count: int) -> int:
+        """Return the smallest |2 * (team_value + x) - total| where x is a sum of count values from values[index:].
+
+        Args:
+            total (int): The total value that is split between the two teams.
+            team_value (int): The value already assigned to team one.
+            index (int): The start of the suffix of values that can still be added to team one.
+            count (int): The number of values that are added to team one.
+
+        Returns:
+            int: The smallest reachable absolute difference between the teams.
+        """
+        bitset = self.bitsets[index][count]
+        # Looking for the bit b that makes 2 * step * b closest to the target.
+        target = total - 2 * team_value - 2 * count * self.minimum
+        closest_bit_below = target // (2 * self.step)
+
+        differences = []
+        if closest_bit_below >= 0:
+            bits_below = bitset & ((1 << (closest_bit_below + 1)) - 1)
+            if bits_below:
+                differences.append(target - 2 * self.step * (bits_below.bit_length() - 1))
+        first_bit_above = max(closest_bit_below + 1, 0)
+        bits_above = bitset >> first_bit_above
+        if bits_above:
+            differences.append(2 * self.step * (first_bit_above + (bits_above & -bits_above).bit_length() - 1) - target)
+        return min(differences)
+
+
+class _BranchAndBoundSearch:
+    def __init__(self: _BranchAndBoundSearch, players: list[Player]) -> None:
+        self.number_of_players = len(players)
+        self.team_size = self.number_of_players // 2
+        self.skills = [player.skill for player in players]
+        self.goalies = [player.position == Position.GOALIE for player in players]
+        self.defenses = [player.position == Position.DEFENSE for player in players]
+        self.non_goalie_skills = [
+            0 if goalie else skill for skill, goalie in zip(self.skills, self.goalies, strict=True)
+        ]
+        self.defense_skills = [
+            skill if defense else 0 for skill, defense in zip(self.skills, self.defenses, strict=True)
+        ]
+
+        self.total_goalies = sum(self.goalies)
+        self.total_defenses = sum(self.defenses)
+        self.total_skill = sum(self.skills)
+        self.total_non_goalie_skill = sum(self.non_goalie_skills)
+        self.total_defense_skill = sum(self.defense_skills)
+
+        self.assigned_skills = [0, *accumulate(self.skills)]
+        self.remaining_goalies = [sum(self.goalies[index:]) for index in range(self.number_of_players + 1)]
+        self.remaining_defenses = [sum(self.defenses[index:]) for index in range(self.number_of_players + 1)]
+        self.skill_sums = SuffixSubsetSums(self.skills, self.team_size)
+        self.non_goalie_skill_sums = SuffixSubsetSums(self.non_goalie_skills, self.team_size)
+        self.defense_skill_sums = SuffixSubsetSums(
+            [skill for skill, defense in zip(self.skills, self.defenses, strict=True) if defense],
+            self.total_defenses,
+        )
+        # Index of the first remaining defense player in the defense skill sums for every position in the order.
+        self.defense_offsets = [sum(self.defenses[:index]) for index in range(self.number_of_players + 1)]
+
+        # The earlier players that have to be in the same team as, or in a different team than, each player.
+        self.same_team: list[list[int]] = [[] for _ in range(self.number_of_players)]
+        self.different_team: list[list[int]] = [[] for _ in range(self.number_of_players)]
+
+        self.assignment = [False] * self.number_of_players
+        self.best_assignment: list[bool] = []
+        self.best_metrics: tuple[int, int, int, int] | None = None
+        self.evaluated_splits = 0
+
+        # Running totals of team one for the current partial assignment.
+        self.team_goalies = 0
+        self.team_defenses = 0
+        self.team_skill = 0
+        self.team_non_goalie_skill = 0
+        self.team_defense_skill = 0
+
+    def add_constraint(self: _BranchAndBoundSearch, first: int, second: int, *, same_team: bool) -> None:
+        # The constraint is checked when the later of the two players is assigned.
+        earlier, later = sorted((first, second))
+        (self.same_team if same_team else self.different_team)[later].append(earlier)
+
+    def run(self: _BranchAndBoundSearch) -> None:
+        if self.number_of_players % 2 == 0 and self.number_of_players > 0:
+            # (A, B) and (B, A) are the same split, so the first player is fixed in team one.
+            self._move(0, 1)
+            self._search(1, self.team_size - 1)
+        else:
+            self._search(0, self.team_size)
+
+    def _search(self: _BranchAndBoundSearch, index: int, slots: int) -> None:
+        if index == self.number_of_players:
+            self._evaluate()
+            return
+        if self.best_metrics is not None and self._is_pruned(index, slots):
+            return
+
+        for to_team_1 in self._branch_order(index, slots):
+            if to_team_1:
+                self._move(index, 1)
+                self._search(index + 1, slots - 1)
+                self._move(index, -1)
+            else:
+                self._search(index + 1, slots)
+
+    def _move(self: _BranchAndBoundSearch, index: int, direction: int) -> None:
+        self.assignment[index] = direction == 1
+        self.team_goalies += direction * self.goalies[index]
+        self.team_defenses += direction * self.defenses[index]
+        self.team_skill += direction * self.skills[index]
+        self.team_non_goalie_skill += direction * self.non_goalie_skills[index]
+        self.team_defense_skill += direction * self.defense_skills[index]
+
+    def _branch_order(self: _BranchAndBoundSearch, index: int, slots: int) -> tuple[bool, ...]:
+        # A constrained player follows the team of its earlier pair, which may leave no team at all.
+        to_team_1_allowed = (
+            slots > 0
+            and all(self.assignment[other] for other in self.same_team[index])
+            and not any(self.assignment[other] for other in self.different_team[index])
+        )
+        to_team_2_allowed = (
+            slots < self.number_of_players - index
+            and not any(self.assignment[other] for other in self.same_team[index])
+            and all(self.assignment[other] for other in self.different_team[index])
+        )
+        if not to_team_1_allowed or not to_team_2_allowed:
+            return ((True,) if to_team_1_allowed else ()) + ((False,) if to_team_2_allowed else ())
+        # Greedily try the team that is behind first, which quickly finds a good incumbent.
+        if self.goalies[index]:
+            behind = 2 * self.team_goalies - self.total_goalies + self.remaining_goalies[index]
+        elif self.defenses[index]:
+            behind = 2 * self.team_defenses - self.total_defenses + self.remaining_defenses[index]
+        else:
+            behind = 0
+        if behind == 0:
+            behind = 2 * self.team_skill - self.assigned_skills[index]
+        return (True, False) if behind <= 0 else (False, True)
+
+    def _evaluate(self: _BranchAndBoundSearch) -> None:
+        self.evaluated_splits += 1
+        goalie_number_difference = abs(2 * self.team_goalies - self.total_goalies)
+        if goalie_number_difference == 0:
+            skill_difference = abs(2 * self.team_skill - self.total_skill)
+        else:
+            # Goalie skill is not considered if there is a goalie number difference.
+            skill_difference = abs(2 * self.team_non_goalie_skill - self.total_non_goalie_skill)
+        metrics = (
+            goalie_number_difference,
+            abs(2 * self.team_defenses - self.total_defenses),
+            skill_difference,
+            abs(2 * self.team_defense_skill - self.total_defense_skill),
+        )
+        if self.best_metrics is None or metrics < self.best_metrics:
+            self.best_metrics = metrics
+            self.best_assignment = self.assignment.copy()
+
+    def _is_pruned(self: _BranchAndBoundSearch, index: int, slots: int) -> bool:
+        # Lower bounds are compared metric by metric, and only computed while they tie with the best metrics.
+        best_metrics = self.best_metrics
+        if best_metrics is None:  # pragma: no cover
+            return False
+        remaining = self.number_of_players - index
+
+        remaining_goalies = self.remaining_goalies[index]
+        goalie_bound = _minimal_count_difference(
+            self.total_goalies,
+            self.team_goalies + max(0, remaining_goalies - (remaining - slots)),
+            self.team_goalies + min(remaining_goalies, slots),
+        )
+        if goalie_bound != best_metrics[0]:
+            return goalie_bound > best_metrics[0]
+
+        remaining_defenses = self.remaining_defenses[index]
+        minimum_defenses = max(0, remaining_defenses - (remaining - slots))
+        maximum_defenses = min(remaining_defenses, slots)
+        defense_bound = _minimal_count_difference(
+            self.total_defenses,
+            self.team_defenses + minimum_defenses,
+            self.team_defenses + maximum_defenses,
+        )
+        if defense_bound != best_metrics[1]:
+            return defense_bound > best_metrics[1]
+
+        # Only completions with the same goalie number difference can tie, which decides how skill is counted.
+        if best_metrics[0] == 0:
+            skill_bound = self.skill_sums.minimal_difference(self.total_skill, self.team_skill, index, slots)
+        else:
+            skill_bound = self.non_goalie_skill_sums.minimal_difference(
+                self.total_non_goalie_skill,
+                self.team_non_goalie_skill,
+                index,
+                slots,
+            )
+        if skill_bound != best_metrics[2]:
+            return skill_bound > best_metrics[2]
+
+        defense_skill_bound = min(
+            self.defense_skill_sums.minimal_difference(
+                self.total_defense_skill,
+                self.team_defense_skill,
+                self.defense_offsets[index],
+                count,
+            )
+            for count in range(minimum_defenses, maximum_defenses + 1)
+        )
+        return defense_skill_bound >= best_metrics[3]
+
+
+def _minimal_count_difference(total: int, lower: int, upper: int) -> int:
+    # Smallest |2 * x - total| for a team one count x between lower and upper.
+    if 2 * upper <= total:
+        return total - 2 * upper
+    if 2 * lower >= total:
+        return 2 * lower - total
+    return total % 2
@@ -0,0 +1,153 @@
+"""
+Cost model of the solvers for creating team distributions.
+
+The runtime of every exact solver is predicted from the size and the position and skill histogram of the roster,
+so a solver can be picked automatically under a latency target.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+import math
+from collections import Counter
+from typing import TYPE_CHECKING
+
+from falcon_formation.data_models import Position
+from falcon_formation.solver.parallel import count_shards
+from falcon_formation.solver.solver_strategy import SolverStrategy
+from falcon_formation.solver.stratified import find_best_position_counts
+from falcon_formation.solver.team_combinations import count_team_one_indices
+
+if TYPE_CHECKING:
+    from collections.abc import Collection
+
+    from falcon_formation.data_models import Player
+
+# Seconds per unit of work of the exact solvers without stopping early, measured on a single core.
+# The units are team combinations for the enumerating solvers, search nodes for the branch-and-bound solver,
+# position combinations for the stratified solver, subset-sum table entries for the dynamic programming solver, class
+# count choices for the multiset solver, and team combinations per process for the parallel solver.
+SECONDS_PER_UNIT = {
+    SolverStrategy.BRUTE_FORCE: 15e-6,
+    SolverStrategy.BATCHED: 1.5e-6,
+    SolverStrategy.BRANCH_AND_BOUND: 3e-6,
+    SolverStrategy.STRATIFIED: 1.5e-6,
+    SolverStrategy.DYNAMIC_PROGRAMMING: 0.1e-6,
+    SolverStrategy.PARALLEL: 1.5e-6,
+    SolverStrategy.MULTISET: 1.5e-6,
+    SolverStrategy.BITMASK: 4e-6,
+    SolverStrategy.GRAY_CODE: 1.3e-6,
+}
+SECONDS_OVERHEAD = 1e-3
+# Spawning the processes of the parallel solver, which import the solver modules again.
+SECONDS_PROCESS_POOL_OVERHEAD = 0.3
+# A goalie and defense combination of the stratified solver also searches the forward skill sums and builds metrics.
+STRATIFIED_UNITS_PER_GOALIE_DEFENSE_COMBINATION = 4
+
+
+def estimate_solver_runtimes(
+    players: list[Player],
+    number_of_workers: int | None = None,
+) -> dict[SolverStrategy, float]:
+    """Predict the worst case runtime of every exact solver.
+
+    The branch-and-bound solver is predicted without pruning, which it usually does a lot of, so it is only picked
+    when the other solvers are predicted to be slower.
+
+    Args:
+        players (list[Player]): List of registered Members and Guests.
+        number_of_workers (int | None, optional): The number of processes of the parallel solver. Defaults to None,
+            the number of CPUs.
+
+    Returns:
+        dict[SolverStrategy, float]: The predicted runtime in seconds of each solver.
+    """
+    number_of_splits = count_team_one_indices(len(players))
+    number_of_shards = count_shards(number_of_splits, number_of_workers)
+    # Every (position, skill) class can have any number of its players in team one.
+    number_of_class_counts = float(
+        math.prod(count + 1 for count in Counter((player.position, player.skill) for player in players).values()),
+    )
+    units = {
+        SolverStrategy.BRUTE_FORCE: float(number_of_splits),
+        SolverStrategy.BATCHED: float(number_of_splits),
+        # Without pruning, the search tree has a node for every team combination and at most as many inner nodes.
+        SolverStrategy.BRANCH_AND_BOUND: 2.0 * number_of_splits,
+        SolverStrategy.STRATIFIED: float(_count_stratified_units(players)),
+        SolverStrategy.DYNAMIC_PROGRAMMING: float(_count_subset_sum_entries(players)),
+        SolverStrategy.PARALLEL: number_of_splits / number_of_shards,
+        SolverStrategy.MULTISET: number_of_class_counts,
+        SolverStrategy.BITMASK: float(number_of_splits),
+        SolverStrategy.GRAY_CODE: float(number_of_splits),
+    }
+    overheads = {SolverStrategy.PARALLEL: SECONDS_PROCESS_POOL_OVERHEAD if number_of_shards > 1 else 0.0}
+    return {
+        solver_strategy: SECONDS_OVERHEAD
+        + overheads.get(solver_strategy, 0.0)
+        + SECONDS_PER_UNIT[solver_strategy] * number_of_units
+        for solver_strategy, number_of_units in units.items()
+    }
+
+
+def select_solver_strategy(
+    players: list[Player],
+    latency_target: float,
+    solver_strategies: Collection[SolverStrategy] | None = None,
+    number_of_workers: int | None = None,
+) -> tuple[SolverStrategy, float]:
+    """Pick the exact solver with the smallest predicted runtime, or the anytime solver if none meets the target.
+
+    Args:
+        players (list[Player]): List of registered Members and Guests.
+        latency_target (float): The number of seconds the solver may take.
+        solver_strategies (Collection[SolverStrategy] | None, optional): The exact solvers to pick from, for example
+            the ones supporting a tie-break. Defaults to None, every exact solver.
+        number_of_workers (int | None, optional): The number of processes of the parallel solver. Defaults to None,
+            the number of CPUs.
+
+    Returns:
+        tuple[SolverStrategy, float]: The solver strategy and its predicted runtime in seconds. The anytime solver
+            is predicted to use the whole latency target.
+    """
+    runtimes = {
+        solver_strategy: runtime
+        for solver_strategy, runtime in estimate_solver_runtimes(players, number_of_workers).items()
+        if solver_strategies is None or solver_strategy in solver_strategies
+    }
+    solver_strategy = min(runtimes, key=lambda solver_strategy: runtimes[solver_strategy], default=None)
+    if solver_strategy is None or runtimes[solver_strategy] > latency_target:
+        return SolverStrategy.ANYTIME, latency_target
+    return solver_strategy, runtimes[solver_strategy]
+
+
+def _count_stratified_units(players: list[Player]) -> int:
+    # The forward combinations are grouped once, and every goalie and defense combination is scored against them.
+    number_of_goalies = sum(player.position == Position.GOALIE for player in players)
+    number_of_defenses = sum(player.position == Position.DEFENSE for player in players)
+    number_of_forwards = len(players) - number_of_goalies - number_of_defenses
+    return sum(
+        math.comb(number_of_forwards, forward_count)
+        + STRATIFIED_UNITS_PER_GOALIE_DEFENSE_COMBINATION
+        * math.comb(number_of_goalies, goalie_count)
+        * math.comb(number_of_defenses, defense_count)
+        for goalie_count, defense_count, forward_count in find_best_position_counts(
+            number_of_goalies,
+            number_of_defenses,
+            number_of_forwards,
+            len(players) // 2,
+        )
+    )
+
+
+def _count_subset_sum_entries(players: list[Player]) -> int:
+    # The subset-sum table of each position has an entry for every prefix, subset size and reachable skill sum.
+    number_of_entries = 0
+    for position in Position:
+        skills = [player.skill for player in players if player.position == position]
+        if not skills:
+            continue
+        step = math.gcd(*(skill - min(skills) for skill in skills)) or 1
+        number_of_sums = min(2 ** len(skills), len(skills) * (max(skills) - min(skills)) // step + 1)
+        number_of_entries += len(skills) ** 2 * number_of_sums
+    return number_of_entries
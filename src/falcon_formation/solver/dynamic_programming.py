@@ -0,0 +1,170 @@
+"""
+Dynamic programming solver for creating team distributions.
+
+Skills are bounded integers, so instead of enumerating every team combination the number of player subsets of every
+size and skill sum is counted for each position. The runtime grows with the roster size times the skill range,
+not binomially.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+import random
+from bisect import bisect_right
+from itertools import accumulate
+from typing import TYPE_CHECKING
+
+from falcon_formation.data_models import Position, TeamDistributionMetrics
+from falcon_formation.solver.solver_result import SolverResult
+from falcon_formation.solver.stratified import find_best_position_counts, find_closest_skills
+
+if TYPE_CHECKING:
+    from falcon_formation.data_models import Player
+
+
+def solve_dynamic_programming(players: list[Player], number_of_samples: int = 1) -> SolverResult | None:
+    """Find the best team combination with subset-sum dynamic programming.
+
+    The returned team combination is sampled uniformly from every optimal team combination.
+
+    Args:
+        players (list[Player]): List of registered Members and Guests.
+        number_of_samples (int, optional): The number of optimal team combinations sampled from the same tables,
+            returned as the optimal samples of the result. Defaults to 1.
+
+    Returns:
+        SolverResult | None: The best team combination and its metrics.
+    """
+    metrics, team_combinations = sample_optimal_team_combinations(players, max(1, number_of_samples))
+    return SolverResult(
+        metrics=metrics,
+        team_combination=team_combinations[0],
+        optimal_samples=tuple(team_combinations),
+    )
+
+
+def sample_optimal_team_combinations(
+    players: list[Player],
+    number_of_samples: int,
+) -> tuple[TeamDistributionMetrics, list[tuple[tuple[Player, ...], tuple[Player, ...]]]]:
+    """Find the optimal metrics and rebuild optimal team combinations from the subset-sum tables.
+
+    Every team combination is sampled independently and uniformly from every optimal team combination.
+
+    Args:
+        players (list[Player]): List of registered Members and Guests.
+        number_of_samples (int): The number of optimal team combinations to rebuild.
+
+    Returns:
+        tuple[TeamDistributionMetrics, list[tuple[tuple[Player, ...], tuple[Player, ...]]]]: The optimal metrics and
+            the sampled optimal team combinations.
+    """
+    goalie_table = _SubsetSumTable([player for player in players if player.position == Position.GOALIE])
+    defense_table = _SubsetSumTable([player for player in players if player.position == Position.DEFENSE])
+    forward_table = _SubsetSumTable([player for player in players if player.position == Position.FORWARD])
+    total_goalie_skill = goalie_table.total_skill
+    total_defense_skill = defense_table.total_skill
+
+    best_metrics: TeamDistributionMetrics | None = None
+    # Each optimal (goalie count, goalie skill, defense count, defense skill, forward count, forward skill) choice,
+    # together with the number of team combinations it stands for.
+    best_choices: list[tuple[tuple[int, int, int, int, int, int], int]] = []
+
+    for goalie_count, defense_count, forward_count in find_best_position_counts(
+        len(goalie_table.players),
+        len(defense_table.players),
+        len(forward_table.players),
+        len(players) // 2,
+    ):
+        goalie_number_difference = abs(2 * goalie_count - len(goalie_table.players))
+        # Goalie skill is not considered if there is a goalie number difference.
+        total_skill = total_defense_skill + forward_table.total_skill
+        if goalie_number_difference == 0:
+            total_skill += total_goalie_skill
+
+        forward_sums = forward_table.subset_counts(forward_count)
+        forward_skills = sorted(forward_sums)
+        for goalie_skill, goalie_ways in goalie_table.subset_counts(goalie_count).items():
+            counted_goalie_skill = 0 if goalie_number_difference else goalie_skill
+            for defense_skill, defense_ways in defense_table.subset_counts(defense_count).items():
+                remaining_skill = total_skill - 2 * (counted_goalie_skill + defense_skill)
+                for forward_skill in find_closest_skills(forward_skills, remaining_skill):
+                    metrics = TeamDistributionMetrics(
+                        goalie_number_difference=goalie_number_difference,
+                        defense_number_difference=abs(2 * defense_count - len(defense_table.players)),
+                        skill_difference=abs(remaining_skill - 2 * forward_skill),
+                        defense_skill_difference=abs(2 * defense_skill - total_defense_skill),
+                    )
+                    if best_metrics is None or metrics < best_metrics:
+                        best_metrics = metrics
+                        best_choices = []
+                    if metrics == best_metrics:
+                        best_choices.append(
+                            (
+                                (
+                                    goalie_count,
+                                    goalie_skill,
+                                    defense_count,
+                                    defense_skill,
+                                    forward_count,
+                                    forward_skill,
+                                ),
+                                goalie_ways * defense_ways * forward_sums[forward_skill],
+                            ),
+                        )
+
+    if best_metrics is None:  # pragma: no cover
+        msg = "There is always at least one valid team combination."
+        raise RuntimeError(msg)
+
+    team_combinations: list[tuple[tuple[Player, ...], tuple[Player, ...]]] = []
+    # Choices are picked with probability proportional to the number of team combinations they stand for.
+    cumulative_ways = list(accumulate(ways for _, ways in best_choices))
+    for _ in range(number_of_samples):
+        choice_index = bisect_right(cumulative_ways, random.randrange(cumulative_ways[-1]))  # noqa: S311
+        goalie_count, goalie_skill, defense_count, defense_skill, forward_count, forward_skill = best_choices[
+            choice_index
+        ][0]
+        team_1 = (
+            *goalie_table.sample(goalie_count, goalie_skill),
+            *defense_table.sample(defense_count, defense_skill),
+            *forward_table.sample(forward_count, forward_skill),
+        )
+        team_1_ids = {id(player) for player in team_1}
+        team_combinations.append((team_1, tuple(player for player in players if id(player) not in team_1_ids)))
+
+    return best_metrics, team_combinations
+
+
+class _SubsetSumTable:
+    def __init__(self: _SubsetSumTable, players: list[Player]) -> None:
+        # ways[index][count][skill] is the number of subsets of players[:index] with count players and skill sum.
+        self.players = players
+        self.total_skill = sum(player.skill for player in players)
+        self.ways: list[list[dict[int, int]]] = [[{0: 1}]]
+        for player in players:
+            previous = self.ways[-1]
+            current = [counts.copy() for counts in previous]
+            current.append({})
+            for count, counts in enumerate(previous):
+                next_counts = current[count + 1]
+                for skill, ways in counts.items():
+                    next_counts[skill + player.skill] = next_counts.get(skill + player.skill, 0) + ways
+            self.ways.append(current)
+
+    def subset_counts(self: _SubsetSumTable, count: int) -> dict[int, int]:
+        return self.ways[-1][count]
+
+    def sample(self: _SubsetSumTable, count: int, skill: int) -> list[Player]:
+        # Walk the table backwards, taking every player with the probability of being in a uniform random subset.
+        subset: list[Player] = []
+        for index in range(len(self.players), 0, -1):
+            player = self.players[index - 1]
+            ways = self.ways[index][count][skill]
+            ways_with_player = self.ways[index - 1][count - 1].get(skill - player.skill, 0) if count else 0
+            if random.randrange(ways) < ways_with_player:  # noqa: S311
+                subset.append(player)
+                count -= 1
+                skill -= player.skill
+        return subset
@@ -0,0 +1,153 @@
+"""
+Gray code solver for creating team distributions.
+
+The team combinations are enumerated in revolving-door order, where consecutive team combinations differ by swapping
+exactly one player between the teams. The totals of team one are updated with the two swapped players, so scoring a
+team combination takes constant work instead of summing the teams.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+from dataclasses import astuple
+from typing import TYPE_CHECKING
+
+from falcon_formation.data_models import Position, TeamDistributionMetrics
+from falcon_formation.solver.bounds import calculate_metrics_lower_bound
+from falcon_formation.solver.reservoir import ReservoirSampler
+from falcon_formation.solver.solver_result import SolverResult
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from falcon_formation.data_models import Player
+
+
+def solve_gray_code(players: list[Player]) -> SolverResult | None:
+    """Find the best team combination by scoring every team combination in revolving-door order.
+
+    Produces the same optimal metrics as scoring every team combination one by one. The search stops at the first
+    team combination reaching the lower bound of the metrics, otherwise the returned team combination is sampled
+    uniformly from every optimal team combination.
+
+    Args:
+        players (list[Player]): List of registered Members and Guests.
+
+    Returns:
+        SolverResult | None: The best team combination and its metrics.
+    """
+    goalies = [int(player.position == Position.GOALIE) for player in players]
+    defenses = [int(player.position == Position.DEFENSE) for player in players]
+    skills = [player.skill for player in players]
+    goalie_skills = [skill * goalie for skill, goalie in zip(skills, goalies, strict=True)]
+    defense_skills = [skill * defense for skill, defense in zip(skills, defenses, strict=True)]
+    total_goalies, total_defenses, total_skill = sum(goalies), sum(defenses), sum(skills)
+    total_non_goalie_skill = total_skill - sum(goalie_skills)
+    total_defense_skill = sum(defense_skills)
+
+    # With an even number of players the first player is fixed in team one, and the rest of team one is chosen from
+    # the rest of the players.
+    first_index = int(len(players) % 2 == 0 and len(players) > 0)
+    team_size = len(players) // 2
+    mask = (1 << team_size) - 1
+    team_goalies = sum(goalies[:team_size])
+    team_defenses = sum(defenses[:team_size])
+    team_skill = sum(skills[:team_size])
+    team_goalie_skill = sum(goalie_skills[:team_size])
+    team_defense_skill = sum(defense_skills[:team_size])
+
+    lower_bound = astuple(calculate_metrics_lower_bound(players))
+    evaluated_splits = 0
+    best_metrics: tuple[int, int, int, int] | None = None
+    best_masks: ReservoirSampler[int] = ReservoirSampler()
+    swaps = generate_revolving_door_swaps(len(players) - first_index, team_size - first_index)
+    while True:
+        goalie_number_difference = abs(2 * team_goalies - total_goalies)
+        if goalie_number_difference == 0:
+            skill_difference = abs(2 * team_skill - total_skill)
+        else:
+            # Goalie skill is not considered if there is a goalie number difference.
+            skill_difference = abs(2 * (team_skill - team_goalie_skill) - total_non_goalie_skill)
+        metrics = (
+            goalie_number_difference,
+            abs(2 * team_defenses - total_defenses),
+            skill_difference,
+            abs(2 * team_defense_skill - total_defense_skill),
+        )
+        if best_metrics is None or metrics < best_metrics:
+            best_metrics = metrics
+            best_masks.reset()
+        if metrics == best_metrics:
+            best_masks.append(mask)
+        evaluated_splits += 1
+        if best_metrics == lower_bound:
+            break
+
+        swap = next(swaps, None)
+        if swap is None:
+            break
+        out, into = swap[0] + first_index, swap[1] + first_index
+        mask ^= 1 << out | 1 << into
+        team_goalies += goalies[into] - goalies[out]
+        team_defenses += defenses[into] - defenses[out]
+        team_skill += skills[into] - skills[out]
+        team_goalie_skill += goalie_skills[into] - goalie_skills[out]
+        team_defense_skill += defense_skills[into] - defense_skills[out]
+
+    best_mask = best_masks.samples[0]
+    team_1 = tuple(player for index, player in enumerate(players) if best_mask >> index & 1)
+    team_2 = tuple(player for index, player in enumerate(players) if not best_mask >> index & 1)
+    return SolverResult(
+        metrics=TeamDistributionMetrics(*best_metrics),
+        team_combination=(team_1, team_2),
+        evaluated_splits=evaluated_splits,
+        lower_bound_reached=best_metrics == lower_bound,
+    )
+
+
+def generate_revolving_door_swaps(number_of_values: int, size: int) -> Iterator[tuple[int, int]]:
+    """Generate the swaps that visit every combination of range(number_of_values) exactly once, from range(size).
+
+    This is the revolving-door Gray code (Knuth, The Art of Computer Programming, Algorithm 7.2.1.3R).
+
+    Args:
+        number_of_values (int): The number of values to choose from.
+        size (int): The number of values in a combination.
+
+    Yields:
+        tuple[int, int]: The value leaving and the value entering the combination.
+    """
+    if size in {0, number_of_values}:
+        return
+    # combination[j - 1] is the j-th smallest value, followed by a sentinel.
+    combination = [*range(size), number_of_values]
+    while True:
+        first = combination[0]
+        if size % 2 == 1 and first + 1 < combination[1]:
+            combination[0] = first + 1
+            yield first, first + 1
+            continue
+        if size % 2 == 0 and first > 0:
+            combination[0] = first - 1
+            yield first, first - 1
+            continue
+
+        # Alternately try to decrease and to increase the j-th smallest value.
+        decrease = size % 2 == 1
+        for j in range(2, size + 1):
+            if decrease and combination[j - 1] >= j:
+                out = combination[j - 1]
+                combination[j - 1] = combination[j - 2]
+                combination[j - 2] = j - 2
+                yield out, j - 2
+                break
+            if not decrease and combination[j - 1] + 1 < combination[j]:
+                into = combination[j - 1] + 1
+                combination[j - 2] = combination[j - 1]
+                combination[j - 1] = into
+                yield j - 2, into
+                break
+            decrease = not decrease
+        else:
+            return
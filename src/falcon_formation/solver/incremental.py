@@ -0,0 +1,83 @@
+"""
+Incremental solver for updating team distributions.
+
+When a few players register or unregister after the teams were created, the previous team combination is repaired
+with swaps instead of searching every team combination again.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from falcon_formation.solver.anytime import SwapSearch
+from falcon_formation.solver.bounds import calculate_metrics_lower_bound
+from falcon_formation.solver.solver_result import SolverResult
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from falcon_formation.data_models import Player
+
+
+def repair_team_combination(
+    previous_team_combination: tuple[Sequence[Player], Sequence[Player]],
+    players: list[Player],
+    number_of_perturbations: int = 20,
+) -> SolverResult | None:
+    """Update the previous team combination to the current players.
+
+    Players who are still registered (with the same skill and position) stay in their previous team, new players fill
+    up the teams, then the team combination is improved with swaps.
+
+    Args:
+        previous_team_combination (tuple[Sequence[Player], Sequence[Player]]): The previously created teams.
+        players (list[Player]): List of registered Members and Guests.
+        number_of_perturbations (int, optional): The number of times the best team combination is perturbed with two
+            random swaps and improved again, if it is not proven optimal yet. Defaults to 20.
+
+    Returns:
+        SolverResult | None: The repaired team combination and its metrics, or None if the players did not change or
+            the repaired team combination is not proven optimal, in which case every team combination is searched.
+    """
+    indices = {player.identifier: index for index, player in enumerate(players)}
+    kept_teams: list[set[int]] = [set(), set()]
+    for kept_team, previous_team in zip(kept_teams, previous_team_combination, strict=True):
+        for previous_player in previous_team:
+            index = indices.get(previous_player.identifier)
+            if index is not None and players[index] == previous_player:
+                kept_team.add(index)
+    new_players = [index for index in range(len(players)) if not any(index in team for team in kept_teams)]
+    number_of_previous_players = sum(len(team) for team in previous_team_combination)
+    if not new_players and len(players) == number_of_previous_players:
+        return None
+
+    # The smaller kept team becomes team one, which is then filled up with new players first.
+    team_1, team_2 = sorted(kept_teams, key=len)
+    team_size = len(players) // 2
+    search = SwapSearch(players, team_1)
+    search.fill(new_players, team_size)
+    search.fill(sorted(team_2), team_size)
+    search.improve()
+
+    lower_bound = calculate_metrics_lower_bound(players)
+    best_metrics, best_team_1 = search.metrics(), search.team_1.copy()
+    for _ in range(number_of_perturbations):
+        if best_metrics == lower_bound:
+            break
+        search.team_1 = best_team_1.copy()
+        search.perturb(2)
+        search.improve()
+        if search.metrics() < best_metrics:
+            best_metrics, best_team_1 = search.metrics(), search.team_1.copy()
+
+    if best_metrics != lower_bound:
+        return None
+    return SolverResult(
+        metrics=best_metrics,
+        team_combination=(
+            tuple(players[index] for index in sorted(best_team_1)),
+            tuple(player for index, player in enumerate(players) if index not in best_team_1),
+        ),
+    )
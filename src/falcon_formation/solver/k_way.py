@@ -0,0 +1,254 @@
+"""
+K-way solver for creating team distributions with more than two teams.
+
+Every metric is generalized to the spread between the largest and the smallest team. The teams are seeded with
+balanced largest differencing, where partial partitions are merged by pairing their largest and smallest teams, then
+improved with swaps between the teams.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import random
+import time
+from typing import TYPE_CHECKING
+
+from falcon_formation.data_models import Position, TeamDistributionMetrics
+from falcon_formation.solver.solver_result import SolverResult
+
+if TYPE_CHECKING:
+    from falcon_formation.data_models import Player
+
+
+def solve_k_way(players: list[Player], number_of_teams: int, time_budget: float = 1.0) -> SolverResult:
+    """Find a good team combination of the given number of teams within the time budget.
+
+    The first two teams are stored in the team combination, the rest in the other teams. The team sizes differ by at
+    most one. The search stops early if the metrics reach their lower bound, in which
+    case the result is proven optimal.
+
+    Args:
+        players (list[Player]): List of registered Members and Guests.
+        number_of_teams (int): The number of teams, at least two.
+        time_budget (float, optional): The number of seconds the search may take. Defaults to 1.0.
+
+    Returns:
+        SolverResult: The best team combination found and its metrics.
+    """
+    deadline = time.monotonic() + time_budget
+    search = KWaySwapSearch(players, _create_balanced_differencing_teams(players, number_of_teams))
+    search.improve()
+    lower_bound = search.lower_bound()
+    best_metrics, best_assignment = search.metrics(), search.assignment.copy()
+    while best_metrics != lower_bound and time.monotonic() < deadline:
+        # Iterated local search: perturb the best team combination with a few random swaps and improve it again.
+        search.set_assignment(best_assignment)
+        search.perturb(random.randint(1, max(1, len(players) // 4)))  # noqa: S311
+        search.improve()
+        if search.metrics() < best_metrics:
+            best_metrics, best_assignment = search.metrics(), search.assignment.copy()
+
+    teams = [
+        tuple(player for player, team in zip(players, best_assignment, strict=True) if team == team_index)
+        for team_index in range(number_of_teams)
+    ]
+    return SolverResult(
+        metrics=TeamDistributionMetrics(*best_metrics),
+        team_combination=(teams[0], teams[1]),
+        proven_optimal=best_metrics == lower_bound,
+        other_teams=tuple(teams[2:]),
+    )
+
+
+def calculate_k_way_metrics(team_combination: tuple[tuple[Player, ...], ...]) -> TeamDistributionMetrics:
+    """Return the metrics of a team combination of any number of teams.
+
+    Args:
+        team_combination (tuple[tuple[Player, ...], ...]): The teams.
+
+    Returns:
+        TeamDistributionMetrics: The spreads between the largest and the smallest team.
+    """
+    players = [player for team in team_combination for player in team]
+    teams: list[list[int]] = []
+    for team in team_combination:
+        start = sum(map(len, teams))
+        teams.append(list(range(start, start + len(team))))
+    return TeamDistributionMetrics(*KWaySwapSearch(players, teams).metrics())
+
+
+class KWaySwapSearch:
+    """Local search over the team combinations of any number of teams that swaps players between two teams."""
+
+    def __init__(self: KWaySwapSearch, players: list[Player], teams: list[list[int]]) -> None:
+        """Start the search from the given teams of player indices."""
+        # Per player (goalie, defense, skill, goalie skill, defense skill) values, which are summed for every team.
+        self.values = [
+            (
+                int(player.position == Position.GOALIE),
+                int(player.position == Position.DEFENSE),
+                player.skill,
+                player.skill if player.position == Position.GOALIE else 0,
+                player.skill if player.position == Position.DEFENSE else 0,
+            )
+            for player in players
+        ]
+        self.number_of_teams = len(teams)
+        self.assignment = [0] * len(players)
+        for team_index, team in enumerate(teams):
+            for index in team:
+                self.assignment[index] = team_index
+        self.totals = self._calculate_totals()
+
+    def set_assignment(self: KWaySwapSearch, assignment: list[int]) -> None:
+        """Set the team index of every player."""
+        self.assignment = assignment.copy()
+        self.totals = self._calculate_totals()
+
+    def metrics(self: KWaySwapSearch) -> tuple[int, int, int, int]:
+        """Return the metrics of the current team combination."""
+        return _calculate_spreads(self.totals)
+
+    def lower_bound(self: KWaySwapSearch) -> tuple[int, int, int, int]:
+        """Return a lower bound of the metrics.
+
+        A total that cannot be divided evenly between the teams leaves a spread of at least the greatest common
+        divisor of the values it is summed from.
+        """
+        goalies, defenses, skills, goalie_skills, defense_skills = (
+            (list(column) for column in zip(*self.values, strict=True)) if self.values else ([], [], [], [], [])
+        )
+        goalie_number_difference = _minimal_spread(goalies, self.number_of_teams)
+        if goalie_number_difference != 0:
+            # Goalie skill is not considered if there is a goalie number difference.
+            skills = [skill - goalie_skill for skill, goalie_skill in zip(skills, goalie_skills, strict=True)]
+        return (
+            goalie_number_difference,
+            _minimal_spread(defenses, self.number_of_teams),
+            _minimal_spread(skills, self.number_of_teams),
+            _minimal_spread(defense_skills, self.number_of_teams),
+        )
+
+    def improve(self: KWaySwapSearch) -> None:
+        """Apply the best swap of two players of different teams until no swap improves the metrics."""
+        current = self.metrics()
+        while True:
+            best_swap = min(
+                (
+                    (self._swapped_metrics(first, second), first, second)
+                    for first in range(len(self.values))
+                    for second in range(first + 1, len(self.values))
+                    if self.assignment[first] != self.assignment[second]
+                ),
+                default=None,
+            )
+            if best_swap is None or best_swap[0] >= current:
+                return
+            current, first, second = best_swap
+            self._swap(first, second)
+
+    def perturb(self: KWaySwapSearch, number_of_swaps: int) -> None:
+        """Apply random swaps of two players of different teams."""
+        if len(self.values) < 2:  # noqa: PLR2004
+            return
+        for _ in range(number_of_swaps):
+            first, second = random.sample(range(len(self.values)), 2)
+            if self.assignment[first] != self.assignment[second]:
+                self._swap(first, second)
+
+    def _swap(self: KWaySwapSearch, first: int, second: int) -> None:
+        first_team, second_team = self.assignment[first], self.assignment[second]
+        self.totals[first_team] = _move(self.totals[first_team], self.values[first], self.values[second])
+        self.totals[second_team] = _move(self.totals[second_team], self.values[second], self.values[first])
+        self.assignment[first], self.assignment[second] = second_team, first_team
+
+    def _swapped_metrics(self: KWaySwapSearch, first: int, second: int) -> tuple[int, int, int, int]:
+        first_team, second_team = self.assignment[first], self.assignment[second]
+        totals = self.totals.copy()
+        totals[first_team] = _move(totals[first_team], self.values[first], self.values[second])
+        totals[second_team] = _move(totals[second_team], self.values[second], self.values[first])
+        return _calculate_spreads(totals)
+
+    def _calculate_totals(self: KWaySwapSearch) -> list[tuple[int, ...]]:
+        totals: list[tuple[int, ...]] = [(0, 0, 0, 0, 0)] * self.number_of_teams
+        for index, team_index in enumerate(self.assignment):
+            totals[team_index] = _move(totals[team_index], (0, 0, 0, 0, 0), self.values[index])
+        return totals
+
+
+def _move(totals: tuple[int, ...], out: tuple[int, ...], into: tuple[int, ...]) -> tuple[int, ...]:
+    return tuple(total - out_value + into_value for total, out_value, into_value in zip(totals, out, into, strict=True))
+
+
+def _minimal_spread(values: list[int], number_of_teams: int) -> int:
+    divisor = math.gcd(*values)
+    if divisor == 0 or sum(values) // divisor % number_of_teams == 0:
+        return 0
+    return divisor
+
+
+def _calculate_spreads(totals: list[tuple[int, ...]]) -> tuple[int, int, int, int]:
+    goalies, defenses, skills, goalie_skills, defense_skills = (list(column) for column in zip(*totals, strict=True))
+    goalie_number_difference = max(goalies) - min(goalies)
+    if goalie_number_difference != 0:
+        # Goalie skill is not considered if there is a goalie number difference.
+        skills = [skill - goalie_skill for skill, goalie_skill in zip(skills, goalie_skills, strict=True)]
+    return (
+        goalie_number_difference,
+        max(defenses) - min(defenses),
+        max(skills) - min(skills),
+        max(defense_skills) - min(defense_skills),
+    )
+
+
+def _create_balanced_differencing_teams(players: list[Player], number_of_teams: int) -> list[list[int]]:
+    # Every position is partitioned separately, then the positions are merged so that the team sizes stay balanced.
+    partition: list[list[int]] = [[] for _ in range(number_of_teams)]
+    for position in Position:
+        indices = sorted(
+            (index for index, player in enumerate(players) if player.position == position),
+            key=lambda index: -players[index].skill,
+        )
+        position_partition = _partition_by_differencing(indices, players, number_of_teams)
+        # Teams with more players get the position partition's teams with fewer players, then with less skill.
+        partition.sort(key=lambda team: (len(team), _team_skill(team, players)))
+        position_partition.sort(key=lambda team: (len(team), _team_skill(team, players)), reverse=True)
+        partition = [team + position_team for team, position_team in zip(partition, position_partition, strict=True)]
+    return partition
+
+
+def _partition_by_differencing(indices: list[int], players: list[Player], number_of_teams: int) -> list[list[int]]:
+    # A partial partition is a list of teams, and every team is a list of player indices. Every block of
+    # number_of_teams players is a partial partition with one player per team. The two partial partitions with the
+    # largest skill spread are merged by pairing the strongest team of one with the weakest team of the other, until
+    # one partition is left.
+    heap: list[tuple[int, int, list[list[int]]]] = []
+    for order, start in enumerate(range(0, len(indices), number_of_teams)):
+        block = indices[start : start + number_of_teams]
+        partition = [[index] for index in block] + [[] for _ in range(number_of_teams - len(block))]
+        heapq.heappush(heap, (-_skill_spread(partition, players), order, partition))
+    if not heap:
+        return [[] for _ in range(number_of_teams)]
+
+    order = len(heap)
+    while len(heap) > 1:
+        _, _, first = heapq.heappop(heap)
+        _, _, second = heapq.heappop(heap)
+        first.sort(key=lambda team: (len(team), _team_skill(team, players)), reverse=True)
+        second.sort(key=lambda team: (len(team), _team_skill(team, players)))
+        merged = [first_team + second_team for first_team, second_team in zip(first, second, strict=True)]
+        heapq.heappush(heap, (-_skill_spread(merged, players), order, merged))
+        order += 1
+    return heap[0][2]
+
+
+def _team_skill(team: list[int], players: list[Player]) -> int:
+    return sum(players[index].skill for index in team)
+
+
+def _skill_spread(partition: list[list[int]], players: list[Player]) -> int:
+    skills = [_team_skill(team, players) for team in partition]
+    return max(skills) - min(skills)
@@ -0,0 +1,91 @@
+"""
+Line formation of the players of a team.
+
+The second stage after the team split: the forwards and the defenses of a team are split into lines of similar
+strength. The players are bisected recursively, and every bisection is scored in blocks with the same split
+enumerator as the batched solver.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from falcon_formation.solver.batched import batch_team_one_indices
+from falcon_formation.solver.team_combinations import generate_team_one_indices
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    import numpy.typing as npt
+
+    from falcon_formation.data_models import Player
+
+
+def form_lines(players: Sequence[Player], line_size: int, batch_size: int = 4096) -> list[tuple[Player, ...]]:
+    """Split the players into lines of similar average skill, starting with the strongest line.
+
+    The number of lines is the number of players divided by the line size rounded up, so a line is never larger than
+    the line size, and the players are spread over the lines, so the line sizes differ by at most one. The same
+    players in the same order always form the same lines.
+
+    Args:
+        players (Sequence[Player]): The players of one position of a team.
+        line_size (int): The largest number of players in a line.
+        batch_size (int, optional): The number of splits scored at once. Defaults to 4096.
+
+    Returns:
+        list[tuple[Player, ...]]: The lines.
+    """
+    if not players:
+        return []
+    skills = np.array([player.skill for player in players], dtype=np.int64)
+    number_of_lines = math.ceil(len(players) / line_size)
+    lines = _bisect_lines(np.arange(len(players)), skills, number_of_lines, batch_size)
+    lines.sort(key=lambda line: -int(skills[line].sum()) / len(line))
+    return [tuple(players[index] for index in line) for line in lines]
+
+
+def _bisect_lines(
+    indices: npt.NDArray[np.intp],
+    skills: npt.NDArray[np.int64],
+    number_of_lines: int,
+    batch_size: int,
+) -> list[npt.NDArray[np.intp]]:
+    if number_of_lines == 1:
+        return [indices]
+
+    # The first part gets half of the lines and the proportional share of the players.
+    first_lines = number_of_lines // 2
+    first_size = len(indices) * first_lines // number_of_lines
+    second_size = len(indices) - first_size
+    part_skills = skills[indices]
+    total_skill = int(part_skills.sum())
+
+    best_difference: int | None = None
+    best_first_indices = np.arange(first_size)
+    for first_indices in batch_team_one_indices(
+        generate_team_one_indices(len(indices), team_size=first_size),
+        first_size,
+        batch_size,
+    ):
+        first_skill = part_skills[first_indices].sum(axis=1)
+        # The average skills of the parts are compared by cross-multiplying with the number of players.
+        differences = np.abs(second_size * first_skill - first_size * (total_skill - first_skill))
+        best_row = int(differences.argmin())
+        if best_difference is None or differences[best_row] < best_difference:
+            best_difference = int(differences[best_row])
+            best_first_indices = first_indices[best_row]
+        if best_difference == 0:
+            break
+
+    in_first = np.zeros(len(indices), dtype=bool)
+    in_first[best_first_indices] = True
+    return [
+        *_bisect_lines(indices[in_first], skills, first_lines, batch_size),
+        *_bisect_lines(indices[~in_first], skills, number_of_lines - first_lines, batch_size),
+    ]
@@ -0,0 +1,90 @@
+"""
+Precomputed tables of the team one bitmasks.
+
+The bitmasks of every split of a roster size are written once to a .npy file and memory-mapped read-only, so every
+worker process and replica sharing the directory reads the same pages from the page cache instead of building the
+team combinations in its own memory.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from falcon_formation.solver.bitmask import generate_team_one_masks
+from falcon_formation.solver.team_combinations import count_team_one_indices
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    import numpy.typing as npt
+
+# The bitmasks are stored as 32-bit unsigned integers.
+MAXIMUM_MASK_TABLE_SIZE = 32
+
+
+@lru_cache(maxsize=MAXIMUM_MASK_TABLE_SIZE)
+def load_team_one_masks(
+    number_of_players: int,
+    directory: Path,
+    limit: int = 26,
+) -> npt.NDArray[np.uint32] | None:
+    """Return the memory-mapped bitmasks of team one for every split of the players, creating the table if missing.
+
+    The bitmasks are in the order of generate_team_one_masks. The table is written to a temporary file first and
+    renamed, so concurrent processes never read a partially written table.
+
+    Args:
+        number_of_players (int): The number of players to split.
+        directory (Path): The directory of the tables.
+        limit (int, optional): The largest number of players with a table. Defaults to 26.
+
+    Returns:
+        npt.NDArray[np.uint32] | None: The read-only bitmasks, or None if the number of players is above the limit.
+    """
+    if number_of_players > min(limit, MAXIMUM_MASK_TABLE_SIZE):
+        return None
+
+    path = directory / f"team_one_masks_{number_of_players}.npy"
+    if not path.exists():
+        directory.mkdir(parents=True, exist_ok=True)
+        masks = np.fromiter(
+            generate_team_one_masks(number_of_players),
+            dtype=np.uint32,
+            count=count_team_one_indices(number_of_players),
+        )
+        with tempfile.NamedTemporaryFile(dir=directory, suffix=".npy", delete=False) as temporary_file:
+            np.save(temporary_file, masks)
+        Path(temporary_file.name).replace(path)
+
+    table: npt.NDArray[np.uint32] = np.load(path, mmap_mode="r")
+    return table
+
+
+def batch_team_one_masks(
+    masks: npt.NDArray[np.uint32],
+    number_of_players: int,
+    batch_size: int,
+) -> Iterator[npt.NDArray[np.intp]]:
+    """Generate the player indices of team one from the bitmasks, one block of team combinations at a time.
+
+    Args:
+        masks (npt.NDArray[np.uint32]): The bitmasks of team one.
+        number_of_players (int): The number of players in the bitmasks.
+        batch_size (int): The number of team combinations in a block.
+
+    Yields:
+        npt.NDArray[np.intp]: The sorted player indices of team one, one team combination per row.
+    """
+    bits = np.arange(number_of_players, dtype=np.uint32)
+    for start in range(0, len(masks), batch_size):
+        block = masks[start : start + batch_size]
+        in_team_1 = (block[:, None] >> bits) & 1 == 1
+        # Every row has the same number of set bits, so the column indices of the set bits fill the rows in order.
+        yield np.nonzero(in_team_1)[1].reshape(len(block), number_of_players // 2)
@@ -0,0 +1,135 @@
+"""
+Multiset solver for creating team distributions.
+
+For the metrics a player is only a (position, skill) pair, and rosters usually have many identical pairs. The players
+are grouped into classes of identical pairs, and only the number of players of each class in team one is enumerated.
+The players themselves are picked at the end.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from bisect import bisect_right
+from collections import defaultdict
+from itertools import accumulate
+from typing import TYPE_CHECKING
+
+from falcon_formation.data_models import Position, TeamDistributionMetrics
+from falcon_formation.solver.solver_result import SolverResult
+
+if TYPE_CHECKING:
+    from falcon_formation.data_models import Player
+
+
+def solve_multiset(players: list[Player]) -> SolverResult | None:
+    """Find the best team combination by enumerating the number of players of each class in team one.
+
+    Every choice of class counts stands for the product of binomial coefficients of team combinations, and is picked
+    with that weight, so the returned team combination is sampled uniformly from every optimal team combination.
+
+    Args:
+        players (list[Player]): List of registered Members and Guests.
+
+    Returns:
+        SolverResult | None: The best team combination and its metrics.
+    """
+    classes: dict[tuple[str, int], list[Player]] = defaultdict(list)
+    for player in players:
+        classes[player.position, player.skill].append(player)
+
+    search = _MultisetSearch(list(classes.items()))
+    search.run(len(players) // 2)
+    if search.best_metrics is None:  # pragma: no cover
+        return None
+
+    # Class counts are picked with probability proportional to the number of team combinations they stand for.
+    cumulative_ways = list(accumulate(ways for _, ways in search.best_counts))
+    choice_index = bisect_right(cumulative_ways, random.randrange(cumulative_ways[-1]))  # noqa: S311
+    class_counts = search.best_counts[choice_index][0]
+
+    team_1: list[Player] = []
+    for class_players, count in zip(classes.values(), class_counts, strict=True):
+        team_1.extend(random.sample(class_players, count))
+    team_1_ids = {id(player) for player in team_1}
+    team_2 = tuple(player for player in players if id(player) not in team_1_ids)
+    return SolverResult(metrics=TeamDistributionMetrics(*search.best_metrics), team_combination=(tuple(team_1), team_2))
+
+
+class _MultisetSearch:
+    def __init__(self: _MultisetSearch, classes: list[tuple[tuple[str, int], list[Player]]]) -> None:
+        self.sizes = [len(class_players) for _, class_players in classes]
+        self.skills = [skill for (_, skill), _ in classes]
+        self.goalies = [position == Position.GOALIE for (position, _), _ in classes]
+        self.defenses = [position == Position.DEFENSE for (position, _), _ in classes]
+        self.remaining_sizes = [sum(self.sizes[index:]) for index in range(len(classes) + 1)]
+
+        self.total_goalies = sum(size for size, goalie in zip(self.sizes, self.goalies, strict=True) if goalie)
+        self.total_defenses = sum(size for size, defense in zip(self.sizes, self.defenses, strict=True) if defense)
+        self.total_skill = sum(size * skill for size, skill in zip(self.sizes, self.skills, strict=True))
+        self.total_goalie_skill = sum(
+            size * skill for size, skill, goalie in zip(self.sizes, self.skills, self.goalies, strict=True) if goalie
+        )
+        self.total_defense_skill = sum(
+            size * skill for size, skill, defense in zip(self.sizes, self.skills, self.defenses, strict=True) if defense
+        )
+
+        self.counts = [0] * len(classes)
+        self.best_metrics: tuple[int, int, int, int] | None = None
+        # Each optimal choice of class counts, together with the number of team combinations it stands for.
+        self.best_counts: list[tuple[tuple[int, ...], int]] = []
+
+        # Running totals of team one for the current class counts.
+        self.team_goalies = 0
+        self.team_defenses = 0
+        self.team_skill = 0
+        self.team_goalie_skill = 0
+        self.team_defense_skill = 0
+
+    def run(self: _MultisetSearch, team_size: int) -> None:
+        self._search(0, team_size)
+
+    def _search(self: _MultisetSearch, index: int, slots: int) -> None:
+        if index == len(self.sizes):
+            self._evaluate()
+            return
+        size = self.sizes[index]
+        for count in range(max(0, slots - self.remaining_sizes[index + 1]), min(size, slots) + 1):
+            self._move(index, count)
+            self._search(index + 1, slots - count)
+            self._move(index, -count)
+
+    def _move(self: _MultisetSearch, index: int, count: int) -> None:
+        self.counts[index] += count
+        skill = count * self.skills[index]
+        self.team_skill += skill
+        if self.goalies[index]:
+            self.team_goalies += count
+            self.team_goalie_skill += skill
+        elif self.defenses[index]:
+            self.team_defenses += count
+            self.team_defense_skill += skill
+
+    def _evaluate(self: _MultisetSearch) -> None:
+        goalie_number_difference = abs(2 * self.team_goalies - self.total_goalies)
+        if goalie_number_difference == 0:
+            skill_difference = abs(2 * self.team_skill - self.total_skill)
+        else:
+            # Goalie skill is not considered if there is a goalie number difference.
+            skill_difference = abs(
+                2 * (self.team_skill - self.team_goalie_skill) - (self.total_skill - self.total_goalie_skill),
+            )
+        metrics = (
+            goalie_number_difference,
+            abs(2 * self.team_defenses - self.total_defenses),
+            skill_difference,
+            abs(2 * self.team_defense_skill - self.total_defense_skill),
+        )
+        if self.best_metrics is None or metrics < self.best_metrics:
+            self.best_metrics = metrics
+            self.best_counts = []
+        if metrics == self.best_metrics:
+            ways = math.prod(math.comb(size, count) for size, count in zip(self.sizes, self.counts, strict=True))
+            self.best_counts.append((tuple(self.counts), ways))
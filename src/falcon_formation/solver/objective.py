@@ -0,0 +1,145 @@
+"""
+Configurable objective of the team distribution solvers.
+
+The metrics of a team combination are compared level by level, where every level is a weighted sum of the metrics.
+The objective is written as comma separated levels of metric names joined by "+", optionally with integer weights,
+for example "goalie_number_difference, defense_number_difference, 2 * skill_difference + defense_skill_difference".
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from operator import attrgetter
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from falcon_formation.data_models import TeamDistributionMetrics
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    import numpy.typing as npt
+
+METRIC_NAMES = tuple(metric.name for metric in fields(TeamDistributionMetrics))
+# One level per metric in the ordering of TeamDistributionMetrics.
+DEFAULT_LEVELS = tuple(
+    tuple(int(index == level) for index in range(len(METRIC_NAMES))) for level in range(len(METRIC_NAMES))
+)
+
+
+@dataclass(frozen=True)
+class Objective:
+    """Data class for storing the levels of the objective, with one weight per metric in every level."""
+
+    levels: tuple[tuple[int, ...], ...] = DEFAULT_LEVELS
+
+    @classmethod
+    def from_specification(cls, specification: str) -> Objective:
+        """Return the objective from its written form, or the default objective if it is empty.
+
+        Args:
+            specification (str): The comma separated levels of weighted metric names.
+
+        Raises:
+            ValueError: If a metric name or a weight is not valid.
+
+        Returns:
+            Objective: The objective object.
+        """
+        if not specification.strip():
+            return cls()
+
+        levels = []
+        for level_specification in specification.split(","):
+            level = [0] * len(METRIC_NAMES)
+            for term in level_specification.split("+"):
+                weight, _, name = term.rpartition("*")
+                name = name.strip()
+                if name not in METRIC_NAMES:
+                    msg = f"Unknown metric in the objective: {name!r}."
+                    raise ValueError(msg)
+                if weight.strip() and not weight.strip().isdigit():
+                    msg = f"Weights of the objective must be non-negative integers: {weight.strip()!r}."
+                    raise ValueError(msg)
+                level[METRIC_NAMES.index(name)] += int(weight) if weight.strip() else 1
+            levels.append(tuple(level))
+        return cls(levels=tuple(levels))
+
+    def to_specification(self: Objective) -> str:
+        """Return the written form of the objective.
+
+        Args:
+            self (Objective): The objective object.
+
+        Returns:
+            str: The comma separated levels of weighted metric names.
+        """
+        return ", ".join(
+            " + ".join(
+                name if weight == 1 else f"{weight} * {name}"
+                for name, weight in zip(METRIC_NAMES, level, strict=True)
+                if weight
+            )
+            for level in self.levels
+        )
+
+    @property
+    def is_default(self: Objective) -> bool:
+        """Return whether the objective is the ordering of TeamDistributionMetrics."""
+        return self.levels == DEFAULT_LEVELS
+
+    def compile_key(self: Objective) -> Callable[[TeamDistributionMetrics], tuple[int, ...]]:
+        """Return a function mapping the metrics of a team combination to a key, where a smaller key is better.
+
+        The levels are resolved once, so the returned function does not interpret the objective for every call.
+
+        Args:
+            self (Objective): The objective object.
+
+        Returns:
+            Callable[[TeamDistributionMetrics], tuple[int, ...]]: The key of the metrics.
+        """
+        metric_indices = self._metric_indices()
+        if metric_indices is not None and len(metric_indices) > 1:
+            key: Callable[[TeamDistributionMetrics], tuple[int, ...]] = attrgetter(
+                *(METRIC_NAMES[index] for index in metric_indices),
+            )
+            return key
+
+        level_terms = [
+            [(attrgetter(name), weight) for name, weight in zip(METRIC_NAMES, level, strict=True) if weight]
+            for level in self.levels
+        ]
+        return lambda metrics: tuple(
+            sum(weight * get_metric(metrics) for get_metric, weight in terms) for terms in level_terms
+        )
+
+    def compile_kernel(
+        self: Objective,
+    ) -> Callable[[tuple[npt.NDArray[np.int64], ...]], tuple[npt.NDArray[np.int64], ...]]:
+        """Return a function mapping the metric columns of a block of team combinations to key columns.
+
+        Reordering or dropping metrics only selects columns, weighted levels are a single matrix product per block.
+
+        Args:
+            self (Objective): The objective object.
+
+        Returns:
+            Callable[[tuple[npt.NDArray[np.int64], ...]], tuple[npt.NDArray[np.int64], ...]]: The key columns of the
+                metric columns, compared level by level.
+        """
+        metric_indices = self._metric_indices()
+        if metric_indices is not None:
+            return lambda metrics_columns: tuple(metrics_columns[index] for index in metric_indices)
+
+        weights = np.array(self.levels, dtype=np.int64)
+        return lambda metrics_columns: tuple(weights @ np.stack(metrics_columns))
+
+    def _metric_indices(self: Objective) -> list[int] | None:
+        # The metric of every level, if every level is a single metric with weight one.
+        if any(sorted(level) != [0] * (len(level) - 1) + [1] for level in self.levels):
+            return None
+        return [level.index(1) for level in self.levels]
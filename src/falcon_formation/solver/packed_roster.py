@@ -0,0 +1,53 @@
+"""
+Packed roster model.
+
+Players packed into skill and position arrays, so that team combinations can be scored without Python objects.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from falcon_formation.data_models import Position
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+    from falcon_formation.data_models import Player
+
+
+@dataclass(frozen=True)
+class PackedRoster:
+    """Data class for storing the skill and position arrays of the players."""
+
+    skills: npt.NDArray[np.int64]
+    goalie_skills: npt.NDArray[np.int64]
+    defense_skills: npt.NDArray[np.int64]
+    goalies: npt.NDArray[np.int64]
+    defenses: npt.NDArray[np.int64]
+
+    @classmethod
+    def from_players(cls, players: list[Player]) -> PackedRoster:
+        """Return the packed roster from a list of players.
+
+        Args:
+            players (list[Player]): List of registered Members and Guests.
+
+        Returns:
+            PackedRoster: The packed roster object.
+        """
+        skills = np.array([player.skill for player in players], dtype=np.int64)
+        goalies = np.array([player.position == Position.GOALIE for player in players], dtype=np.int64)
+        defenses = np.array([player.position == Position.DEFENSE for player in players], dtype=np.int64)
+        return cls(
+            skills=skills,
+            goalie_skills=skills * goalies,
+            defense_skills=skills * defenses,
+            goalies=goalies,
+            defenses=defenses,
+        )
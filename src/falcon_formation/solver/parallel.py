@@ -0,0 +1,121 @@
+"""
+Parallel solver for creating team distributions.
+
+The lexicographic ranks of the splits are cut into contiguous ranges, and every range is scored with the batched
+solver in a separate process. Each process reports its best metrics and a sampled tied team combination, which are
+merged.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING
+
+from falcon_formation.solver.batched import batch_team_one_indices, find_best_team_indices
+from falcon_formation.solver.bounds import calculate_metrics_lower_bound
+from falcon_formation.solver.packed_roster import PackedRoster
+from falcon_formation.solver.solver_result import SolverResult
+from falcon_formation.solver.team_combinations import count_team_one_indices, generate_team_one_indices
+
+if TYPE_CHECKING:
+    import numpy as np
+    import numpy.typing as npt
+
+    from falcon_formation.data_models import Player, TeamDistributionMetrics
+    from falcon_formation.solver.reservoir import ReservoirSampler
+
+
+def solve_parallel(
+    players: list[Player],
+    number_of_workers: int | None = None,
+    batch_size: int = 65536,
+) -> SolverResult | None:
+    """Find the best team combination by scoring ranges of team combinations in parallel processes.
+
+    Produces the same optimal metrics as scoring every team combination one by one. Each range stops after the first
+    block reaching the lower bound of the metrics, otherwise the returned team combination is sampled uniformly from
+    every optimal team combination.
+
+    Args:
+        players (list[Player]): List of registered Members and Guests.
+        number_of_workers (int | None, optional): The number of processes. Defaults to None, the number of CPUs.
+        batch_size (int, optional): The number of team combinations scored at once. Defaults to 65536.
+
+    Returns:
+        SolverResult | None: The best team combination and its metrics.
+    """
+    roster = PackedRoster.from_players(players)
+    number_of_splits = count_team_one_indices(len(players))
+    number_of_shards = count_shards(number_of_splits, number_of_workers, batch_size)
+    shard_bounds = [number_of_splits * shard // number_of_shards for shard in range(number_of_shards + 1)]
+    lower_bound = calculate_metrics_lower_bound(players)
+    solve_shard = partial(_solve_shard, roster=roster, batch_size=batch_size, lower_bound=lower_bound)
+
+    if number_of_shards == 1:
+        shard_results = [solve_shard(0, number_of_splits)]
+    else:
+        # Processes are spawned instead of forked, as the web server process may hold threads and open connections.
+        with ProcessPoolExecutor(
+            max_workers=number_of_shards,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            shard_results = list(executor.map(solve_shard, shard_bounds[:-1], shard_bounds[1:]))
+
+    best_metrics = min((metrics for metrics, _, _ in shard_results if metrics is not None), default=None)
+    if best_metrics is None:
+        return None
+    # Each range sampled one of its tied team combinations, so the ranges are weighted by their number of ties.
+    best_shard_results = [shard_sampler for metrics, shard_sampler, _ in shard_results if metrics == best_metrics]
+    best_team_indices = random.choices(  # noqa: S311
+        [shard_sampler.samples[0] for shard_sampler in best_shard_results],
+        weights=[shard_sampler.count for shard_sampler in best_shard_results],
+    )[0]
+
+    team_1_indices = set(best_team_indices.tolist())
+    team_1 = tuple(player for index, player in enumerate(players) if index in team_1_indices)
+    team_2 = tuple(player for index, player in enumerate(players) if index not in team_1_indices)
+    return SolverResult(
+        metrics=best_metrics,
+        team_combination=(team_1, team_2),
+        evaluated_splits=sum(evaluated_splits for _, _, evaluated_splits in shard_results),
+        lower_bound_reached=best_metrics == lower_bound,
+    )
+
+
+def count_shards(number_of_splits: int, number_of_workers: int | None = None, batch_size: int = 65536) -> int:
+    """Return the number of ranges the splits are cut into, each scored in a separate process if there are several.
+
+    Args:
+        number_of_splits (int): The number of team combinations.
+        number_of_workers (int | None, optional): The number of processes. Defaults to None, the number of CPUs.
+        batch_size (int, optional): The number of team combinations scored at once. Defaults to 65536.
+
+    Returns:
+        int: The number of ranges, at least one and at most one per batch.
+    """
+    return max(1, min(number_of_workers or os.cpu_count() or 1, number_of_splits // batch_size))
+
+
+def _solve_shard(
+    start: int,
+    stop: int,
+    *,
+    roster: PackedRoster,
+    batch_size: int,
+    lower_bound: TeamDistributionMetrics,
+) -> tuple[TeamDistributionMetrics | None, ReservoirSampler[npt.NDArray[np.intp]], int]:
+    return find_best_team_indices(
+        batch_team_one_indices(
+            generate_team_one_indices(len(roster.skills), start, stop),
+            len(roster.skills) // 2,
+            batch_size,
+        ),
+        roster,
+        lower_bound=lower_bound,
+    )
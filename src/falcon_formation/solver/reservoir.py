@@ -0,0 +1,80 @@
+"""
+Reservoir sampling of tied team combinations.
+
+The number of optimal team combinations can be huge, so instead of keeping every one of them, a fixed number of them
+is kept, sampled uniformly from every team combination offered so far.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+T = TypeVar("T")
+
+
+class ReservoirSampler(Generic[T]):  # noqa: UP046
+    """Uniform sample of a fixed size from a stream of items, in constant memory.
+
+    Items are offered in blocks, and the number of items to skip before the next one is taken is drawn directly
+    (Algorithm L), so the cost does not grow with the number of offered items that are not taken.
+    """
+
+    def __init__(self: ReservoirSampler[T], sample_size: int = 1) -> None:
+        """Create an empty reservoir that keeps sample_size items."""
+        self.sample_size = sample_size
+        self.samples: list[T] = []
+        self.count = 0
+        self._weight = 1.0
+        self._next_index = 0
+
+    def reset(self: ReservoirSampler[T]) -> None:
+        """Drop every item offered so far."""
+        self.samples = []
+        self.count = 0
+
+    def extend(self: ReservoirSampler[T], items: Sequence[T]) -> None:
+        """Offer a block of items to the reservoir.
+
+        Args:
+            items (Sequence[T]): The offered items.
+        """
+        offset = 0
+        while len(self.samples) < self.sample_size and offset < len(items):
+            self.samples.append(items[offset])
+            offset += 1
+            if len(self.samples) == self.sample_size:
+                self._weight = math.exp(math.log(_random_open_unit()) / self.sample_size)
+                self._next_index = self.count + offset + self._draw_skip()
+
+        end = self.count + len(items)
+        while len(self.samples) == self.sample_size and self._next_index < end:
+            self.samples[random.randrange(self.sample_size)] = items[self._next_index - self.count]  # noqa: S311
+            self._weight *= math.exp(math.log(_random_open_unit()) / self.sample_size)
+            self._next_index += 1 + self._draw_skip()
+        self.count = end
+
+    def append(self: ReservoirSampler[T], item: T) -> None:
+        """Offer a single item to the reservoir.
+
+        Args:
+            item (T): The offered item.
+        """
+        self.extend((item,))
+
+    def _draw_skip(self: ReservoirSampler[T]) -> int:
+        return math.floor(math.log(_random_open_unit()) / math.log1p(-self._weight))
+
+
+def _random_open_unit() -> float:
+    # A uniform random number strictly between 0 and 1, so that its logarithm is finite and negative.
+    value = random.random()  # noqa: S311
+    while value == 0.0:
+        value = random.random()  # noqa: S311
+    return value
@@ -0,0 +1,130 @@
+"""
+Cache of solved rosters.
+
+A roster is reduced to its sorted (position, skill) classes. Rosters with the same classes share their optimal
+metrics, and the optimal splits are stored as the number of players of each class in team one, which is mapped back
+onto the actual players.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import random
+from collections import Counter, OrderedDict, defaultdict
+from typing import TYPE_CHECKING
+
+from falcon_formation.data_models import SolvedRoster
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from falcon_formation.data_models import Player, TeamDistributionMetrics
+
+# Part of every signature, increased whenever the metrics or the solvers change, so stale optima are not reused.
+ROSTER_SIGNATURE_VERSION = 2
+
+
+def create_roster_signature(players: Sequence[Player]) -> str:
+    """Return the signature of the (position, skill) classes of the players, independent of their order.
+
+    Args:
+        players (Sequence[Player]): List of registered Members and Guests.
+
+    Returns:
+        str: The SHA-256 hex digest of the signature version and the sorted classes and their sizes.
+    """
+    classes = Counter((player.position, player.skill) for player in players)
+    canonical_roster = f"v{ROSTER_SIGNATURE_VERSION}|" + ";".join(
+        f"{position}:{skill}x{size}" for (position, skill), size in sorted(classes.items())
+    )
+    return hashlib.sha256(canonical_roster.encode()).hexdigest()
+
+
+def create_solved_roster(
+    team_combinations: Sequence[tuple[Sequence[Player], Sequence[Player]]],
+    metrics: TeamDistributionMetrics,
+) -> SolvedRoster:
+    """Return the solved roster of optimal team combinations of the same players.
+
+    Args:
+        team_combinations (Sequence[tuple[Sequence[Player], Sequence[Player]]]): The optimal team combinations, for
+            example the ones sampled by the solver.
+        metrics (TeamDistributionMetrics): The metrics of the team combinations.
+
+    Returns:
+        SolvedRoster: The signature of the roster with the distinct class counts of team one.
+    """
+    players = [*team_combinations[0][0], *team_combinations[0][1]]
+    player_classes = sorted({(player.position, player.skill) for player in players})
+    class_count_patterns: list[list[int]] = []
+    for team_1, _ in team_combinations:
+        team_1_classes = Counter((player.position, player.skill) for player in team_1)
+        class_counts = [team_1_classes[player_class] for player_class in player_classes]
+        if class_counts not in class_count_patterns:
+            class_count_patterns.append(class_counts)
+    return SolvedRoster(
+        signature=create_roster_signature(players),
+        metrics=metrics,
+        class_count_patterns=class_count_patterns,
+    )
+
+
+def apply_solved_roster(
+    players: Sequence[Player],
+    solved_roster: SolvedRoster,
+) -> tuple[tuple[Player, ...], tuple[Player, ...]]:
+    """Map class counts of a solved roster onto the players, picking the players of each class at random.
+
+    The class counts are picked with probability proportional to the number of team combinations they stand for, so
+    every stored optimal team combination is equally likely.
+
+    Args:
+        players (Sequence[Player]): List of registered Members and Guests with the signature of the solved roster.
+        solved_roster (SolvedRoster): The solved roster.
+
+    Returns:
+        tuple[tuple[Player, ...], tuple[Player, ...]]: The team combination.
+    """
+    classes: dict[tuple[str, int], list[Player]] = defaultdict(list)
+    for player in players:
+        classes[player.position, player.skill].append(player)
+
+    class_sizes = [len(classes[player_class]) for player_class in sorted(classes)]
+    (class_counts,) = random.choices(  # noqa: S311
+        solved_roster.class_count_patterns,
+        weights=[
+            math.prod(math.comb(size, count) for size, count in zip(class_sizes, class_counts, strict=True))
+            for class_counts in solved_roster.class_count_patterns
+        ],
+    )
+    team_1: list[Player] = []
+    for player_class, count in zip(sorted(classes), class_counts, strict=True):
+        team_1.extend(random.sample(classes[player_class], count))
+    team_1_ids = {id(player) for player in team_1}
+    return tuple(team_1), tuple(player for player in players if id(player) not in team_1_ids)
+
+
+class SolvedRosterCache:
+    """In-process cache of the most recently used solved rosters."""
+
+    def __init__(self: SolvedRosterCache, maximum_size: int = 128) -> None:
+        """Create an empty cache keeping at most maximum_size solved rosters."""
+        self.maximum_size = maximum_size
+        self.solved_rosters: OrderedDict[str, SolvedRoster] = OrderedDict()
+
+    def get(self: SolvedRosterCache, signature: str) -> SolvedRoster | None:
+        """Return the solved roster of the signature, marking it as the most recently used."""
+        solved_roster = self.solved_rosters.get(signature)
+        if solved_roster is not None:
+            self.solved_rosters.move_to_end(signature)
+        return solved_roster
+
+    def put(self: SolvedRosterCache, solved_roster: SolvedRoster) -> None:
+        """Add the solved roster, evicting the least recently used one if the cache is full."""
+        self.solved_rosters[solved_roster.signature] = solved_roster
+        self.solved_rosters.move_to_end(solved_roster.signature)
+        while len(self.solved_rosters) > self.maximum_size:
+            self.solved_rosters.popitem(last=False)
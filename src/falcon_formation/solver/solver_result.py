@@ -0,0 +1,32 @@
+"""
+Solver result model.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from falcon_formation.data_models import Player, TeamDistributionMetrics
+
+
+@dataclass()
+class SolverResult:
+    """Data class for storing the best team combination found by a solver."""
+
+    metrics: TeamDistributionMetrics
+    team_combination: tuple[tuple[Player, ...], tuple[Player, ...]]
+    proven_optimal: bool = True
+    # The teams after the first two, if the players are split into more than two teams.
+    other_teams: tuple[tuple[Player, ...], ...] = ()
+    # The number of team combinations scored, and whether the search stopped early at the lower bound of the metrics.
+    # Only reported by the solvers that enumerate the team combinations.
+    evaluated_splits: int = 0
+    lower_bound_reached: bool = False
+    # How many times the teammate pairs of the team combination were teammates before, if it was tie-broken by that.
+    repeated_teammate_pairs: int | None = None
+    # Optimal team combinations sampled uniformly by the solver, the alternatives are picked from them if given.
+    optimal_samples: tuple[tuple[tuple[Player, ...], tuple[Player, ...]], ...] = ()
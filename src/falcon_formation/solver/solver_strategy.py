@@ -0,0 +1,28 @@
+"""
+Solver strategy model.
+
+Available strategies for searching the best team distribution.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+from enum import StrEnum
+
+
+class SolverStrategy(StrEnum):
+    """Enum class for team distribution solver strategies."""
+
+    BRUTE_FORCE = "brute_force"
+    BATCHED = "batched"
+    BRANCH_AND_BOUND = "branch_and_bound"
+    STRATIFIED = "stratified"
+    DYNAMIC_PROGRAMMING = "dynamic_programming"
+    ANYTIME = "anytime"
+    PARALLEL = "parallel"
+    MULTISET = "multiset"
+    BITMASK = "bitmask"
+    GRAY_CODE = "gray_code"
+    # Picks one of the strategies above with the cost model.
+    AUTO = "auto"
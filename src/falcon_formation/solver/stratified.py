@@ -0,0 +1,150 @@
+"""
+Position-stratified solver for creating team distributions.
+
+The goalie and defense numbers are the top two metrics, so the number of goalies, defense and forwards in team one
+is decided first. Then only the combinations within each position are enumerated, which turns a single large search
+into a product of much smaller per-position searches.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+import random
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import combinations
+from typing import TYPE_CHECKING
+
+from falcon_formation.data_models import Position, TeamDistributionMetrics
+from falcon_formation.solver.solver_result import SolverResult
+
+if TYPE_CHECKING:
+    from falcon_formation.data_models import Player
+
+
+def solve_stratified(players: list[Player]) -> SolverResult | None:
+    """Find the best team combination by enumerating the combinations of each position separately.
+
+    The forward combinations are grouped by their skill sum, so for every goalie and defense combination the best
+    forward skill sum is found with a binary search. The returned team combination is sampled uniformly from every
+    optimal team combination.
+
+    Args:
+        players (list[Player]): List of registered Members and Guests.
+
+    Returns:
+        SolverResult | None: The best team combination and its metrics.
+    """
+    goalies = [player for player in players if player.position == Position.GOALIE]
+    defenses = [player for player in players if player.position == Position.DEFENSE]
+    forwards = [player for player in players if player.position == Position.FORWARD]
+
+    best_metrics: TeamDistributionMetrics | None = None
+    best_team_combinations: list[tuple[tuple[Player, ...], tuple[Player, ...], list[tuple[Player, ...]]]] = []
+
+    for goalie_count, defense_count, forward_count in find_best_position_counts(
+        len(goalies),
+        len(defenses),
+        len(forwards),
+        len(players) // 2,
+    ):
+        goalie_number_difference = abs(2 * goalie_count - len(goalies))
+        defense_number_difference = abs(2 * defense_count - len(defenses))
+        # Goalie skill is not considered if there is a goalie number difference.
+        skill_players = [*defenses, *forwards] if goalie_number_difference else players
+        total_skill = sum(player.skill for player in skill_players)
+        total_defense_skill = sum(player.skill for player in defenses)
+
+        forward_combinations = _group_combinations_by_skill(forwards, forward_count)
+        forward_skills = sorted(forward_combinations)
+
+        for goalie_combination in combinations(goalies, goalie_count):
+            goalie_skill = 0 if goalie_number_difference else sum(player.skill for player in goalie_combination)
+            for defense_combination in combinations(defenses, defense_count):
+                defense_skill = sum(player.skill for player in defense_combination)
+                remaining_skill = total_skill - 2 * (goalie_skill + defense_skill)
+
+                for forward_skill in find_closest_skills(forward_skills, remaining_skill):
+                    metrics = TeamDistributionMetrics(
+                        goalie_number_difference=goalie_number_difference,
+                        defense_number_difference=defense_number_difference,
+                        skill_difference=abs(remaining_skill - 2 * forward_skill),
+                        defense_skill_difference=abs(2 * defense_skill - total_defense_skill),
+                    )
+                    if best_metrics is None or metrics < best_metrics:
+                        best_metrics = metrics
+                        best_team_combinations = []
+                    if metrics == best_metrics:
+                        best_team_combinations.append(
+                            (goalie_combination, defense_combination, forward_combinations[forward_skill]),
+                        )
+
+    if best_metrics is None:
+        return None
+
+    goalie_combination, defense_combination, forward_combination_group = random.choices(  # noqa: S311
+        best_team_combinations,
+        weights=[len(team_combination[2]) for team_combination in best_team_combinations],
+    )[0]
+    team_1 = (*goalie_combination, *defense_combination, *random.choice(forward_combination_group))  # noqa: S311
+    team_1_ids = {id(player) for player in team_1}
+    team_2 = tuple(player for player in players if id(player) not in team_1_ids)
+    return SolverResult(metrics=best_metrics, team_combination=(team_1, team_2))
+
+
+def find_best_position_counts(
+    number_of_goalies: int,
+    number_of_defenses: int,
+    number_of_forwards: int,
+    team_size: int,
+) -> list[tuple[int, int, int]]:
+    """Return every (goalie, defense, forward) count of team one with the best goalie and defense differences.
+
+    Args:
+        number_of_goalies (int): The number of registered goalies.
+        number_of_defenses (int): The number of registered defense players.
+        number_of_forwards (int): The number of registered forwards.
+        team_size (int): The number of players in team one.
+
+    Returns:
+        list[tuple[int, int, int]]: The goalie, defense and forward counts of team one.
+    """
+    position_counts = [
+        (goalie_count, defense_count, team_size - goalie_count - defense_count)
+        for goalie_count in range(number_of_goalies + 1)
+        for defense_count in range(number_of_defenses + 1)
+        if 0 <= team_size - goalie_count - defense_count <= number_of_forwards
+    ]
+    best_differences = min(
+        (abs(2 * goalie_count - number_of_goalies), abs(2 * defense_count - number_of_defenses))
+        for goalie_count, defense_count, _ in position_counts
+    )
+    return [
+        (goalie_count, defense_count, forward_count)
+        for goalie_count, defense_count, forward_count in position_counts
+        if (abs(2 * goalie_count - number_of_goalies), abs(2 * defense_count - number_of_defenses)) == best_differences
+    ]
+
+
+def _group_combinations_by_skill(players: list[Player], count: int) -> dict[int, list[tuple[Player, ...]]]:
+    combinations_by_skill: dict[int, list[tuple[Player, ...]]] = defaultdict(list)
+    for combination in combinations(players, count):
+        combinations_by_skill[sum(player.skill for player in combination)].append(combination)
+    return combinations_by_skill
+
+
+def find_closest_skills(skills: list[int], remaining_skill: int) -> list[int]:
+    """Return the skills closest to half of the remaining skill, both of them if they are equally close.
+
+    Args:
+        skills (list[int]): The sorted reachable skill sums.
+        remaining_skill (int): The skill that is still to be split between the two teams.
+
+    Returns:
+        list[int]: The closest skill sums.
+    """
+    index = bisect_left(skills, -(-remaining_skill // 2))
+    candidates = skills[max(index - 1, 0) : index + 1]
+    smallest_difference = min(abs(remaining_skill - 2 * skill) for skill in candidates)
+    return [skill for skill in candidates if abs(remaining_skill - 2 * skill) == smallest_difference]
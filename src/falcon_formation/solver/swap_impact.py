@@ -0,0 +1,84 @@
+"""
+Impact of manual swaps on the team distribution metrics.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+from dataclasses import astuple
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from falcon_formation.data_models import TeamDistributionMetrics
+from falcon_formation.solver.packed_roster import PackedRoster
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    import numpy.typing as npt
+
+    from falcon_formation.data_models import Player
+
+
+def calculate_swap_impacts(
+    team_combination: tuple[Sequence[Player], Sequence[Player]],
+) -> tuple[TeamDistributionMetrics, npt.NDArray[np.int64]]:
+    """Return the metrics of the team combination and their change for every single swap between the teams.
+
+    Every swap is scored at once from the team totals, without building the swapped team combinations.
+
+    Args:
+        team_combination (tuple[Sequence[Player], Sequence[Player]]): The two teams.
+
+    Returns:
+        tuple[TeamDistributionMetrics, npt.NDArray[np.int64]]: The current metrics, and the change of the metrics
+            when swapping team_1[row] with team_2[column], along the last axis in the order of TeamDistributionMetrics.
+    """
+    team_1, team_2 = team_combination
+    roster = PackedRoster.from_players([*team_1, *team_2])
+    team_1_size = len(team_1)
+    columns = (roster.goalies, roster.defenses, roster.skills, roster.goalie_skills, roster.defense_skills)
+
+    team_1_totals = [values[:team_1_size].sum(keepdims=True) for values in columns]
+    # Team one totals after team_1[row] leaves and team_2[column] joins.
+    swapped_team_1_totals = [
+        total - values[:team_1_size, None] + values[None, team_1_size:]
+        for total, values in zip(team_1_totals, columns, strict=True)
+    ]
+
+    metrics = TeamDistributionMetrics(*(int(column[0]) for column in _calculate_metrics(roster, team_1_totals)))
+    swap_impacts: npt.NDArray[np.int64] = np.stack(
+        [
+            swapped_metric - metric
+            for swapped_metric, metric in zip(
+                _calculate_metrics(roster, swapped_team_1_totals),
+                astuple(metrics),
+                strict=True,
+            )
+        ],
+        axis=-1,
+    )
+    return metrics, swap_impacts
+
+
+def _calculate_metrics(
+    roster: PackedRoster,
+    team_1_totals: list[npt.NDArray[np.int64]],
+) -> tuple[npt.NDArray[np.int64], ...]:
+    goalies, defenses, skill, goalie_skill, defense_skill = team_1_totals
+    # Every metric is the absolute difference between twice the team one total and the overall total.
+    goalie_number_difference = np.abs(2 * goalies - roster.goalies.sum())
+    # Goalie skill is not considered if there is a goalie number difference.
+    skill_difference = np.where(
+        goalie_number_difference != 0,
+        np.abs(2 * (skill - goalie_skill) - (roster.skills.sum() - roster.goalie_skills.sum())),
+        np.abs(2 * skill - roster.skills.sum()),
+    )
+    return (
+        goalie_number_difference,
+        np.abs(2 * defenses - roster.defenses.sum()),
+        skill_difference,
+        np.abs(2 * defense_skill - roster.defense_skills.sum()),
+    )
@@ -0,0 +1,105 @@
+"""
+Helper functions for enumerating team combinations.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+import math
+from itertools import combinations, islice
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+def count_team_one_indices(number_of_players: int, team_size: int | None = None) -> int:
+    """Return the number of splits generated by generate_team_one_indices.
+
+    Args:
+        number_of_players (int): The number of players to split.
+        team_size (int | None, optional): The number of players in team one. Defaults to None, half of the players.
+
+    Returns:
+        int: The number of splits.
+    """
+    team_size = number_of_players // 2 if team_size is None else team_size
+    if 2 * team_size != number_of_players or number_of_players == 0:
+        return math.comb(number_of_players, team_size)
+    return math.comb(number_of_players - 1, team_size - 1)
+
+
+def generate_team_one_indices(
+    number_of_players: int,
+    start: int = 0,
+    stop: int | None = None,
+    *,
+    team_size: int | None = None,
+) -> Iterator[tuple[int, ...]]:
+    """Generate the player indices of team one for every split of the players exactly once.
+
+    With two teams of the same size (A, B) and (B, A) are the same split, so the first player is fixed in team one.
+    The splits are generated in lexicographic order, and a contiguous range of them can be generated without
+    enumerating the splits before it.
+
+    Args:
+        number_of_players (int): The number of players to split.
+        start (int, optional): The rank of the first generated split. Defaults to 0.
+        stop (int | None, optional): The rank after the last generated split. Defaults to None, every split.
+        team_size (int | None, optional): The number of players in team one. Defaults to None, half of the players.
+
+    Returns:
+        Iterator[tuple[int, ...]]: The sorted player indices of team one.
+    """
+    team_size = number_of_players // 2 if team_size is None else team_size
+    number_of_splits = count_team_one_indices(number_of_players, team_size)
+    stop = number_of_splits if stop is None else min(stop, number_of_splits)
+    if start >= stop:
+        return iter(())
+
+    # With a fixed first player only the rest of team one is chosen from the rest of the players.
+    fixed_first_player = 2 * team_size == number_of_players and number_of_players > 0
+    lowest_index = int(fixed_first_player)
+    chosen_size = team_size - lowest_index
+    rest_combinations: Iterator[tuple[int, ...]]
+    if start == 0:
+        rest_combinations = combinations(range(lowest_index, number_of_players), chosen_size)
+    else:
+        first = tuple(
+            lowest_index + index for index in _unrank_combination(start, number_of_players - lowest_index, chosen_size)
+        )
+        rest_combinations = _generate_combinations_from(first, number_of_players)
+    rest_combinations = islice(rest_combinations, stop - start)
+    if fixed_first_player:
+        return ((0, *indices) for indices in rest_combinations)
+    return rest_combinations
+
+
+def _unrank_combination(rank: int, number_of_values: int, size: int) -> tuple[int, ...]:
+    # The combination of range(number_of_values) at the given position in lexicographic order.
+    combination: list[int] = []
+    value = 0
+    for remaining in range(size, 0, -1):
+        # Skip the values for which every combination starting with them comes before the rank.
+        while rank >= (count := math.comb(number_of_values - value - 1, remaining - 1)):
+            rank -= count
+            value += 1
+        combination.append(value)
+        value += 1
+    return tuple(combination)
+
+
+def _generate_combinations_from(first: tuple[int, ...], number_of_values: int) -> Iterator[tuple[int, ...]]:
+    # Lexicographic combinations from first onwards: the last changed position moves from the back to the front,
+    # and everything after it is generated by itertools.
+    size = len(first)
+    if size == 0:
+        yield ()
+        return
+    for position in range(size - 1, -1, -1):
+        prefix = first[:position]
+        lowest_value = first[position] if position == size - 1 else first[position] + 1
+        for value in range(lowest_value, number_of_values - size + position + 1):
+            for rest in combinations(range(value + 1, number_of_values), size - position - 1):
+                yield (*prefix, value, *rest)
@@ -0,0 +1,83 @@
+"""
+Teammate pairs of the team distributions.
+
+The number of times every pair of players played in the same team is kept per Holdsport team, so the best team
+combinations can be tie-broken by how many teammate pairs they repeat.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from itertools import combinations
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping, Sequence
+
+    import numpy.typing as npt
+
+    from falcon_formation.data_models import Player
+
+
+def count_teammate_pairs(teams: Sequence[Sequence[Player]]) -> Counter[tuple[str, str]]:
+    """Count the pairs of player identifiers that are in the same team.
+
+    Args:
+        teams (Sequence[Sequence[Player]]): The teams.
+
+    Returns:
+        Counter[tuple[str, str]]: The sorted identifier pairs of the teammates.
+    """
+    return Counter(pair for team in teams for pair in combinations(sorted(player.identifier for player in team), 2))
+
+
+def create_teammate_pair_matrix(
+    players: list[Player],
+    teammate_pair_counts: Mapping[tuple[str, str], int],
+) -> npt.NDArray[np.int64]:
+    """Return the symmetric matrix of how many times each pair of the players were teammates.
+
+    Args:
+        players (list[Player]): List of registered Members and Guests.
+        teammate_pair_counts (Mapping[tuple[str, str], int]): The number of times each sorted identifier pair
+            were teammates.
+
+    Returns:
+        npt.NDArray[np.int64]: The teammate pair counts indexed by the positions of the players.
+    """
+    identifiers = [player.identifier for player in players]
+    matrix = np.zeros((len(players), len(players)), dtype=np.int64)
+    for first, second in combinations(range(len(players)), 2):
+        first_identifier, second_identifier = sorted((identifiers[first], identifiers[second]))
+        count = teammate_pair_counts.get((first_identifier, second_identifier), 0)
+        matrix[first, second] = matrix[second, first] = count
+    return matrix
+
+
+def calculate_repeated_teammate_pairs(
+    team_indices: npt.NDArray[np.intp],
+    teammate_pair_matrix: npt.NDArray[np.int64],
+) -> npt.NDArray[np.int64]:
+    """Return how many times the teammate pairs of each team combination were teammates before.
+
+    Args:
+        team_indices (npt.NDArray[np.intp]): The player indices of team one, one team combination per row.
+        teammate_pair_matrix (npt.NDArray[np.int64]): The teammate pair counts indexed by the positions of the
+            players.
+
+    Returns:
+        npt.NDArray[np.int64]: The number of repeated teammate pairs of both teams, one per row.
+    """
+    # The pairs within team two are every pair, minus the pairs touching team one, which count team one pairs twice.
+    team_1_pairs = np.zeros(len(team_indices), dtype=np.int64)
+    for column in range(team_indices.shape[1] - 1):
+        team_1_pairs += teammate_pair_matrix[team_indices[:, column, None], team_indices[:, column + 1 :]].sum(axis=1)
+    touching_team_1 = teammate_pair_matrix.sum(axis=1)[team_indices].sum(axis=1)
+    repeated_teammate_pairs: npt.NDArray[np.int64] = (
+        2 * team_1_pairs - touching_team_1 + int(teammate_pair_matrix.sum()) // 2
+    )
+    return repeated_teammate_pairs
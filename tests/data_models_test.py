@@ -9,10 +9,14 @@ import re
 import pytest
 
 from falcon_formation.data_models import (
+    ConstraintKind,
     Guest,
     Member,
+    PlayerConstraint,
     Position,
     Skill,
+    SolvedRoster,
+    TeamDistribution,
     TeamDistributionMetrics,
     TeamMetadata,
 )
@@ -38,6 +42,27 @@ def test_team_metadata(team_metadata: TeamMetadata) -> None:
     assert isinstance(team_metadata.telegram_chat_id, int)
     assert team_metadata.telegram_chat_id == -123456
 
+    assert isinstance(team_metadata.solver_time_budget, int)
+    assert team_metadata.solver_time_budget == 10
+
+    assert isinstance(team_metadata.number_of_teams, int)
+    assert team_metadata.number_of_teams == 2
+
+    assert isinstance(team_metadata.number_of_alternatives, int)
+    assert team_metadata.number_of_alternatives == 5
+
+    assert isinstance(team_metadata.rotate_teammates, bool)
+    assert team_metadata.rotate_teammates is False
+
+    assert isinstance(team_metadata.objective, str)
+    assert team_metadata.objective == ""
+
+    assert isinstance(team_metadata.forwards_per_line, int)
+    assert team_metadata.forwards_per_line == 0
+
+    assert isinstance(team_metadata.defenses_per_line, int)
+    assert team_metadata.defenses_per_line == 0
+
 
 def test_team_metadata_to_dict(team_metadata: TeamMetadata) -> None:
     team_metadata_dict = team_metadata.to_dict()
@@ -50,6 +75,13 @@ def test_team_metadata_to_dict(team_metadata: TeamMetadata) -> None:
         "jersey_color_1": "Red",
         "jersey_color_2": "Black",
         "telegram_chat_id": "-123456",
+        "solver_time_budget": "10",
+        "number_of_teams": "2",
+        "number_of_alternatives": "5",
+        "rotate_teammates": "False",
+        "objective": "",
+        "forwards_per_line": "0",
+        "defenses_per_line": "0",
     }
 
 
@@ -61,6 +93,13 @@ def test_team_metadata_from_dict(team_metadata: TeamMetadata) -> None:
         "jersey_color_1": "Red",
         "jersey_color_2": "Black",
         "telegram_chat_id": "-123456",
+        "solver_time_budget": "10",
+        "number_of_teams": "2",
+        "number_of_alternatives": "5",
+        "rotate_teammates": "False",
+        "objective": "",
+        "forwards_per_line": "0",
+        "defenses_per_line": "0",
     }
     assert TeamMetadata.from_dict(team_metadata_dict) == team_metadata
 
@@ -183,6 +222,10 @@ def test_member_to_string(member: Member) -> None:
     assert member.to_string(show_skill=False, show_position=False, show_guest=False) == "Member Name"
 
 
+def test_member_identifier(member: Member) -> None:
+    assert member.identifier == f"member:{member._id}"  # noqa: SLF001
+
+
 # Guest
 def test_guest_default_values(guest: Guest) -> None:
     assert isinstance(guest.name, str)
@@ -228,6 +271,50 @@ def test_guest_to_string(guest: Guest) -> None:
     assert guest.to_string(show_skill=True, show_position=True, show_guest=False) == "Guest Name  💪300  ⏩"
 
 
+def test_guest_identifier(guest: Guest) -> None:
+    assert guest.identifier == "guest:Guest Name"
+
+
+# PlayerConstraint
+def test_player_constraint_post_init() -> None:
+    with pytest.raises(ValueError, match=re.escape("Invalid constraint kind")):
+        PlayerConstraint(kind="Keep close", first_player="member:1234", second_player="guest:Guest Name")
+    with pytest.raises(ValueError, match=re.escape("Invalid constraint between the same player")):
+        PlayerConstraint(kind=ConstraintKind.KEEP_APART, first_player="member:1234", second_player="member:1234")
+
+
+def test_player_constraint_to_dict() -> None:
+    player_constraint = PlayerConstraint(
+        kind=ConstraintKind.KEEP_TOGETHER,
+        first_player="member:1234",
+        second_player="guest:Guest Name",
+    )
+    player_constraint_dict = player_constraint.to_dict()
+
+    assert player_constraint_dict == {
+        "_id": "Keep together|guest:Guest Name|member:1234",
+        "kind": "Keep together",
+        "first_player": "member:1234",
+        "second_player": "guest:Guest Name",
+    }
+    assert PlayerConstraint.from_dict(player_constraint_dict) == player_constraint
+
+
+# SolvedRoster
+def test_solved_roster_to_dict(team_distribution_metrics: TeamDistributionMetrics) -> None:
+    solved_roster = SolvedRoster(
+        signature="abc123",
+        metrics=team_distribution_metrics,
+        class_count_patterns=[[1, 0, 2], [0, 1, 2]],
+    )
+    solved_roster_dict = solved_roster.to_dict()
+
+    assert solved_roster_dict["_id"] == "abc123"
+    assert solved_roster_dict["class_count_patterns"] == "1,0,2;0,1,2"
+    assert SolvedRoster.from_dict(solved_roster_dict) == solved_roster
+    assert SolvedRoster.from_dict({**solved_roster_dict, "class_count_patterns": ""}).class_count_patterns == [[]]
+
+
 # TeamDistributionMetrics
 def test_team_distribution_metrics(team_distribution_metrics: TeamDistributionMetrics) -> None:
     assert isinstance(team_distribution_metrics.goalie_number_difference, int)
@@ -282,4 +369,56 @@ def test_team_metrics_operators() -> None:
 
 
 # TeamDistribution
-# TODO: Add tests for TeamDistribution
+def test_team_distribution_from_dict(team_distribution: TeamDistribution) -> None:
+    assert team_distribution.teams == [team_distribution.team_1, team_distribution.team_2]
+    assert TeamDistribution.from_dict(team_distribution.to_dict()) == team_distribution
+
+
+def test_team_distribution_other_teams(team_distribution: TeamDistribution) -> None:
+    team_distribution.other_teams = [[Member(_id=1240, name="Member Name 7")], [Guest(name="Guest Name 3")]]
+
+    team_distribution_dict = team_distribution.to_dict()
+
+    assert team_distribution_dict["team_3"] == {
+        "members": [team_distribution.other_teams[0][0].to_dict()],
+        "guests": [],
+    }
+    assert team_distribution_dict["team_4"] == {
+        "members": [],
+        "guests": [team_distribution.other_teams[1][0].to_dict()],
+    }
+    assert "team_5" not in team_distribution_dict
+    assert TeamDistribution.from_dict(team_distribution_dict) == team_distribution
+    assert len(team_distribution.teams) == 4
+
+
+def test_team_distribution_alternatives(team_distribution: TeamDistribution) -> None:
+    team_distribution.alternatives = [
+        [player.identifier for player in team_distribution.team_1],
+        [player.identifier for player in team_distribution.team_2],
+    ]
+    team_distribution.alternative_index = 1
+
+    team_distribution_dict = team_distribution.to_dict()
+
+    assert team_distribution_dict["alternatives"] == team_distribution.alternatives
+    assert team_distribution_dict["alternative_index"] == "1"
+    assert TeamDistribution.from_dict(team_distribution_dict) == team_distribution
+
+
+def test_team_distribution_roster_fingerprint(team_distribution: TeamDistribution) -> None:
+    team_distribution.roster_fingerprint = "fingerprint"
+
+    team_distribution_dict = team_distribution.to_dict()
+
+    assert team_distribution_dict["roster_fingerprint"] == "fingerprint"
+    assert TeamDistribution.from_dict(team_distribution_dict) == team_distribution
+
+
+def test_team_distribution_lines(team_distribution: TeamDistribution) -> None:
+    team_distribution.lines = [[player.identifier] for player in team_distribution.team_1]
+
+    team_distribution_dict = team_distribution.to_dict()
+
+    assert team_distribution_dict["lines"] == team_distribution.lines
+    assert TeamDistribution.from_dict(team_distribution_dict) == team_distribution
@@ -4,10 +4,21 @@ Tests for the MongoDB database.
 @author "Daniel Mizsak" <info@pythonvilag.hu>
 """
 
+from dataclasses import replace
+
 import mongomock
 import pytest
 
-from falcon_formation.data_models import Guest, Member, TeamDistribution, TeamMetadata
+from falcon_formation.data_models import (
+    ConstraintKind,
+    Guest,
+    Member,
+    PlayerConstraint,
+    SolvedRoster,
+    TeamDistribution,
+    TeamDistributionMetrics,
+    TeamMetadata,
+)
 from falcon_formation.database import FalconFormationDatabase
 
 
@@ -145,6 +156,33 @@ def test_load_guest_collection(database: FalconFormationDatabase, team_id: int,
     assert load_guest_collection_result == [guest_1, guest_2]
 
 
+# PlayerConstraint
+def test_insert_player_constraint(database: FalconFormationDatabase, team_id: int) -> None:
+    player_constraint = PlayerConstraint(ConstraintKind.KEEP_APART, "member:1234", "member:1235")
+    insert_player_constraint_result = database.insert_player_constraint(team_id, player_constraint)
+    assert insert_player_constraint_result.acknowledged is True
+    assert insert_player_constraint_result.inserted_id == player_constraint.to_dict()["_id"]
+
+
+def test_delete_player_constraint(database: FalconFormationDatabase, team_id: int) -> None:
+    player_constraint = PlayerConstraint(ConstraintKind.KEEP_APART, "member:1234", "member:1235")
+    delete_player_constraint_result = database.delete_player_constraint(team_id, player_constraint)
+    assert delete_player_constraint_result.deleted_count == 0
+    database.insert_player_constraint(team_id, player_constraint)
+    delete_player_constraint_result = database.delete_player_constraint(team_id, player_constraint)
+    assert delete_player_constraint_result.deleted_count == 1
+
+
+def test_load_player_constraint_collection(database: FalconFormationDatabase, team_id: int) -> None:
+    assert database.load_player_constraint_collection(team_id) == []
+    player_constraint_1 = PlayerConstraint(ConstraintKind.KEEP_TOGETHER, "member:1234", "guest:Guest Name")
+    player_constraint_2 = PlayerConstraint(ConstraintKind.KEEP_APART, "member:1234", "member:1235")
+    database.insert_player_constraint(team_id, player_constraint_1)
+    database.insert_player_constraint(team_id, player_constraint_2)
+    load_player_constraint_collection_result = database.load_player_constraint_collection(team_id)
+    assert load_player_constraint_collection_result == [player_constraint_1, player_constraint_2]
+
+
 # TeamDistribution
 def test_insert_or_update_team_distribution(
     database: FalconFormationDatabase,
@@ -170,3 +208,53 @@ def test_load_team_distribution(
     database.insert_or_update_team_distribution(team_id, team_distribution)
     load_team_distribution_result = database.load_team_distribution(team_id, team_distribution.date)
     assert load_team_distribution_result == team_distribution
+
+
+def test_insert_or_update_team_distribution_fewer_teams(
+    database: FalconFormationDatabase,
+    team_id: int,
+    team_distribution: TeamDistribution,
+) -> None:
+    three_teams = replace(team_distribution, other_teams=[[Member(_id=1238, name="Member Name 5")]])
+    database.insert_or_update_team_distribution(team_id, three_teams)
+    assert database.load_team_distribution(team_id, team_distribution.date) == three_teams
+    database.insert_or_update_team_distribution(team_id, team_distribution)
+    load_team_distribution_result = database.load_team_distribution(team_id, team_distribution.date)
+    assert load_team_distribution_result == team_distribution
+    assert load_team_distribution_result is not None
+    assert load_team_distribution_result.other_teams == []
+
+
+# Teammate pairs
+def test_update_teammate_pair_counts(database: FalconFormationDatabase, team_id: int) -> None:
+    assert database.update_teammate_pair_counts(team_id, {("guest:A", "member:1"): 0}) is None
+    update_teammate_pair_counts_result = database.update_teammate_pair_counts(
+        team_id,
+        {("guest:A", "member:1"): 1, ("member:1", "member:2"): 2},
+    )
+    assert update_teammate_pair_counts_result is not None
+    assert update_teammate_pair_counts_result.acknowledged is True
+    assert update_teammate_pair_counts_result.upserted_count == 2
+    database.update_teammate_pair_counts(team_id, {("guest:A", "member:1"): -1, ("member:1", "member:2"): 1})
+    load_teammate_pair_counts_result = database.load_teammate_pair_counts(team_id, ["member:2", "member:1", "guest:A"])
+    assert load_teammate_pair_counts_result == {("member:1", "member:2"): 3}
+
+
+def test_load_teammate_pair_counts(database: FalconFormationDatabase, team_id: int) -> None:
+    assert database.load_teammate_pair_counts(team_id, ["member:1", "member:2"]) == {}
+    database.update_teammate_pair_counts(team_id, {("member:1", "member:2"): 1, ("member:2", "member:3"): 1})
+    load_teammate_pair_counts_result = database.load_teammate_pair_counts(team_id, ["member:1", "member:2"])
+    assert load_teammate_pair_counts_result == {("member:1", "member:2"): 1}
+
+
+# SolvedRoster
+def test_solved_roster(database: FalconFormationDatabase, team_distribution_metrics: TeamDistributionMetrics) -> None:
+    solved_roster = SolvedRoster(
+        signature="abc123",
+        metrics=team_distribution_metrics,
+        class_count_patterns=[[1, 0, 2], [0, 1, 2]],
+    )
+    assert database.load_solved_roster(solved_roster.signature) is None
+    insert_solved_roster_result = database.insert_or_update_solved_roster(solved_roster)
+    assert insert_solved_roster_result.upserted_id == solved_roster.signature
+    assert database.load_solved_roster(solved_roster.signature) == solved_roster
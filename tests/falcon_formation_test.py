@@ -4,13 +4,56 @@ Short description and source of base code.
 @author "Daniel Mizsak" <info@pythonvilag.hu>
 """
 
+import time
+from dataclasses import replace
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import mongomock
 import pytest
+from aioresponses import aioresponses
 
-from falcon_formation.data_models import Guest, Member, Player, TeamDistributionMetrics
+from falcon_formation import main
+from falcon_formation.data_models import (
+    ConstraintKind,
+    Guest,
+    Member,
+    Player,
+    PlayerConstraint,
+    TeamDistribution,
+    TeamDistributionMetrics,
+    TeamMetadata,
+)
+from falcon_formation.database import FalconFormationDatabase
 from falcon_formation.main import (
+    OBJECTIVE_SOLVER_STRATEGIES,
     _assign_me_to_team_one,
     _calculate_team_combination_metrics,
+    _create_roster_fingerprint,
+    _describe_solver_result,
+    _format_lines,
     _generate_every_team_combination,
+    _load_upcoming_attendance,
+    add_player_constraint,
+    apply_swap,
+    create_team_distribution,
+    create_teams,
+    create_upcoming_teams,
+    get_player_constraints,
+    get_swap_impacts,
+    get_teams,
+    remove_player_constraint,
+    reshuffle_teams,
+)
+from falcon_formation.solver import (
+    SolvedRosterCache,
+    SolverStrategy,
+    count_teammate_pairs,
+    create_roster_signature,
+    estimate_solver_runtimes,
+    select_solver_strategy,
+    solve_batched,
+    solve_dynamic_programming,
 )
 
 
@@ -30,6 +73,52 @@ def team_combination() -> tuple[tuple[Player, ...], tuple[Player, ...]]:
     )
 
 
+@pytest.fixture
+def database(monkeypatch: pytest.MonkeyPatch, team_metadata: TeamMetadata) -> FalconFormationDatabase:
+    database = FalconFormationDatabase(client=mongomock.MongoClient())
+    database.insert_team_metadata(team_metadata)
+    monkeypatch.setattr(main, "database", database)
+    monkeypatch.setattr(main, "solved_roster_cache", SolvedRosterCache())
+    return database
+
+
+@pytest.fixture
+def today() -> str:
+    return str((datetime.now(tz=UTC) + timedelta(hours=2)).date())
+
+
+@pytest.fixture
+def members(database: FalconFormationDatabase, team_id: int) -> list[Member]:
+    # Equally skilled forwards, so there are many optimal team combinations.
+    members = [
+        Member(_id=1000 + index, name=f"MEMBER NAME {index}", skill=300, position="Forward") for index in range(8)
+    ]
+    for member in members:
+        database.insert_member(team_id, member)
+    return members
+
+
+def mock_attendance(
+    mocked: aioresponses,
+    team_id: int,
+    date: str,
+    members: list[Member],
+    activity_id: int = 1,
+) -> None:
+    mocked.get(
+        f"https://api.holdsport.dk/v1/teams/{team_id}/activities?date={date}",
+        payload=[{"id": activity_id, "name": "Activity Name", "starttime": f"{date}T20:00:00+01:00"}],
+        repeat=True,
+    )
+    mocked.get(
+        f"https://api.holdsport.dk/v1/activities/{activity_id}/activities_users",
+        payload=[
+            {"user_id": member.to_dict()["_id"], "name": member.name, "status": "Attending"} for member in members
+        ],
+        repeat=True,
+    )
+
+
 def test_generate_every_team_combination() -> None:
     players = [
         Member(_id=1234, name="Member Name 1"),
@@ -40,11 +129,14 @@ def test_generate_every_team_combination() -> None:
         Guest(name="Guest Name 2"),
     ]
 
-    team_combination_number = 0
-    for _ in _generate_every_team_combination(players):
-        team_combination_number += 1
+    splits = [
+        frozenset((frozenset(map(id, team_1)), frozenset(map(id, team_2))))
+        for team_1, team_2 in _generate_every_team_combination(players)
+    ]
 
-    assert team_combination_number == 20
+    assert len(splits) == 10
+    assert len(set(splits)) == 10
+    assert all(len(team_1) == 3 and len(team_2) == 3 for team_1, team_2 in _generate_every_team_combination(players))
 
 
 def test_calculate_team_combination_metrics(team_combination: tuple[tuple[Player, ...], tuple[Player, ...]]) -> None:
@@ -61,3 +153,619 @@ def test_assign_me_to_team_one(team_combination: tuple[tuple[Player, ...], tuple
         sorted(team_combination[1], key=lambda player: player.name),
         sorted(team_combination[0], key=lambda player: player.name),
     )
+
+
+def test_create_roster_fingerprint(team_combination: tuple[tuple[Player, ...], tuple[Player, ...]]) -> None:
+    players = [*team_combination[0], *team_combination[1]]
+    fingerprint = _create_roster_fingerprint(players)
+
+    assert _create_roster_fingerprint(players[::-1]) == fingerprint
+    assert _create_roster_fingerprint(players[:-1]) != fingerprint
+    players[0].skill += 1
+    assert _create_roster_fingerprint(players) != fingerprint
+    players[0].skill -= 1
+    players[0].position = "Defense"
+    assert _create_roster_fingerprint(players) != fingerprint
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"solver_time_budget": 20},
+        {"number_of_teams": 3},
+        {"number_of_alternatives": 2},
+        {"rotate_teammates": True},
+        {"objective": "skill_difference"},
+        {"forwards_per_line": 3},
+        {"defenses_per_line": 2},
+    ],
+)
+def test_create_roster_fingerprint_team_metadata(
+    team_combination: tuple[tuple[Player, ...], tuple[Player, ...]],
+    team_metadata: TeamMetadata,
+    changes: dict[str, Any],
+) -> None:
+    players = [*team_combination[0], *team_combination[1]]
+    fingerprint = _create_roster_fingerprint(players, team_metadata)
+
+    assert _create_roster_fingerprint(players) == fingerprint
+    assert _create_roster_fingerprint(players, replace(team_metadata, jersey_color_1="Blue")) == fingerprint
+    assert _create_roster_fingerprint(players, replace(team_metadata, **changes)) != fingerprint
+
+
+def test_create_roster_fingerprint_player_constraints(
+    team_combination: tuple[tuple[Player, ...], tuple[Player, ...]],
+) -> None:
+    players = [*team_combination[0], *team_combination[1]]
+    fingerprint = _create_roster_fingerprint(players)
+    keep_apart = PlayerConstraint(ConstraintKind.KEEP_APART, players[0].identifier, players[1].identifier)
+    keep_together = PlayerConstraint(ConstraintKind.KEEP_TOGETHER, players[0].identifier, players[1].identifier)
+    absent = PlayerConstraint(ConstraintKind.KEEP_APART, players[0].identifier, "member:9999")
+
+    assert _create_roster_fingerprint(players, player_constraints=[absent]) == fingerprint
+    assert _create_roster_fingerprint(players, player_constraints=[keep_apart]) != fingerprint
+    assert _create_roster_fingerprint(players, player_constraints=[keep_apart]) != _create_roster_fingerprint(
+        players,
+        player_constraints=[keep_together],
+    )
+
+
+@pytest.mark.asyncio
+async def test_load_upcoming_attendance() -> None:
+    activities = [
+        {"id": 11, "name": "Practice", "starttime": "2024-01-01T20:00:00+01:00"},
+        {"id": 12, "name": "Game", "starttime": "2024-01-02T20:00:00+01:00"},
+        {"id": 13, "name": "Practice", "starttime": "2024-01-08T20:00:00+01:00"},
+    ]
+    with aioresponses() as m:
+        m.get("https://api.holdsport.dk/v1/teams/1/activities?per_page=4", payload=activities)
+        m.get("https://api.holdsport.dk/v1/teams/1/activities?date=2024-01-01", payload=activities[:1])
+        m.get("https://api.holdsport.dk/v1/teams/1/activities?date=2024-01-08", payload=activities[2:])
+        m.get(
+            "https://api.holdsport.dk/v1/activities/11/activities_users",
+            payload=[{"user_id": 1, "name": "Member Name 1", "status": "Attending"}],
+        )
+        m.get(
+            "https://api.holdsport.dk/v1/activities/13/activities_users",
+            payload=[{"user_id": 2, "name": "Member Name 2", "status": "Attending"}],
+        )
+        attendance = await _load_upcoming_attendance(1, "Practice", 2)
+
+    assert attendance == {
+        "2024-01-01": [{"_id": 1, "name": "MEMBER NAME 1"}],
+        "2024-01-08": [{"_id": 2, "name": "MEMBER NAME 2"}],
+    }
+
+
+def test_create_upcoming_teams(
+    database: FalconFormationDatabase,
+    team_id: int,
+    members: list[Member],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    dates = ["2030-01-01", "2030-01-08", "2030-01-15"]
+    new_member = Member(_id=2000, name="NEW MEMBER NAME")
+    loaded_team_ids: list[int] = []
+    load_team_metadata = database.load_team_metadata
+
+    def count_load_team_metadata(team_id: int) -> TeamMetadata | None:
+        loaded_team_ids.append(team_id)
+        return load_team_metadata(team_id)
+
+    monkeypatch.setattr(database, "load_team_metadata", count_load_team_metadata)
+    with aioresponses() as m:
+        m.get(
+            f"https://api.holdsport.dk/v1/teams/{team_id}/activities?per_page=9",
+            payload=[{"id": 0, "name": "Activity Name", "starttime": f"{date}T20:00:00+01:00"} for date in dates],
+        )
+        mock_attendance(m, team_id, dates[0], members, activity_id=1)
+        # Nobody is registered for the second date.
+        mock_attendance(m, team_id, dates[1], [], activity_id=2)
+        mock_attendance(m, team_id, dates[2], [*members[:5], new_member], activity_id=3)
+        created_dates = create_upcoming_teams(team_id, number_of_dates=3)
+
+    assert created_dates == [dates[0], dates[2]]
+    # The team metadata is loaded once for every date.
+    assert loaded_team_ids == [team_id]
+    assert database.load_team_distribution(team_id, dates[1]) is None
+    for date, date_members in [(dates[0], members), (dates[2], [*members[:5], new_member])]:
+        team_distribution = database.load_team_distribution(team_id, date)
+        assert team_distribution is not None
+        assert sorted(
+            player.identifier for team in (team_distribution.team_1, team_distribution.team_2) for player in team
+        ) == sorted(member.identifier for member in date_members)
+    assert new_member.identifier in {member.identifier for member in database.load_member_collection(team_id)}
+
+
+def test_format_lines(team_combination: tuple[tuple[Player, ...], tuple[Player, ...]]) -> None:
+    team_1, team_2 = team_combination
+    lines = [
+        [team_1[0].identifier],
+        [team_1[1].identifier, team_2[2].identifier],
+        [team_2[1].identifier],
+        [team_2[2].identifier],
+    ]
+
+    assert _format_lines(team_1, lines) == "Forward line 1: Member Name 1"
+    assert _format_lines(team_2, lines) == "Forward line 1: Member Name 4\nDefense line 1: Guest Name 2"
+    assert _format_lines(team_2, []) == ""
+
+
+def test_describe_solver_result(team_combination: tuple[tuple[Player, ...], tuple[Player, ...]]) -> None:
+    players = [*team_combination[0], *team_combination[1]]
+
+    dynamic_programming_result = solve_dynamic_programming(players)
+    batched_result = solve_batched(players)
+    assert dynamic_programming_result is not None
+    assert batched_result is not None
+
+    assert _describe_solver_result(dynamic_programming_result) == "proven optimal: True"
+    assert _describe_solver_result(batched_result) == (
+        f"proven optimal: {batched_result.proven_optimal}, {batched_result.evaluated_splits} splits evaluated, "
+        f"lower bound reached: {batched_result.lower_bound_reached}"
+    )
+
+
+def test_reshuffle_teams(database: FalconFormationDatabase, team_id: int, today: str, members: list[Member]) -> None:
+    with aioresponses() as m:
+        mock_attendance(m, team_id, today, members)
+        create_teams(team_id)
+        team_distribution = database.load_team_distribution(team_id, today)
+        assert team_distribution is not None
+        assert len(team_distribution.alternatives) == TeamMetadata.number_of_alternatives
+
+        messages = [reshuffle_teams(team_id) for _ in team_distribution.alternatives]
+
+    number_of_alternatives = len(team_distribution.alternatives)
+    assert messages == [
+        f"Showing alternative {index % number_of_alternatives + 1} of {number_of_alternatives}."
+        for index in range(1, number_of_alternatives + 1)
+    ]
+    reshuffled_team_distribution = database.load_team_distribution(team_id, today)
+    assert reshuffled_team_distribution is not None
+    assert reshuffled_team_distribution.alternative_index == 0
+    assert reshuffled_team_distribution.metrics == team_distribution.metrics
+    assert {frozenset(player.identifier for player in team) for team in reshuffled_team_distribution.teams} == {
+        frozenset(player.identifier for player in team) for team in team_distribution.teams
+    }
+
+
+def test_reshuffle_teams_alternative(
+    database: FalconFormationDatabase,
+    team_id: int,
+    today: str,
+    members: list[Member],
+) -> None:
+    with aioresponses() as m:
+        mock_attendance(m, team_id, today, members)
+        create_teams(team_id)
+        team_distribution = database.load_team_distribution(team_id, today)
+        assert team_distribution is not None
+
+        reshuffle_teams(team_id)
+
+    reshuffled_team_distribution = database.load_team_distribution(team_id, today)
+    assert reshuffled_team_distribution is not None
+    assert reshuffled_team_distribution.alternative_index == 1
+    team_1_identifiers = frozenset(team_distribution.alternatives[1])
+    assert team_1_identifiers in {
+        frozenset(player.identifier for player in team) for team in reshuffled_team_distribution.teams
+    }
+    assert (
+        _calculate_team_combination_metrics(
+            (tuple(reshuffled_team_distribution.team_1), tuple(reshuffled_team_distribution.team_2)),
+        )
+        == team_distribution.metrics
+    )
+
+
+def test_reshuffle_teams_changed_players(
+    database: FalconFormationDatabase,
+    team_id: int,
+    today: str,
+    members: list[Member],
+) -> None:
+    with aioresponses() as m:
+        mock_attendance(m, team_id, today, members)
+        create_teams(team_id)
+        database.insert_guest(team_id, today, Guest(name="Guest Name", skill=300, position="Forward"))
+
+        message = reshuffle_teams(team_id)
+
+    assert message == "The registered players changed since the teams were created, please create the teams again."
+    team_distribution = database.load_team_distribution(team_id, today)
+    assert team_distribution is not None
+    assert team_distribution.alternative_index == 0
+
+
+@pytest.mark.usefixtures("database")
+def test_reshuffle_teams_without_team_distribution(team_id: int) -> None:
+    assert reshuffle_teams(team_id) == "No team distribution found."
+
+
+def test_create_teams_rotate_teammates(
+    database: FalconFormationDatabase,
+    team_id: int,
+    team_metadata: TeamMetadata,
+    today: str,
+    members: list[Member],
+) -> None:
+    database.update_team_metadata(replace(team_metadata, rotate_teammates=True))
+
+    with aioresponses() as m:
+        mock_attendance(m, team_id, today, members)
+        create_teams(team_id)
+
+    team_distribution = database.load_team_distribution(team_id, today)
+    assert team_distribution is not None
+    assert team_distribution.alternatives == []
+
+
+def test_add_player_constraint(
+    database: FalconFormationDatabase,
+    team_id: int,
+    today: str,
+    members: list[Member],
+) -> None:
+    guest = Guest(name="Guest Name", skill=300, position="Forward")
+    database.insert_guest(team_id, today, guest)
+
+    message = add_player_constraint(team_id, ConstraintKind.KEEP_APART, members[0].name, guest.identifier)
+
+    assert message == f"Added keep apart constraint for {members[0].name} and {guest.identifier}."
+    assert database.load_player_constraint_collection(team_id) == [
+        PlayerConstraint(
+            kind=ConstraintKind.KEEP_APART,
+            first_player=members[0].identifier,
+            second_player=guest.identifier,
+        ),
+    ]
+    assert get_player_constraints(team_id) == f"Keep apart: {members[0].identifier} and {guest.identifier}"
+    assert (
+        add_player_constraint(team_id, ConstraintKind.KEEP_APART, guest.name, members[0].identifier)
+        == "The player constraint already exists."
+    )
+
+
+def test_add_player_constraint_invalid(database: FalconFormationDatabase, team_id: int, members: list[Member]) -> None:
+    assert add_player_constraint(team_id, ConstraintKind.KEEP_TOGETHER, members[0].name, "Unknown Name") == (
+        "Unknown player: Unknown Name"
+    )
+    assert add_player_constraint(team_id, "Keep close", members[0].name, members[1].name).startswith(
+        "Invalid constraint kind: Keep close",
+    )
+    assert add_player_constraint(team_id, ConstraintKind.KEEP_TOGETHER, members[0].name, members[0].identifier) == (
+        f"Invalid constraint between the same player: {members[0].identifier}"
+    )
+    assert database.load_player_constraint_collection(team_id) == []
+    assert get_player_constraints(team_id) == "No player constraints found."
+
+
+def test_remove_player_constraint(database: FalconFormationDatabase, team_id: int, members: list[Member]) -> None:
+    add_player_constraint(team_id, ConstraintKind.KEEP_TOGETHER, members[0].name, members[1].name)
+
+    assert remove_player_constraint(team_id, ConstraintKind.KEEP_APART, members[0].name, members[1].name) == (
+        "No such player constraint found."
+    )
+    assert remove_player_constraint(team_id, ConstraintKind.KEEP_TOGETHER, members[1].name, members[0].name) == (
+        f"Removed keep together constraint for {members[1].name} and {members[0].name}."
+    )
+    assert database.load_player_constraint_collection(team_id) == []
+
+
+def test_create_teams_with_player_constraint(
+    database: FalconFormationDatabase,
+    team_id: int,
+    today: str,
+    members: list[Member],
+) -> None:
+    add_player_constraint(team_id, ConstraintKind.KEEP_TOGETHER, members[0].name, members[1].name)
+
+    with aioresponses() as m:
+        mock_attendance(m, team_id, today, members)
+        create_teams(team_id)
+
+    team_distribution = database.load_team_distribution(team_id, today)
+    assert team_distribution is not None
+    assert any(
+        {members[0].identifier, members[1].identifier} <= {player.identifier for player in team}
+        for team in team_distribution.teams
+    )
+
+
+def test_create_team_distribution_rotate_teammates(
+    database: FalconFormationDatabase,
+    team_id: int,
+    team_metadata: TeamMetadata,
+    members: list[Member],
+) -> None:
+    players: list[Player] = list(members)
+    identifiers = [player.identifier for player in players]
+    database.update_team_metadata(replace(team_metadata, rotate_teammates=True))
+    # Without the rotation, the cost model picks a solver that does not know the teammate pairs.
+    assert select_solver_strategy(players, team_metadata.solver_time_budget)[0] != SolverStrategy.BATCHED
+
+    for day in range(1, 8):
+        date = f"2025-01-0{day}"
+        teammate_pair_counts = database.load_teammate_pair_counts(team_id, identifiers)
+        repeated_teammate_pairs = [
+            sum(teammate_pair_counts.get(pair, 0) for pair in count_teammate_pairs(team_combination))
+            for team_combination in _generate_every_team_combination(players)
+        ]
+
+        create_team_distribution(players, team_id, date)
+
+        team_distribution = database.load_team_distribution(team_id, date)
+        assert team_distribution is not None
+        assert sum(teammate_pair_counts.get(pair, 0) for pair in count_teammate_pairs(team_distribution.teams)) == min(
+            repeated_teammate_pairs,
+        )
+        if day > 1:
+            assert min(repeated_teammate_pairs) < max(repeated_teammate_pairs)
+
+
+@pytest.fixture
+def swap_team_distribution(
+    database: FalconFormationDatabase,
+    team_id: int,
+    today: str,
+    team_combination: tuple[tuple[Player, ...], tuple[Player, ...]],
+) -> TeamDistribution:
+    team_distribution = TeamDistribution(
+        date=today,
+        team_1=list(team_combination[0]),
+        team_2=list(team_combination[1]),
+        metrics=_calculate_team_combination_metrics(team_combination),
+        proven_optimal=True,
+        alternatives=[[player.identifier for player in team_combination[0]], ["member:1234", "member:1236"]],
+        alternative_index=1,
+    )
+    database.insert_or_update_team_distribution(team_id, team_distribution)
+    return team_distribution
+
+
+def test_get_swap_impacts(team_id: int, today: str, swap_team_distribution: TeamDistribution) -> None:
+    metrics = swap_team_distribution.metrics
+
+    lines = get_swap_impacts(team_id).split("\n")
+
+    assert lines[:3] == [
+        f"Date: {today}",
+        (
+            f"Current metrics: {metrics.goalie_number_difference}, {metrics.defense_number_difference}, "
+            f"{metrics.skill_difference}, {metrics.defense_skill_difference}"
+        ),
+        "",
+    ]
+    assert len(lines[3:]) == len(swap_team_distribution.team_1) * len(swap_team_distribution.team_2)
+    swapped_metrics = []
+    for line in lines[3:]:
+        player_1_name, player_2_name = line.split(": ")[0].split(" <-> ")
+        team_1_names = [
+            player_2_name if player.name == player_1_name else player.name for player in swap_team_distribution.team_1
+        ]
+        assert player_1_name in {player.name for player in swap_team_distribution.team_1}
+        assert player_2_name in {player.name for player in swap_team_distribution.team_2}
+        players = [*swap_team_distribution.team_1, *swap_team_distribution.team_2]
+        swapped_team_1 = tuple(player for player in players if player.name in team_1_names)
+        swapped_team_2 = tuple(player for player in players if player.name not in team_1_names)
+        swapped_metrics.append(_calculate_team_combination_metrics((swapped_team_1, swapped_team_2)))
+        assert line.split(": ")[1] == (
+            f"goalie number {swapped_metrics[-1].goalie_number_difference - metrics.goalie_number_difference:+d}, "
+            f"defense number {swapped_metrics[-1].defense_number_difference - metrics.defense_number_difference:+d}, "
+            f"skill {swapped_metrics[-1].skill_difference - metrics.skill_difference:+d}, "
+            f"defense skill {swapped_metrics[-1].defense_skill_difference - metrics.defense_skill_difference:+d}"
+        )
+    assert swapped_metrics[0] == min(swapped_metrics)
+
+
+@pytest.mark.parametrize(
+    ("player_1", "player_2"),
+    [
+        ("Member Name 1", "Member Name 3"),
+        ("Member Name 3", "Member Name 1"),
+        ("member:1234", "Member Name 3"),
+        ("Member Name 3", "member:1234"),
+    ],
+)
+def test_apply_swap(
+    database: FalconFormationDatabase,
+    team_id: int,
+    swap_team_distribution: TeamDistribution,
+    player_1: str,
+    player_2: str,
+) -> None:
+    message = apply_swap(team_id, player_1, player_2)
+
+    assert message == "Swapped Member Name 1 and Member Name 3."
+    team_distribution = database.load_team_distribution(team_id, swap_team_distribution.date)
+    assert team_distribution is not None
+    team_1_identifiers = {player.identifier for player in team_distribution.team_1}
+    assert team_1_identifiers == {"member:1236", "member:1235", "guest:Guest Name 1"}
+    swapped_metrics = _calculate_team_combination_metrics(
+        (tuple(team_distribution.team_1), tuple(team_distribution.team_2)),
+    )
+    assert team_distribution.metrics == swapped_metrics
+    assert team_distribution.proven_optimal == (swapped_metrics == swap_team_distribution.metrics)
+    assert team_distribution.alternatives == []
+    assert team_distribution.alternative_index == 0
+
+
+def test_apply_swap_keeps_proven_optimal(
+    database: FalconFormationDatabase,
+    team_id: int,
+    swap_team_distribution: TeamDistribution,
+) -> None:
+    # Swapping the two forwards of the same skill keeps the metrics.
+    swap_team_distribution.team_2[1].skill = 300
+    swap_team_distribution.metrics = _calculate_team_combination_metrics(
+        (tuple(swap_team_distribution.team_1), tuple(swap_team_distribution.team_2)),
+    )
+    database.insert_or_update_team_distribution(team_id, swap_team_distribution)
+
+    assert apply_swap(team_id, "Member Name 1", "Member Name 4") == "Swapped Member Name 1 and Member Name 4."
+
+    team_distribution = database.load_team_distribution(team_id, swap_team_distribution.date)
+    assert team_distribution is not None
+    assert team_distribution.metrics == swap_team_distribution.metrics
+    assert team_distribution.proven_optimal
+
+
+@pytest.mark.parametrize(
+    ("player_1", "player_2"),
+    [("Member Name 1", "Member Name 2"), ("Member Name 1", "Unknown Name"), ("member:1236", "member:1237")],
+)
+def test_apply_swap_not_in_different_teams(
+    database: FalconFormationDatabase,
+    team_id: int,
+    swap_team_distribution: TeamDistribution,
+    player_1: str,
+    player_2: str,
+) -> None:
+    assert apply_swap(team_id, player_1, player_2) == "The players are not in different teams."
+    assert database.load_team_distribution(team_id, swap_team_distribution.date) == swap_team_distribution
+
+
+@pytest.mark.usefixtures("database")
+def test_swap_without_team_distribution(team_id: int) -> None:
+    assert get_swap_impacts(team_id) == "No team distribution found."
+    assert apply_swap(team_id, "Member Name 1", "Member Name 3") == "No team distribution found."
+
+
+def test_swap_with_other_teams(
+    database: FalconFormationDatabase,
+    team_id: int,
+    swap_team_distribution: TeamDistribution,
+) -> None:
+    swap_team_distribution.other_teams = [[Guest(name="Guest Name 3")]]
+    database.insert_or_update_team_distribution(team_id, swap_team_distribution)
+
+    assert get_swap_impacts(team_id) == "Swaps are only available for two teams."
+    assert apply_swap(team_id, "Member Name 1", "Member Name 3") == "Swaps are only available for two teams."
+
+
+def test_create_team_distribution_cache_hits_vary_teams(database: FalconFormationDatabase, team_id: int) -> None:
+    # Forwards of 100 and 400 against 200 and 300 are the only optimal splits.
+    players: list[Player] = [
+        Member(_id=1000 + skill, name=f"MEMBER NAME {skill}", skill=skill, position="Forward")
+        for skill in (100, 200, 300, 400)
+    ]
+    create_team_distribution(players, team_id, "2025-01-01")
+    solved_roster = database.load_solved_roster(create_roster_signature(players))
+    assert solved_roster is not None
+    assert len(solved_roster.class_count_patterns) == 2
+
+    team_1_skills = set()
+    for day in range(2, 22):
+        date = f"2025-01-{day:02d}"
+        create_team_distribution(players, team_id, date)
+        team_distribution = database.load_team_distribution(team_id, date)
+        assert team_distribution is not None
+        team_1_skills.add(frozenset(player.skill for player in team_distribution.team_1))
+
+    assert team_1_skills == {frozenset({100, 400}), frozenset({200, 300})}
+
+
+def test_create_teams_skips_unchanged(
+    database: FalconFormationDatabase,
+    team_id: int,
+    today: str,
+    members: list[Member],
+) -> None:
+    with aioresponses() as m:
+        mock_attendance(m, team_id, today, members)
+        create_teams(team_id)
+        team_distribution = database.load_team_distribution(team_id, today)
+        assert team_distribution is not None
+        # Marks the stored team distribution, so recreating it is noticed.
+        team_distribution.alternative_index = 3
+        database.insert_or_update_team_distribution(team_id, team_distribution)
+
+        create_teams(team_id)
+        kept_team_distribution = database.load_team_distribution(team_id, today)
+        create_teams(team_id, force=True)
+        forced_team_distribution = database.load_team_distribution(team_id, today)
+
+    assert kept_team_distribution == team_distribution
+    assert forced_team_distribution is not None
+    assert forced_team_distribution.alternative_index == 0
+    assert forced_team_distribution.roster_fingerprint == team_distribution.roster_fingerprint
+
+
+@pytest.mark.parametrize("change", ["player", "team_metadata", "player_constraint"])
+def test_create_teams_recreates_changed(
+    database: FalconFormationDatabase,
+    team_id: int,
+    team_metadata: TeamMetadata,
+    members: list[Member],
+    change: str,
+) -> None:
+    today = str((datetime.now(tz=UTC) + timedelta(hours=2)).date())
+    with aioresponses() as m:
+        mock_attendance(m, team_id, today, members)
+        create_teams(team_id)
+        team_distribution = database.load_team_distribution(team_id, today)
+        assert team_distribution is not None
+        team_distribution.alternative_index = 3
+        database.insert_or_update_team_distribution(team_id, team_distribution)
+
+        if change == "player":
+            database.insert_guest(team_id, today, Guest(name="Guest Name", skill=300, position="Forward"))
+        elif change == "team_metadata":
+            database.update_team_metadata(replace(team_metadata, number_of_alternatives=2))
+        else:
+            add_player_constraint(team_id, ConstraintKind.KEEP_APART, members[0].name, members[1].name)
+        create_teams(team_id)
+
+    recreated_team_distribution = database.load_team_distribution(team_id, today)
+    assert recreated_team_distribution is not None
+    assert recreated_team_distribution.alternative_index == 0
+    assert recreated_team_distribution.roster_fingerprint != team_distribution.roster_fingerprint
+
+
+def test_get_teams_is_stale_without_side_effects(
+    database: FalconFormationDatabase,
+    team_id: int,
+    today: str,
+    members: list[Member],
+) -> None:
+    new_member = Member(_id=2000, name="NEW MEMBER NAME")
+    with aioresponses() as m:
+        mock_attendance(m, team_id, today, members)
+        create_teams(team_id)
+        fresh_output = get_teams(team_id, show_skill=True, show_position=True, show_guest=True)
+    with aioresponses() as m:
+        mock_attendance(m, team_id, today, [*members, new_member])
+        stale_output = get_teams(team_id, show_skill=True, show_position=True, show_guest=True)
+
+    stale_note = "The teams are stale"
+    assert stale_note not in fresh_output
+    assert stale_note in stale_output
+    assert database.load_member(team_id, 2000) is None
+
+
+def test_create_team_distribution_objective_time_budget(
+    database: FalconFormationDatabase,
+    team_id: int,
+    team_metadata: TeamMetadata,
+) -> None:
+    players: list[Player] = [
+        Member(_id=1000 + index, name=f"MEMBER NAME {index}", skill=100 + 37 * index, position="Forward")
+        for index in range(30)
+    ]
+    database.update_team_metadata(replace(team_metadata, objective="skill_difference", solver_time_budget=1))
+    # The exact solvers comparing the team combinations by the objective are predicted to take far too long.
+    assert (
+        min(estimate_solver_runtimes(players)[solver_strategy] for solver_strategy in OBJECTIVE_SOLVER_STRATEGIES) > 1
+    )
+
+    start_time = time.monotonic()
+    create_team_distribution(players, team_id, "2025-01-01")
+
+    assert time.monotonic() - start_time < 5
+    team_distribution = database.load_team_distribution(team_id, "2025-01-01")
+    assert team_distribution is not None
+    assert not team_distribution.proven_optimal
+    assert team_distribution.metrics == _calculate_team_combination_metrics(
+        (tuple(team_distribution.team_1), tuple(team_distribution.team_2)),
+    )
@@ -0,0 +1,941 @@
+"""
+Tests for the team distribution solvers.
+
+@author "Daniel Mizsak" <info@pythonvilag.hu>
+"""
+
+import itertools
+import math
+import random
+import time
+from collections.abc import Callable
+from dataclasses import astuple, replace
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from falcon_formation.data_models import (
+    ConstraintKind,
+    Guest,
+    Member,
+    Player,
+    PlayerConstraint,
+    Position,
+    TeamDistributionMetrics,
+)
+from falcon_formation.main import (
+    _calculate_team_combination_metrics,
+    _generate_every_team_combination,
+    _solve_brute_force,
+)
+from falcon_formation.solver import (
+    Objective,
+    ReservoirSampler,
+    SolvedRosterCache,
+    SolverResult,
+    SolverStrategy,
+    apply_solved_roster,
+    calculate_k_way_metrics,
+    calculate_metrics_lower_bound,
+    calculate_repeated_teammate_pairs,
+    calculate_swap_impacts,
+    count_team_one_indices,
+    count_teammate_pairs,
+    create_roster_signature,
+    create_solved_roster,
+    create_teammate_pair_matrix,
+    estimate_solver_runtimes,
+    find_diverse_alternatives,
+    form_lines,
+    generate_revolving_door_swaps,
+    generate_team_one_indices,
+    generate_team_one_masks,
+    load_team_one_masks,
+    repair_team_combination,
+    roster_cache,
+    sample_optimal_team_combinations,
+    select_solver_strategy,
+    solve_anytime,
+    solve_batched,
+    solve_bitmask,
+    solve_branch_and_bound,
+    solve_dynamic_programming,
+    solve_gray_code,
+    solve_k_way,
+    solve_multiset,
+    solve_parallel,
+    solve_stratified,
+)
+from falcon_formation.solver.anytime import SwapSearch
+
+
+def create_players(number_of_players: int, seed: int) -> list[Player]:
+    generator = random.Random(seed)  # noqa: S311
+    players: list[Player] = []
+    for index in range(number_of_players):
+        skill = generator.choice([100, 200, 300, 300, 300, 400, 500, 250])
+        position = generator.choice([Position.GOALIE, Position.DEFENSE, Position.DEFENSE, Position.FORWARD])
+        if index % 4 == 0:
+            players.append(Guest(name=f"Guest Name {index}", skill=skill, position=position))
+        else:
+            players.append(Member(_id=1000 + index, name=f"Member Name {index}", skill=skill, position=position))
+    return players
+
+
+@pytest.mark.parametrize("number_of_players", [0, 1, 2, 5, 8, 11, 12])
+def test_solve_batched(number_of_players: int) -> None:
+    players = create_players(number_of_players, seed=number_of_players)
+
+    brute_force_result = _solve_brute_force(players)
+    batched_result = solve_batched(players, batch_size=7)
+
+    assert brute_force_result is not None
+    assert batched_result is not None
+    assert batched_result.metrics == brute_force_result.metrics
+    assert _calculate_team_combination_metrics(batched_result.team_combination) == batched_result.metrics
+    assert len(batched_result.team_combination[0]) == number_of_players // 2
+    assert sorted(map(id, batched_result.team_combination[0] + batched_result.team_combination[1])) == sorted(
+        map(id, players),
+    )
+
+
+@pytest.mark.parametrize(("number_of_players", "number_of_splits"), [(0, 1), (1, 1), (2, 1), (7, 35), (8, 35)])
+def test_generate_team_one_indices(number_of_players: int, number_of_splits: int) -> None:
+    team_one_indices = list(generate_team_one_indices(number_of_players))
+
+    assert len(team_one_indices) == number_of_splits
+    assert all(len(indices) == number_of_players // 2 for indices in team_one_indices)
+    assert len({frozenset(indices) for indices in team_one_indices}) == number_of_splits
+
+
+@pytest.mark.parametrize("number_of_players", [0, 1, 2, 5, 8, 11, 12])
+def test_solve_branch_and_bound(number_of_players: int) -> None:
+    players = create_players(number_of_players, seed=number_of_players)
+
+    brute_force_result = _solve_brute_force(players)
+    branch_and_bound_result = solve_branch_and_bound(players)
+
+    assert brute_force_result is not None
+    assert branch_and_bound_result is not None
+    assert branch_and_bound_result.metrics == brute_force_result.metrics
+    assert _calculate_team_combination_metrics(branch_and_bound_result.team_combination) == (
+        branch_and_bound_result.metrics
+    )
+    assert len(branch_and_bound_result.team_combination[0]) == number_of_players // 2
+
+
+def test_solve_branch_and_bound_large_roster() -> None:
+    players = create_players(36, seed=36)
+
+    branch_and_bound_result = solve_branch_and_bound(players)
+
+    assert branch_and_bound_result is not None
+    assert _calculate_team_combination_metrics(branch_and_bound_result.team_combination) == (
+        branch_and_bound_result.metrics
+    )
+
+
+@pytest.mark.parametrize("number_of_players", [0, 1, 2, 5, 8, 11, 12])
+def test_solve_stratified(number_of_players: int) -> None:
+    players = create_players(number_of_players, seed=number_of_players)
+
+    brute_force_result = _solve_brute_force(players)
+    stratified_result = solve_stratified(players)
+
+    assert brute_force_result is not None
+    assert stratified_result is not None
+    assert stratified_result.metrics == brute_force_result.metrics
+    assert _calculate_team_combination_metrics(stratified_result.team_combination) == stratified_result.metrics
+    assert len(stratified_result.team_combination[0]) == number_of_players // 2
+
+
+@pytest.mark.parametrize("number_of_players", [0, 1, 2, 5, 8, 11, 12])
+def test_solve_dynamic_programming(number_of_players: int) -> None:
+    players = create_players(number_of_players, seed=number_of_players)
+
+    brute_force_result = _solve_brute_force(players)
+    dynamic_programming_result = solve_dynamic_programming(players)
+
+    assert brute_force_result is not None
+    assert dynamic_programming_result is not None
+    assert dynamic_programming_result.metrics == brute_force_result.metrics
+    assert _calculate_team_combination_metrics(dynamic_programming_result.team_combination) == (
+        dynamic_programming_result.metrics
+    )
+    assert len(dynamic_programming_result.team_combination[0]) == number_of_players // 2
+
+
+def test_sample_optimal_team_combinations() -> None:
+    players = create_players(30, seed=30)
+
+    metrics, team_combinations = sample_optimal_team_combinations(players, 20)
+
+    assert len(team_combinations) == 20
+    assert all(_calculate_team_combination_metrics(combination) == metrics for combination in team_combinations)
+    assert len({frozenset(map(id, combination[0])) for combination in team_combinations}) > 1
+
+
+@pytest.mark.parametrize("number_of_players", [0, 1, 2, 5, 8, 11, 12, 36])
+def test_calculate_metrics_lower_bound(number_of_players: int) -> None:
+    players = create_players(number_of_players, seed=number_of_players)
+
+    branch_and_bound_result = solve_branch_and_bound(players)
+
+    assert branch_and_bound_result is not None
+    assert calculate_metrics_lower_bound(players) <= branch_and_bound_result.metrics
+
+
+@pytest.mark.parametrize("number_of_players", [0, 1, 2, 5, 8, 11, 12])
+def test_solve_anytime(number_of_players: int) -> None:
+    players = create_players(number_of_players, seed=number_of_players)
+
+    branch_and_bound_result = solve_branch_and_bound(players)
+    anytime_result = solve_anytime(players, time_budget=0.2)
+
+    assert branch_and_bound_result is not None
+    assert anytime_result is not None
+    assert anytime_result.metrics >= branch_and_bound_result.metrics
+    assert _calculate_team_combination_metrics(anytime_result.team_combination) == anytime_result.metrics
+    assert len(anytime_result.team_combination[0]) == number_of_players // 2
+    if anytime_result.proven_optimal:
+        assert anytime_result.metrics == branch_and_bound_result.metrics
+
+
+@pytest.mark.parametrize("number_of_players", [5, 8, 12])
+def test_solve_anytime_objective(number_of_players: int) -> None:
+    players = create_players(number_of_players, seed=number_of_players)
+    objective = Objective.from_specification("skill_difference, goalie_number_difference")
+    key = objective.compile_key()
+
+    batched_result = solve_batched(players, objective=objective)
+    anytime_result = solve_anytime(players, time_budget=0.2, objective=objective)
+
+    assert batched_result is not None
+    assert anytime_result is not None
+    assert not anytime_result.proven_optimal
+    assert key(anytime_result.metrics) >= key(batched_result.metrics)
+    assert _calculate_team_combination_metrics(anytime_result.team_combination) == anytime_result.metrics
+    assert len(anytime_result.team_combination[0]) == number_of_players // 2
+
+
+def test_swap_search_objective() -> None:
+    players = create_players(12, seed=12)
+    key = Objective.from_specification("defense_skill_difference").compile_key()
+
+    search = SwapSearch(players, key=key)
+    search.improve()
+
+    team_1 = sorted(search.team_1)
+    team_2 = [index for index in range(len(players)) if index not in search.team_1]
+    for out, into in itertools.product(team_1, team_2):
+        swapped_team_1 = {*search.team_1} - {out} | {into}
+        swapped_metrics = _calculate_team_combination_metrics(
+            (
+                tuple(players[index] for index in sorted(swapped_team_1)),
+                tuple(player for index, player in enumerate(players) if index not in swapped_team_1),
+            ),
+        )
+        assert key(swapped_metrics) >= key(search.metrics())
+
+
+def test_solve_anytime_time_budget() -> None:
+    players = create_players(40, seed=40)
+
+    start = time.monotonic()
+    anytime_result = solve_anytime(players, time_budget=1)
+
+    assert time.monotonic() - start < 3
+    assert anytime_result is not None
+    assert _calculate_team_combination_metrics(anytime_result.team_combination) == anytime_result.metrics
+
+
+@pytest.mark.parametrize("number_of_players", [0, 1, 2, 5, 8, 11, 12])
+def test_solve_parallel(number_of_players: int) -> None:
+    players = create_players(number_of_players, seed=number_of_players)
+
+    brute_force_result = _solve_brute_force(players)
+    parallel_result = solve_parallel(players, number_of_workers=3, batch_size=7)
+
+    assert brute_force_result is not None
+    assert parallel_result is not None
+    assert parallel_result.metrics == brute_force_result.metrics
+    assert _calculate_team_combination_metrics(parallel_result.team_combination) == parallel_result.metrics
+    assert len(parallel_result.team_combination[0]) == number_of_players // 2
+
+
+@pytest.mark.parametrize(("number_of_players", "team_size"), [(0, 0), (5, 0), (5, 2), (7, 3), (8, 3), (8, 4), (9, 7)])
+def test_generate_team_one_indices_team_size(number_of_players: int, team_size: int) -> None:
+    team_one_indices = list(generate_team_one_indices(number_of_players, team_size=team_size))
+
+    assert count_team_one_indices(number_of_players, team_size) == len(team_one_indices)
+    if 2 * team_size == number_of_players:
+        assert team_one_indices == list(generate_team_one_indices(number_of_players))
+    else:
+        assert team_one_indices == list(itertools.combinations(range(number_of_players), team_size))
+    for start in range(len(team_one_indices) + 1):
+        assert (
+            list(generate_team_one_indices(number_of_players, start, start + 4, team_size=team_size))
+            == team_one_indices[start : start + 4]
+        )
+
+
+@pytest.mark.parametrize("number_of_players", [0, 1, 7, 8])
+def test_generate_team_one_indices_range(number_of_players: int) -> None:
+    team_one_indices = list(generate_team_one_indices(number_of_players))
+
+    assert count_team_one_indices(number_of_players) == len(team_one_indices)
+    for start in range(len(team_one_indices) + 1):
+        assert (
+            list(generate_team_one_indices(number_of_players, start, start + 4)) == team_one_indices[start : start + 4]
+        )
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_repair_team_combination(seed: int) -> None:
+    players = create_players(20, seed=seed)
+    previous_result = solve_branch_and_bound(players[:-2])
+    assert previous_result is not None
+
+    # One late registration and one player who unregistered.
+    players = players[1:]
+    repaired_result = repair_team_combination(previous_result.team_combination, players)
+    branch_and_bound_result = solve_branch_and_bound(players)
+
+    assert branch_and_bound_result is not None
+    if repaired_result is not None:
+        assert repaired_result.metrics == branch_and_bound_result.metrics
+        assert _calculate_team_combination_metrics(repaired_result.team_combination) == repaired_result.metrics
+        assert len(repaired_result.team_combination[0]) == len(players) // 2
+        assert sorted(map(id, repaired_result.team_combination[0] + repaired_result.team_combination[1])) == sorted(
+            map(id, players),
+        )
+
+
+def test_repair_team_combination_unchanged_players() -> None:
+    players = create_players(10, seed=10)
+    previous_result = solve_branch_and_bound(players)
+    assert previous_result is not None
+
+    assert repair_team_combination(previous_result.team_combination, players) is None
+
+
+@pytest.mark.parametrize("number_of_players", [0, 1, 2, 5, 8, 11, 12])
+def test_solve_multiset(number_of_players: int) -> None:
+    players = create_players(number_of_players, seed=number_of_players)
+
+    brute_force_result = _solve_brute_force(players)
+    multiset_result = solve_multiset(players)
+
+    assert brute_force_result is not None
+    assert multiset_result is not None
+    assert multiset_result.metrics == brute_force_result.metrics
+    assert _calculate_team_combination_metrics(multiset_result.team_combination) == multiset_result.metrics
+    assert len(multiset_result.team_combination[0]) == number_of_players // 2
+    assert sorted(map(id, multiset_result.team_combination[0] + multiset_result.team_combination[1])) == sorted(
+        map(id, players),
+    )
+
+
+def test_solve_multiset_samples_every_optimal_team_combination() -> None:
+    players: list[Player] = [
+        Guest(name="Goalie 1", skill=300, position=Position.GOALIE),
+        Guest(name="Goalie 2", skill=300, position=Position.GOALIE),
+        *(Guest(name=f"Forward {index}", skill=300) for index in range(4)),
+    ]
+
+    team_1_names = {
+        tuple(sorted(player.name for player in result.team_combination[0]))
+        for result in (solve_multiset(players) for _ in range(500))
+        if result is not None
+    }
+
+    # One goalie and two of the four identical forwards in team one.
+    assert len(team_1_names) == 2 * 6
+
+
+def test_reservoir_sampler() -> None:
+    counts = [0] * 12
+    for _ in range(1200):
+        reservoir_sampler: ReservoirSampler[int] = ReservoirSampler(sample_size=2)
+        reservoir_sampler.extend([-1, -2])
+        reservoir_sampler.reset()
+        for start in range(0, 12, 5):
+            reservoir_sampler.extend(range(start, min(start + 5, 12)))
+
+        assert reservoir_sampler.count == 12
+        assert len(set(reservoir_sampler.samples)) == 2
+        for sample in reservoir_sampler.samples:
+            counts[sample] += 1
+
+    # Every item is expected to be sampled 200 times.
+    assert min(counts) > 120
+    assert max(counts) < 280
+
+
+@pytest.mark.parametrize("number_of_players", [0, 1, 2, 5, 8, 11, 12, 17])
+def test_solve_bitmask(number_of_players: int) -> None:
+    players = create_players(number_of_players, seed=number_of_players)
+
+    batched_result = solve_batched(players)
+    bitmask_result = solve_bitmask(players)
+
+    assert batched_result is not None
+    assert bitmask_result is not None
+    assert bitmask_result.metrics == batched_result.metrics
+    assert _calculate_team_combination_metrics(bitmask_result.team_combination) == bitmask_result.metrics
+    assert len(bitmask_result.team_combination[0]) == number_of_players // 2
+
+
+@pytest.mark.parametrize("number_of_players", [0, 1, 2, 7, 8, 13])
+def test_generate_team_one_masks(number_of_players: int) -> None:
+    team_one_masks = sorted(generate_team_one_masks(number_of_players))
+    team_one_indices = sorted(
+        sum(1 << index for index in indices) for indices in generate_team_one_indices(number_of_players)
+    )
+
+    assert team_one_masks == team_one_indices
+
+
+@pytest.mark.parametrize("number_of_players", [0, 1, 2, 5, 8, 11, 12, 17])
+def test_solve_gray_code(number_of_players: int) -> None:
+    players = create_players(number_of_players, seed=number_of_players)
+
+    batched_result = solve_batched(players)
+    gray_code_result = solve_gray_code(players)
+
+    assert batched_result is not None
+    assert gray_code_result is not None
+    assert gray_code_result.metrics == batched_result.metrics
+    assert _calculate_team_combination_metrics(gray_code_result.team_combination) == gray_code_result.metrics
+    assert len(gray_code_result.team_combination[0]) == number_of_players // 2
+
+
+@pytest.mark.parametrize(("number_of_values", "size"), [(0, 0), (1, 1), (5, 0), (6, 1), (7, 3), (8, 4), (9, 6)])
+def test_generate_revolving_door_swaps(number_of_values: int, size: int) -> None:
+    combination = set(range(size))
+    combinations = [frozenset(combination)]
+    for out, into in generate_revolving_door_swaps(number_of_values, size):
+        assert out in combination
+        assert into not in combination
+        assert 0 <= into < number_of_values
+        combination.remove(out)
+        combination.add(into)
+        combinations.append(frozenset(combination))
+
+    assert len(combinations) == len(set(combinations)) == math.comb(number_of_values, size)
+
+
+@pytest.mark.parametrize("solver", [_solve_brute_force, solve_bitmask, solve_gray_code])
+def test_solver_stops_at_lower_bound(solver: Callable[[list[Player]], SolverResult | None]) -> None:
+    players: list[Player] = [Guest(name=f"Forward {index}", skill=300) for index in range(12)]
+
+    result = solver(players)
+
+    assert result is not None
+    assert result.lower_bound_reached
+    assert result.evaluated_splits == 1
+
+
+@pytest.mark.parametrize("number_of_players", [5, 8, 11, 12, 15])
+def test_solver_reports_evaluated_splits(number_of_players: int) -> None:
+    players = create_players(number_of_players, seed=number_of_players)
+
+    batched_result = solve_batched(players, batch_size=7)
+    gray_code_result = solve_gray_code(players)
+
+    assert batched_result is not None
+    assert gray_code_result is not None
+    for result in (batched_result, gray_code_result):
+        assert result.lower_bound_reached == (result.metrics == calculate_metrics_lower_bound(players))
+        assert 0 < result.evaluated_splits <= count_team_one_indices(number_of_players)
+        if not result.lower_bound_reached:
+            assert result.evaluated_splits == count_team_one_indices(number_of_players)
+
+
+@pytest.mark.parametrize("number_of_teams", [2, 3, 4])
+@pytest.mark.parametrize("number_of_players", [0, 2, 5, 13, 30])
+def test_solve_k_way(number_of_players: int, number_of_teams: int) -> None:
+    players = create_players(number_of_players, seed=number_of_players)
+
+    k_way_result = solve_k_way(players, number_of_teams, time_budget=0.2)
+    teams = (*k_way_result.team_combination, *k_way_result.other_teams)
+
+    assert len(teams) == number_of_teams
+    assert max(map(len, teams)) - min(map(len, teams)) <= 1
+    assert sorted(id(player) for team in teams for player in team) == sorted(map(id, players))
+    assert calculate_k_way_metrics(teams) == k_way_result.metrics
+    if number_of_teams == 2 and number_of_players <= 13:
+        assert calculate_metrics_lower_bound(players) <= k_way_result.metrics
+        assert _calculate_team_combination_metrics(k_way_result.team_combination) == k_way_result.metrics
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_find_diverse_alternatives(seed: int) -> None:
+    players = create_players(14, seed=seed)
+    solver_result = solve_branch_and_bound(players)
+    assert solver_result is not None
+
+    alternatives_result, alternatives = find_diverse_alternatives(players, solver_result, 4)
+
+    assert alternatives_result == solver_result
+    assert 1 <= len(alternatives) <= 4
+    assert alternatives[0] == solver_result.team_combination
+    assert len({frozenset(map(id, team_combination[0])) for team_combination in alternatives}) == len(alternatives)
+    for team_combination in alternatives:
+        assert _calculate_team_combination_metrics(team_combination) == solver_result.metrics
+        assert sorted(map(id, team_combination[0] + team_combination[1])) == sorted(map(id, players))
+
+
+def test_find_diverse_alternatives_not_optimal() -> None:
+    players = create_players(14, seed=0)
+    solver_result = solve_branch_and_bound(players)
+    assert solver_result is not None
+    worse_metrics = TeamDistributionMetrics(*(metric + 1 for metric in astuple(solver_result.metrics)))
+
+    worse_result = replace(solver_result, metrics=worse_metrics, proven_optimal=False)
+
+    alternatives_result, alternatives = find_diverse_alternatives(players, worse_result, 4)
+
+    assert alternatives_result.metrics == solver_result.metrics
+    assert alternatives_result.proven_optimal
+    assert alternatives[0] == alternatives_result.team_combination
+    for team_combination in alternatives:
+        assert _calculate_team_combination_metrics(team_combination) == solver_result.metrics
+
+
+def test_find_diverse_alternatives_objective() -> None:
+    players = create_players(14, seed=0)
+    objective = Objective.from_specification("skill_difference")
+    solver_result = solve_batched(players, objective=objective)
+    assert solver_result is not None
+
+    alternatives_result, alternatives = find_diverse_alternatives(players, solver_result, 4, objective)
+
+    assert alternatives_result == solver_result
+    assert alternatives[0] == solver_result.team_combination
+    for team_combination in alternatives:
+        assert _calculate_team_combination_metrics(team_combination) == solver_result.metrics
+
+
+def test_find_diverse_alternatives_optimal_samples() -> None:
+    players = create_players(14, seed=0)
+    solver_result = solve_dynamic_programming(players, number_of_samples=40)
+    assert solver_result is not None
+    assert len(solver_result.optimal_samples) == 40
+
+    alternatives_result, alternatives = find_diverse_alternatives(players, solver_result, 4)
+
+    assert alternatives_result == solver_result
+    sampled_team_ones = {frozenset(map(id, team_combination[0])) for team_combination in solver_result.optimal_samples}
+    assert all(frozenset(map(id, team_combination[0])) in sampled_team_ones for team_combination in alternatives)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_calculate_repeated_teammate_pairs(seed: int) -> None:
+    players = create_players(9, seed=seed)
+    generator = random.Random(seed)  # noqa: S311
+    teammate_pair_counts = {
+        (first.identifier, second.identifier): generator.randrange(3)
+        for first in players
+        for second in players
+        if first.identifier < second.identifier
+    }
+    teammate_pair_matrix = create_teammate_pair_matrix(players, teammate_pair_counts)
+    team_indices = np.array(list(generate_team_one_indices(len(players))), dtype=np.intp)
+
+    repeated_teammate_pairs = calculate_repeated_teammate_pairs(team_indices, teammate_pair_matrix)
+
+    for row, team_1_indices in enumerate(team_indices.tolist()):
+        team_1 = [players[index] for index in team_1_indices]
+        team_2 = [player for index, player in enumerate(players) if index not in team_1_indices]
+        teammate_pairs = count_teammate_pairs([team_1, team_2])
+        assert repeated_teammate_pairs[row] == sum(teammate_pair_counts[pair] for pair in teammate_pairs)
+
+
+def test_solve_batched_rotates_teammates() -> None:
+    players: list[Player] = [Guest(name=f"Forward {index}", skill=300) for index in range(4)]
+    # Forward 0 and Forward 1 were teammates before, every other split is just as balanced.
+    teammate_pair_matrix = create_teammate_pair_matrix(players, count_teammate_pairs([players[:2]]))
+
+    for _ in range(10):
+        batched_result = solve_batched(players, teammate_pair_matrix=teammate_pair_matrix)
+        assert batched_result is not None
+        assert batched_result.repeated_teammate_pairs == 0
+        assert {frozenset(map(id, team)) for team in batched_result.team_combination} != {
+            frozenset(map(id, players[:2])),
+            frozenset(map(id, players[2:])),
+        }
+
+
+def test_solve_batched_rotates_teammates_across_blocks() -> None:
+    players: list[Player] = [Guest(name=f"Forward {index}", skill=300) for index in range(12)]
+    # The first six forwards were teammates before, the optimal ties of the first blocks repeat most of their pairs.
+    teammate_pair_matrix = create_teammate_pair_matrix(players, count_teammate_pairs([players[:6], players[6:]]))
+    team_indices = np.array(list(generate_team_one_indices(len(players))), dtype=np.intp)
+    fewest_repeated_teammate_pairs = int(calculate_repeated_teammate_pairs(team_indices, teammate_pair_matrix).min())
+
+    batched_result = solve_batched(players, batch_size=16, teammate_pair_matrix=teammate_pair_matrix)
+
+    assert batched_result is not None
+    assert batched_result.lower_bound_reached
+    assert batched_result.repeated_teammate_pairs == fewest_repeated_teammate_pairs
+    assert batched_result.evaluated_splits == len(team_indices)
+
+
+def _satisfies_constraints(
+    team_combination: tuple[tuple[Player, ...], tuple[Player, ...]],
+    constraints: list[PlayerConstraint],
+) -> bool:
+    team_1_identifiers = {player.identifier for player in team_combination[0]}
+    return all(
+        ((constraint.first_player in team_1_identifiers) == (constraint.second_player in team_1_identifiers))
+        == (constraint.kind == ConstraintKind.KEEP_TOGETHER)
+        for constraint in constraints
+    )
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_solve_branch_and_bound_with_constraints(seed: int) -> None:
+    players = create_players(11, seed=seed)
+    generator = random.Random(seed)  # noqa: S311
+    constraints = [
+        PlayerConstraint(kind, first.identifier, second.identifier)
+        for kind, (first, second) in zip(
+            [ConstraintKind.KEEP_TOGETHER, ConstraintKind.KEEP_TOGETHER, ConstraintKind.KEEP_APART],
+            [generator.sample(players, 2) for _ in range(3)],
+            strict=True,
+        )
+    ]
+
+    branch_and_bound_result = solve_branch_and_bound(players, constraints)
+    unconstrained_result = solve_branch_and_bound(players)
+    feasible_metrics = [
+        _calculate_team_combination_metrics(team_combination)
+        for team_combination in _generate_every_team_combination(players)
+        if _satisfies_constraints(team_combination, constraints)
+    ]
+
+    assert unconstrained_result is not None
+    if not feasible_metrics:
+        assert branch_and_bound_result is None
+        return
+    assert branch_and_bound_result is not None
+    assert branch_and_bound_result.metrics == min(feasible_metrics)
+    assert _satisfies_constraints(branch_and_bound_result.team_combination, constraints)
+    assert branch_and_bound_result.evaluated_splits <= len(feasible_metrics)
+
+
+def test_solve_branch_and_bound_with_keep_together_constraints() -> None:
+    players = create_players(12, seed=0)
+    constraints = [
+        PlayerConstraint(ConstraintKind.KEEP_TOGETHER, players[index].identifier, players[index + 1].identifier)
+        for index in range(0, 6, 2)
+    ]
+
+    branch_and_bound_result = solve_branch_and_bound(players, constraints)
+    number_of_feasible_splits = sum(
+        _satisfies_constraints(team_combination, constraints)
+        for team_combination in _generate_every_team_combination(players)
+    )
+
+    assert branch_and_bound_result is not None
+    assert _satisfies_constraints(branch_and_bound_result.team_combination, constraints)
+    # Every keep-together pair roughly halves the team combinations that can be enumerated.
+    assert number_of_feasible_splits < count_team_one_indices(len(players)) // 4
+    assert branch_and_bound_result.evaluated_splits <= number_of_feasible_splits
+
+
+def test_solve_branch_and_bound_with_infeasible_constraints() -> None:
+    players = create_players(6, seed=0)
+    constraints = [
+        PlayerConstraint(ConstraintKind.KEEP_TOGETHER, players[0].identifier, players[1].identifier),
+        PlayerConstraint(ConstraintKind.KEEP_APART, players[1].identifier, players[0].identifier),
+        PlayerConstraint(ConstraintKind.KEEP_APART, players[0].identifier, "member:9999"),
+    ]
+
+    assert solve_branch_and_bound(players, constraints) is None
+    assert solve_branch_and_bound(players, constraints[::2]) is not None
+
+
+def test_estimate_solver_runtimes() -> None:
+    small_runtimes = estimate_solver_runtimes(create_players(12, seed=0))
+    large_runtimes = estimate_solver_runtimes(create_players(40, seed=0))
+
+    assert set(small_runtimes) == set(SolverStrategy) - {SolverStrategy.ANYTIME, SolverStrategy.AUTO}
+    assert all(small_runtimes[solver_strategy] < large_runtimes[solver_strategy] for solver_strategy in small_runtimes)
+    assert small_runtimes[SolverStrategy.BATCHED] < small_runtimes[SolverStrategy.BRUTE_FORCE]
+    assert small_runtimes[SolverStrategy.BATCHED] < small_runtimes[SolverStrategy.BRANCH_AND_BOUND]
+
+
+def test_estimate_solver_runtimes_parallel() -> None:
+    small_players, large_players = create_players(12, seed=0), create_players(40, seed=0)
+
+    # Too few team combinations for several processes, so the number of workers does not matter.
+    assert (
+        estimate_solver_runtimes(small_players, number_of_workers=1)[SolverStrategy.PARALLEL]
+        == estimate_solver_runtimes(small_players, number_of_workers=4)[SolverStrategy.PARALLEL]
+    )
+    assert (
+        estimate_solver_runtimes(large_players, number_of_workers=4)[SolverStrategy.PARALLEL]
+        < estimate_solver_runtimes(large_players, number_of_workers=1)[SolverStrategy.PARALLEL]
+    )
+
+
+@pytest.mark.parametrize("number_of_players", [4, 12, 24, 40, 80])
+def test_select_solver_strategy(number_of_players: int) -> None:
+    players = create_players(number_of_players, seed=number_of_players)
+
+    solver_strategy, predicted_runtime = select_solver_strategy(players, 1.0)
+
+    assert predicted_runtime == min(estimate_solver_runtimes(players).values())
+    assert predicted_runtime <= 1.0
+    assert solver_strategy != SolverStrategy.ANYTIME
+    assert select_solver_strategy(players, 0.0) == (SolverStrategy.ANYTIME, 0.0)
+
+
+@pytest.mark.parametrize(
+    "restricted_solver_strategy",
+    [
+        SolverStrategy.BATCHED,
+        SolverStrategy.BRANCH_AND_BOUND,
+        SolverStrategy.STRATIFIED,
+        SolverStrategy.PARALLEL,
+        SolverStrategy.BITMASK,
+        SolverStrategy.GRAY_CODE,
+    ],
+)
+@pytest.mark.parametrize("number_of_players", [4, 12, 24, 40])
+def test_select_solver_strategy_restricted(number_of_players: int, restricted_solver_strategy: SolverStrategy) -> None:
+    players = create_players(number_of_players, seed=number_of_players)
+    runtime = estimate_solver_runtimes(players)[restricted_solver_strategy]
+
+    solver_strategy, predicted_runtime = select_solver_strategy(players, 1.0, {restricted_solver_strategy})
+
+    if runtime <= 1.0:
+        assert (solver_strategy, predicted_runtime) == (restricted_solver_strategy, runtime)
+    else:
+        assert (solver_strategy, predicted_runtime) == (SolverStrategy.ANYTIME, 1.0)
+    assert select_solver_strategy(players, 1.0, set()) == (SolverStrategy.ANYTIME, 1.0)
+
+
+@pytest.mark.parametrize("number_of_players", [2, 5, 8, 13])
+def test_calculate_swap_impacts(number_of_players: int) -> None:
+    players = create_players(number_of_players, seed=number_of_players)
+    team_1, team_2 = players[: number_of_players // 2], players[number_of_players // 2 :]
+
+    metrics, swap_impacts = calculate_swap_impacts((team_1, team_2))
+
+    assert metrics == _calculate_team_combination_metrics((tuple(team_1), tuple(team_2)))
+    assert swap_impacts.shape == (len(team_1), len(team_2), 4)
+    for row, column in itertools.product(range(len(team_1)), range(len(team_2))):
+        swapped_team_1 = (*team_1[:row], team_2[column], *team_1[row + 1 :])
+        swapped_team_2 = (*team_2[:column], team_1[row], *team_2[column + 1 :])
+        swapped_metrics = _calculate_team_combination_metrics((swapped_team_1, swapped_team_2))
+        assert swap_impacts[row, column].tolist() == [
+            swapped_metric - metric
+            for swapped_metric, metric in zip(astuple(swapped_metrics), astuple(metrics), strict=True)
+        ]
+
+
+@pytest.mark.parametrize("number_of_players", [0, 1, 2, 7, 8])
+def test_load_team_one_masks(number_of_players: int, tmp_path: Path) -> None:
+    masks = load_team_one_masks(number_of_players, tmp_path)
+
+    assert masks is not None
+    assert isinstance(masks, np.memmap)
+    assert masks.tolist() == list(generate_team_one_masks(number_of_players))
+    assert (tmp_path / f"team_one_masks_{number_of_players}.npy").exists()
+    assert load_team_one_masks(number_of_players, tmp_path, limit=number_of_players - 1) is None
+    with pytest.raises(ValueError, match="read-only"):
+        masks[:1] = 0
+
+
+@pytest.mark.parametrize("number_of_players", [0, 1, 2, 5, 8, 11, 12])
+def test_solve_batched_with_mask_table(number_of_players: int, tmp_path: Path) -> None:
+    players = create_players(number_of_players, seed=number_of_players)
+
+    brute_force_result = _solve_brute_force(players)
+    batched_result = solve_batched(players, batch_size=7, mask_table_directory=tmp_path)
+
+    assert brute_force_result is not None
+    assert batched_result is not None
+    assert batched_result.metrics == brute_force_result.metrics
+    assert _calculate_team_combination_metrics(batched_result.team_combination) == batched_result.metrics
+    assert len(batched_result.team_combination[0]) == number_of_players // 2
+    assert (tmp_path / f"team_one_masks_{number_of_players}.npy").exists()
+
+
+@pytest.mark.parametrize("number_of_players", [0, 1, 5, 8, 12])
+def test_solved_roster(number_of_players: int) -> None:
+    players = create_players(number_of_players, seed=number_of_players)
+    solver_result = solve_branch_and_bound(players)
+    assert solver_result is not None
+
+    solved_roster = create_solved_roster([solver_result.team_combination], solver_result.metrics)
+    renamed_players: list[Player] = [
+        Guest(name=f"Other Name {index}", skill=player.skill, position=player.position)
+        for index, player in enumerate(reversed(players))
+    ]
+    team_combination = apply_solved_roster(renamed_players, solved_roster)
+
+    assert solved_roster.signature == create_roster_signature(renamed_players)
+    assert [sum(class_counts) for class_counts in solved_roster.class_count_patterns] == [number_of_players // 2]
+    assert _calculate_team_combination_metrics(team_combination) == solver_result.metrics
+    assert sorted(map(id, team_combination[0] + team_combination[1])) == sorted(map(id, renamed_players))
+
+
+def test_create_roster_signature() -> None:
+    players = create_players(10, seed=0)
+
+    assert create_roster_signature(players) == create_roster_signature(players[::-1])
+    assert create_roster_signature(players) != create_roster_signature(players[1:])
+
+
+def test_create_roster_signature_version(monkeypatch: pytest.MonkeyPatch) -> None:
+    players = create_players(10, seed=0)
+    signature = create_roster_signature(players)
+
+    monkeypatch.setattr(roster_cache, "ROSTER_SIGNATURE_VERSION", roster_cache.ROSTER_SIGNATURE_VERSION + 1)
+
+    assert create_roster_signature(players) != signature
+
+
+def test_apply_solved_roster_samples_optimal_splits() -> None:
+    # Forwards of 100 and 400 against 200 and 300 are the only optimal splits, each standing for one team combination.
+    players: list[Player] = [Guest(name=f"Forward {skill}", skill=skill) for skill in (100, 200, 300, 400)]
+    solver_result = solve_dynamic_programming(players, number_of_samples=40)
+    assert solver_result is not None
+
+    solved_roster = create_solved_roster(solver_result.optimal_samples, solver_result.metrics)
+    team_1_skills = set()
+    for _ in range(40):
+        team_combination = apply_solved_roster(players, solved_roster)
+        assert _calculate_team_combination_metrics(team_combination) == solver_result.metrics
+        team_1_skills.add(frozenset(player.skill for player in team_combination[0]))
+
+    assert sorted(solved_roster.class_count_patterns) == [[0, 1, 1, 0], [1, 0, 0, 1]]
+    assert team_1_skills == {frozenset({100, 400}), frozenset({200, 300})}
+
+
+def test_solved_roster_cache() -> None:
+    solved_roster_cache = SolvedRosterCache(maximum_size=2)
+    solved_rosters = []
+    for number_of_players in (4, 6, 8):
+        solver_result = solve_branch_and_bound(create_players(number_of_players, seed=0))
+        assert solver_result is not None
+        solved_rosters.append(create_solved_roster([solver_result.team_combination], solver_result.metrics))
+
+    solved_roster_cache.put(solved_rosters[0])
+    solved_roster_cache.put(solved_rosters[1])
+    assert solved_roster_cache.get(solved_rosters[0].signature) == solved_rosters[0]
+    solved_roster_cache.put(solved_rosters[2])
+
+    assert solved_roster_cache.get(solved_rosters[0].signature) == solved_rosters[0]
+    assert solved_roster_cache.get(solved_rosters[1].signature) is None
+    assert solved_roster_cache.get(solved_rosters[2].signature) == solved_rosters[2]
+
+
+@pytest.mark.parametrize(
+    "specification",
+    [
+        "",
+        "skill_difference, goalie_number_difference",
+        "goalie_number_difference, 2 * skill_difference + defense_skill_difference",
+        "defense_number_difference + goalie_number_difference",
+    ],
+)
+def test_objective(specification: str) -> None:
+    objective = Objective.from_specification(specification)
+    metrics = [
+        TeamDistributionMetrics(*values) for values in itertools.product(range(3), [0, 2], [0, 50, 100], [0, 100])
+    ]
+    metrics_columns = tuple(np.array(column, dtype=np.int64) for column in zip(*map(astuple, metrics), strict=True))
+
+    key = objective.compile_key()
+    key_columns = objective.compile_kernel()(metrics_columns)
+
+    assert Objective.from_specification(objective.to_specification()) == objective
+    assert objective.is_default == (not specification)
+    assert [key(metrics) for metrics in metrics] == list(zip(*(column.tolist() for column in key_columns), strict=True))
+    if objective.is_default:
+        assert sorted(metrics, key=key) == sorted(metrics)
+
+
+@pytest.mark.parametrize("specification", ["skill", "skill_difference, ", "-1 * skill_difference"])
+def test_objective_not_valid(specification: str) -> None:
+    with pytest.raises(ValueError, match="objective"):
+        Objective.from_specification(specification)
+
+
+@pytest.mark.parametrize(
+    "specification",
+    [
+        "skill_difference, goalie_number_difference",
+        "goalie_number_difference, 2 * skill_difference + defense_skill_difference",
+    ],
+)
+@pytest.mark.parametrize("number_of_players", [0, 1, 5, 8, 11])
+def test_solve_with_objective(specification: str, number_of_players: int) -> None:
+    players = create_players(number_of_players, seed=number_of_players)
+    objective = Objective.from_specification(specification)
+    key = objective.compile_key()
+    best_key = min(
+        key(_calculate_team_combination_metrics(team_combination))
+        for team_combination in _generate_every_team_combination(players)
+    )
+
+    brute_force_result = _solve_brute_force(players, objective=objective)
+    batched_result = solve_batched(players, batch_size=7, objective=objective)
+
+    for solver_result in (brute_force_result, batched_result):
+        assert solver_result is not None
+        assert _calculate_team_combination_metrics(solver_result.team_combination) == solver_result.metrics
+        assert key(solver_result.metrics) == best_key
+        assert solver_result.evaluated_splits == count_team_one_indices(number_of_players)
+
+
+@pytest.mark.parametrize("line_size", [1, 2, 3, 4])
+@pytest.mark.parametrize("number_of_players", [0, 1, 5, 8, 13])
+def test_form_lines(number_of_players: int, line_size: int) -> None:
+    players = create_players(number_of_players, seed=number_of_players)
+
+    lines = form_lines(players, line_size, batch_size=7)
+    line_sizes = [len(line) for line in lines]
+    average_skills = [sum(player.skill for player in line) / len(line) for line in lines]
+
+    assert len(lines) == math.ceil(number_of_players / line_size)
+    assert all(size <= line_size for size in line_sizes)
+    assert not lines or max(line_sizes) - min(line_sizes) <= 1
+    assert sorted(map(id, itertools.chain.from_iterable(lines))) == sorted(map(id, players))
+    assert average_skills == sorted(average_skills, reverse=True)
+    assert form_lines(players, line_size) == lines
+
+
+def test_form_lines_close_to_line_size() -> None:
+    players = create_players(5, seed=5)
+
+    lines = form_lines(players, 3)
+
+    assert sorted(len(line) for line in lines) == [2, 3]
+
+
+@pytest.mark.parametrize("number_of_players", [4, 7, 10])
+def test_form_lines_two_lines(number_of_players: int) -> None:
+    players = create_players(number_of_players, seed=number_of_players)
+    line_size = math.ceil(number_of_players / 2)
+
+    def average_skill_difference(first_line: tuple[Player, ...]) -> float:
+        second_line = [player for player in players if player not in first_line]
+        return abs(
+            sum(player.skill for player in first_line) / len(first_line)
+            - sum(player.skill for player in second_line) / len(second_line),
+        )
+
+    lines = form_lines(players, line_size)
+
+    assert len(lines) == 2
+    assert math.isclose(
+        average_skill_difference(lines[0]),
+        min(map(average_skill_difference, itertools.combinations(players, line_size))),
+    )